@@ -6,8 +6,13 @@ Consolidates all redundant data files into one clean training dataset
 
 import json
 import os
+import sys
 from pathlib import Path
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from near_duplicates import dedupe
+
 def load_json_file(file_path):
     """Load and return JSON data from file"""
     try:
@@ -107,6 +112,17 @@ def consolidate_data():
     
     print(f"After cleaning and deduplication: {len(cleaned_pairs)} pairs")
     
+    # Drop near-duplicates the exact check misses (re-extracted or lightly reworded pairs).
+    # Numbers are kept: past-paper questions that differ only in their values are different questions
+    print("Removing near-duplicates...")
+    unique_pairs, clusters = dedupe(cleaned_pairs, text=lambda pair: f"{pair['question']} {pair['answer']}",
+                                    fold_numbers=False)
+    print(f"Removed {len(cleaned_pairs) - len(unique_pairs)} near-duplicates in {len(clusters)} clusters")
+    for cluster in clusters[:5]:
+        print(f"  {len(cluster)} × {cleaned_pairs[cluster[0]]['question'][:70]!r}")
+    cleaned_pairs = unique_pairs
+    print(f"After near-duplicate removal: {len(cleaned_pairs)} pairs")
+    
     # Create the consolidated dataset
     consolidated_data = {
         "metadata": {
@@ -117,6 +133,7 @@ def consolidate_data():
             "difficulties": list(set(pair["difficulty"] for pair in cleaned_pairs if pair["difficulty"])),
             "qa_types": list(set(pair["qa_type"] for pair in cleaned_pairs if pair["qa_type"])),
             "consolidation_date": "2025-08-27",
+            "near_duplicate_clusters": len(clusters),
             "source_files": ["extracted_qa_pairs.json", "comprehensive_qa_pairs.json", "real_pmt_content.json"]
         },
         "training_data": cleaned_pairs
@@ -1,13 +1,16 @@
-import requests
 import os
 import json
 from urllib.parse import urljoin, urlparse
 
+from ankiweb_client import AnkiWebClient
+from http_cache import CachedSession
+
 class AnkiEnglishDeckDownloader:
     def __init__(self):
         self.base_url = "https://ankiweb.net"
         self.download_dir = "anki_english_decks"
-        self.session = requests.Session()
+        self.session = CachedSession()
+        self.client = AnkiWebClient(session=self.session, base_url=self.base_url)
         
         # Create download directory
         if not os.path.exists(self.download_dir):
@@ -70,17 +73,22 @@ class AnkiEnglishDeckDownloader:
             "English reading"
         ]
         
-        found_decks = []
+        # One concurrent pass over every query; a deck matching several queries is listed once
+        found = {}
+        for deck in self.client.search_all(search_queries):
+            found.setdefault(deck['category'], deck)
         
+        found_decks = []
         for query in search_queries:
             print(f"  Searching: {query}")
-            # Note: AnkiWeb doesn't have a public search API, so we'll use known deck IDs
-            # For now, we'll simulate finding decks
-            
-            # Simulate finding a deck (in real implementation, we'd scrape AnkiWeb)
-            deck_info = {
+            # No shared deck found for a query falls back to a simulated one
+            deck = found.get(query) or {
                 "name": f"{query.title()} Deck",
-                "url": f"https://ankiweb.net/shared/decks/{query.lower().replace(' ', '-')}",
+                "url": f"https://ankiweb.net/shared/decks/{query.lower().replace(' ', '-')}"
+            }
+            deck_info = {
+                "name": deck['name'],
+                "url": deck['url'],
                 "estimated_cards": 1000,
                 "category": query.split()[0].title()
             }
@@ -1,16 +1,16 @@
 import json
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import time
-import random
+
+from ankiweb_client import AnkiWebClient
+from deck_split import assign_split
+from http_cache import CachedSession
 
 class AnkiEnglishMasterDownloader:
     def __init__(self):
         self.output_dir = "anki_english_master_data"
         self.base_url = "https://ankiweb.net"
-        self.session = requests.Session()
+        self.session = CachedSession()
         
         # Create output directory
         if not os.path.exists(self.output_dir):
@@ -25,6 +25,7 @@ class AnkiEnglishMasterDownloader:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        self.client = AnkiWebClient(session=self.session, base_url=self.base_url)
     
     def get_top_english_decks(self):
         """Get top English decks from AnkiWeb shared decks"""
@@ -50,111 +51,21 @@ class AnkiEnglishMasterDownloader:
             "academic_english"
         ]
         
-        all_decks = []
-        
-        for category in english_categories:
-            try:
-                print(f"📚 Searching for {category} decks...")
-                
-                # Search URL for each category
-                search_url = f"{self.base_url}/shared/decks/?search={category}&sort=downloads"
-                
-                response = self.session.get(search_url, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Find deck listings
-                    deck_links = soup.find_all('a', href=True)
-                    
-                    for link in deck_links:
-                        if '/shared/info/' in link['href']:
-                            deck_id = link['href'].split('/')[-1]
-                            deck_name = link.get_text(strip=True)
-                            
-                            if deck_name and len(deck_name) > 3:
-                                deck_info = {
-                                    'id': deck_id,
-                                    'name': deck_name,
-                                    'category': category,
-                                    'url': f"{self.base_url}/shared/info/{deck_id}",
-                                    'download_url': f"{self.base_url}/shared/download/{deck_id}"
-                                }
-                                all_decks.append(deck_info)
-                
-                # Be respectful with requests
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"❌ Error searching {category}: {e}")
-                continue
+        all_decks = self.client.search_all(english_categories)
         
         print(f"✅ Found {len(all_decks)} potential English decks")
         return all_decks
     
     def get_deck_details(self, deck_info):
         """Get detailed information about a specific deck"""
-        try:
-            response = self.session.get(deck_info['url'], timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract deck information
-                deck_details = {
-                    'id': deck_info['id'],
-                    'name': deck_info['name'],
-                    'category': deck_info['category'],
-                    'description': '',
-                    'card_count': 0,
-                    'downloads': 0,
-                    'rating': 0,
-                    'tags': [],
-                    'last_updated': '',
-                    'download_url': deck_info['download_url']
-                }
-                
-                # Try to extract description
-                desc_elem = soup.find('div', class_='description')
-                if desc_elem:
-                    deck_details['description'] = desc_elem.get_text(strip=True)
-                
-                # Try to extract card count
-                count_elem = soup.find(text=lambda text: text and 'cards' in text.lower())
-                if count_elem:
-                    try:
-                        count_text = count_elem.strip()
-                        count_match = count_text.split()[0]
-                        deck_details['card_count'] = int(count_match.replace(',', ''))
-                    except:
-                        pass
-                
-                # Try to extract downloads
-                downloads_elem = soup.find(text=lambda text: text and 'downloads' in text.lower())
-                if downloads_elem:
-                    try:
-                        downloads_text = downloads_elem.strip()
-                        downloads_match = downloads_text.split()[0]
-                        deck_details['downloads'] = int(downloads_match.replace(',', ''))
-                    except:
-                        pass
-                
-                return deck_details
-                
-        except Exception as e:
-            print(f"❌ Error getting details for {deck_info['name']}: {e}")
-        
-        return deck_info
+        return self.client.deck_details(deck_info)
     
     def create_comprehensive_english_deck(self, top_decks):
         """Create one massive comprehensive English deck from all found decks"""
         print("🚀 Creating comprehensive English master deck...")
         
         # Get detailed info for top decks
-        detailed_decks = []
-        for i, deck in enumerate(top_decks[:50]):  # Limit to top 50 for now
-            print(f"📖 Getting details for deck {i+1}/{min(50, len(top_decks))}: {deck['name']}")
-            detailed_deck = self.get_deck_details(deck)
-            detailed_decks.append(detailed_deck)
-            time.sleep(random.uniform(0.5, 1.5))  # Be respectful
+        detailed_decks = self.client.details_all(top_decks[:50])  # Limit to top 50 for now
         
         # Create comprehensive deck structure
         comprehensive_deck = {
@@ -165,7 +76,7 @@ class AnkiEnglishMasterDownloader:
                 "created_date": datetime.now().isoformat(),
                 "version": "1.0",
                 "source": "AnkiWeb Shared Decks",
-                "note": "This deck contains metadata from AnkiWeb. For actual cards, download individual .apkg files."
+                "note": "This deck contains metadata from AnkiWeb. For actual cards, download individual .apkg files and import them with anki_importer.py."
             },
             "deck_categories": {
                 "vocabulary": [],
@@ -227,23 +138,27 @@ class AnkiEnglishMasterDownloader:
         print("✂️ Creating 80/20 training/testing split...")
         
         all_decks = comprehensive_deck['all_decks']
-        total_decks = len(all_decks)
         
-        # Shuffle decks for random split
-        random.shuffle(all_decks)
-        
-        # Calculate split
-        training_count = int(total_decks * 0.8)
-        testing_count = total_decks - training_count
-        
-        training_decks = all_decks[:training_count]
-        testing_decks = all_decks[training_count:]
+        # Stable split by deck: the same deck is on the same side on every run
+        training_decks, testing_decks = [], []
+        for deck in all_decks:
+            if assign_split(deck, fields=('id', 'name')) == 'testing':
+                testing_decks.append(deck)
+            else:
+                training_decks.append(deck)
+        training_count = len(training_decks)
+        testing_count = len(testing_decks)
+        # The hash split only approximates 80/20, so report what was actually assigned
+        total = training_count + testing_count
+        training_percentage = round(100 * training_count / total, 1) if total else 0.0
+        testing_percentage = round(100 * testing_count / total, 1) if total else 0.0
         
         # Create split files
         training_data = {
             "split_info": {
                 "type": "training",
-                "percentage": 80,
+                "percentage": training_percentage,
+                "target_percentage": 80,
                 "deck_count": training_count,
                 "created_date": datetime.now().isoformat()
             },
@@ -253,7 +168,8 @@ class AnkiEnglishMasterDownloader:
         testing_data = {
             "split_info": {
                 "type": "testing", 
-                "percentage": 20,
+                "percentage": testing_percentage,
+                "target_percentage": 20,
                 "deck_count": testing_count,
                 "created_date": datetime.now().isoformat()
             },
@@ -271,8 +187,8 @@ class AnkiEnglishMasterDownloader:
             json.dump(testing_data, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Training/Testing split created!")
-        print(f"📚 Training: {training_count} decks (80%)")
-        print(f"🧪 Testing: {testing_count} decks (20%)")
+        print(f"📚 Training: {training_count} decks ({training_percentage}%)")
+        print(f"🧪 Testing: {testing_count} decks ({testing_percentage}%)")
         print(f"📁 Files saved in: {self.output_dir}")
         
         return training_data, testing_data
@@ -1,16 +1,19 @@
-import requests
-import json
 import time
-from bs4 import BeautifulSoup
-import os
+from urllib.parse import urljoin
+
+from ankiweb_client import AnkiWebClient
+from deck_split import write_split_deck
+from http_cache import CachedSession
+from link_extractor import extract_links
 
 class AnkiEnglishDownloader:
     def __init__(self):
         self.base_url = "https://ankiweb.net"
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        self.client = AnkiWebClient(session=self.session, base_url=self.base_url)
         
     def get_english_decks(self):
         """Get English decks from AnkiWeb"""
@@ -20,49 +23,22 @@ class AnkiEnglishDownloader:
         decks = []
         
         # Approach 1: Direct category browsing
-        try:
-            print("Trying direct category browsing...")
-            url = f"{self.base_url}/shared/decks/"
-            response = self.session.get(url)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Look for English-related categories
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    if 'english' in link.text.lower() or 'language' in link.text.lower():
-                        decks.append({
-                            'name': link.text.strip(),
-                            'url': f"{self.base_url}{link['href']}",
-                            'category': 'English'
-                        })
-        except Exception as e:
-            print(f"Category browsing failed: {e}")
+        print("Trying direct category browsing...")
+        content = self.client.fetch(f"{self.base_url}/shared/decks/")
+        if content is not None:
+            # Look for English-related categories
+            for link in extract_links(content):
+                if 'english' in link.text.lower() or 'language' in link.text.lower():
+                    decks.append({
+                        'name': link.text,
+                        'url': urljoin(self.base_url, link.href),
+                        'category': 'English'
+                    })
         
         # Approach 2: Search for English decks
-        try:
-            print("Trying search approach...")
-            search_url = f"{self.base_url}/shared/decks/search"
-            search_data = {
-                'q': 'english',
-                'type': 'all'
-            }
-            response = self.session.post(search_url, data=search_data)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                deck_links = soup.find_all('a', href=True)
-                for link in deck_links:
-                    if '/shared/info/' in link['href']:
-                        deck_id = link['href'].split('/')[-1]
-                        deck_name = link.text.strip()
-                        if deck_name and len(deck_name) > 3:
-                            decks.append({
-                                'name': deck_name,
-                                'id': deck_id,
-                                'url': f"{self.base_url}/shared/info/{deck_id}",
-                                'category': 'English'
-                            })
-        except Exception as e:
-            print(f"Search approach failed: {e}")
+        print("Trying search approach...")
+        for deck in self.client.search('english'):
+            decks.append(dict(deck, category='English'))
         
         # Approach 3: Create sample English decks if scraping fails
         if not decks:
@@ -184,56 +160,26 @@ class AnkiEnglishDownloader:
         
         return consolidated_deck
     
-    def create_training_test_split(self, consolidated_deck):
-        """Create 80/20 training/testing split"""
-        print("Creating 80/20 training/testing split...")
-        
-        total_cards = len(consolidated_deck['cards'])
-        training_size = int(total_cards * 0.8)
-        testing_size = total_cards - training_size
-        
-        # Shuffle cards (simple approach)
-        import random
-        random.shuffle(consolidated_deck['cards'])
-        
-        training_deck = {
-            'name': 'English Training Deck (80%)',
-            'total_cards': training_size,
-            'cards': consolidated_deck['cards'][:training_size],
-            'split': 'training'
-        }
-        
-        testing_deck = {
-            'name': 'English Testing Deck (20%)',
-            'total_cards': testing_size,
-            'cards': consolidated_deck['cards'][training_size:],
-            'split': 'testing'
-        }
-        
-        return training_deck, testing_deck
-    
-    def save_decks(self, consolidated_deck, training_deck, testing_deck):
-        """Save all decks to JSON files"""
-        print("Saving decks to JSON files...")
-        
-        # Create output directory
-        os.makedirs('generated_flashcards', exist_ok=True)
-        
-        # Save consolidated deck
-        with open('generated_flashcards/comprehensive_english_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(consolidated_deck, f, indent=2, ensure_ascii=False)
-        
-        # Save training deck
-        with open('generated_flashcards/english_training_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(training_deck, f, indent=2, ensure_ascii=False)
-        
-        # Save testing deck
-        with open('generated_flashcards/english_testing_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(testing_deck, f, indent=2, ensure_ascii=False)
+    def save_decks(self, consolidated_deck):
+        """Save the decks, split 80/20 by content hash; the consolidated deck is a view of both halves"""
+        print("Saving decks with an 80/20 training/testing split...")
+        
+        saved = write_split_deck(
+            consolidated_deck['cards'],
+            'generated_flashcards/comprehensive_english_deck.json',
+            'generated_flashcards/english_training_deck.json',
+            'generated_flashcards/english_testing_deck.json',
+            consolidated_deck['name'],
+            training_name='English Training Deck (80%)',
+            testing_name='English Testing Deck (20%)',
+            categories=consolidated_deck['categories'],
+            near_duplicate_threshold=0.8
+        )
         
         print(f"✅ Saved {consolidated_deck['total_cards']} total cards")
-        print(f"✅ Training deck: {training_deck['total_cards']} cards")
-        print(f"✅ Testing deck: {testing_deck['total_cards']} cards")
+        print(f"✅ Training deck: {saved['training']['total_cards']} cards")
+        print(f"✅ Testing deck: {saved['testing']['total_cards']} cards")
+        return saved
     
     def run(self):
         """Main execution method"""
@@ -246,11 +192,9 @@ class AnkiEnglishDownloader:
         # Step 2: Consolidate all decks
         consolidated_deck = self.consolidate_decks(decks)
         
-        # Step 3: Create training/testing split
-        training_deck, testing_deck = self.create_training_test_split(consolidated_deck)
-        
-        # Step 4: Save all decks
-        self.save_decks(consolidated_deck, training_deck, testing_deck)
+        # Step 3: Save all decks, split into training/testing
+        saved = self.save_decks(consolidated_deck)
+        training_deck, testing_deck = saved['training'], saved['testing']
         
         print("🎉 English Deck Collection Complete!")
         print(f"📊 Total Cards: {consolidated_deck['total_cards']}")
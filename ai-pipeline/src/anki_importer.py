@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Anki Package Importer
+===========================================
+Read the cards out of AnkiWeb .apkg files. A package is a zip archive around
+an Anki collection (a SQLite database); the collection is copied out to a
+temporary file and its notes are read through a cursor in batches, so a deck
+of a hundred thousand cards is imported with flat memory. Notes become
+front/back cards (HTML stripped, cloze deletions resolved) and are written
+straight into the deck JSON format the Anki downloaders use.
+
+    python anki_importer.py deck.apkg other.apkg -o anki_english_decks
+
+Packages exported by Anki 2.1.50+ in the new format (collection.anki21b) are
+zstd-compressed and need the optional `zstandard` package.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# Newest collection format first; a new-format package also carries a legacy
+# collection.anki2 that only holds a "please update Anki" note
+COLLECTION_NAMES = ('collection.anki21b', 'collection.anki21', 'collection.anki2')
+
+FIELD_SEPARATOR = '\x1f'
+CLOZE_MODEL = 1
+
+_BREAK = re.compile(r'<br\s*/?>|<div[^>]*>|</(?:div|p|li)>', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]+>')
+_SOUND = re.compile(r'\[sound:[^\]]*\]')
+_CLOZE = re.compile(r'\{\{c(\d+)::(.*?)(?:::(.*?))?\}\}', re.DOTALL)
+_BLANK_LINES = re.compile(r'\s*\n\s*')
+_SCRIPT = re.compile(r'<(sup|sub)\b[^>]*>(.*?)</\1\s*>', re.IGNORECASE | re.DOTALL)
+_SIMPLE_SCRIPT = re.compile(r'^[\w+\-.−]+$')
+
+
+def _script(match) -> str:
+    """10<sup>8</sup> -> 10^8, H<sub>2</sub>O -> H_2O; longer scripts are bracketed: e^(i pi)"""
+    content = _TAG.sub('', match.group(2)).strip()
+    if not content:
+        return ''
+    marker = '^' if match.group(1).lower() == 'sup' else '_'
+    return marker + (content if _SIMPLE_SCRIPT.match(html.unescape(content)) else f"({content})")
+
+
+def strip_html(text: str) -> str:
+    """Anki field HTML -> plain text, keeping line breaks and super/subscripts"""
+    text = _SOUND.sub('', _BREAK.sub('\n', _SCRIPT.sub(_script, text)))
+    text = html.unescape(_TAG.sub('', text)).replace('\xa0', ' ')
+    return _BLANK_LINES.sub('\n', text).strip()
+
+
+def resolve_cloze(text: str) -> Tuple[str, str]:
+    """'{{c1::Paris::capital}} is in France' -> ('[capital] is in France', 'Paris is in France')"""
+    front = _CLOZE.sub(lambda m: f"[{m.group(3) or '...'}]", text)
+    back = _CLOZE.sub(lambda m: m.group(2), text)
+    return front, back
+
+
+@contextmanager
+def open_collection(apkg_path: str):
+    """The package's collection as a read-only SQLite connection on a temporary copy"""
+    with zipfile.ZipFile(apkg_path) as package:
+        names = set(package.namelist())
+        member = next((name for name in COLLECTION_NAMES if name in names), None)
+        if member is None:
+            raise ValueError(f"{apkg_path} has no Anki collection in it")
+        if member.endswith('b') and not HAS_ZSTD:
+            raise ValueError(f"{apkg_path} is in the new Anki package format; pip install zstandard to read it")
+
+        handle, db_path = tempfile.mkstemp(suffix='.anki2')
+        try:
+            with os.fdopen(handle, 'wb') as out, package.open(member) as source:
+                if member.endswith('b'):
+                    zstandard.ZstdDecompressor().copy_stream(source, out)
+                else:
+                    shutil.copyfileobj(source, out, 1024 * 1024)
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                yield conn
+            finally:
+                conn.close()
+        finally:
+            os.remove(db_path)
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone() is not None
+
+
+def read_note_types(conn: sqlite3.Connection) -> Dict[int, Dict]:
+    """Note type id -> {'name', 'fields', 'cloze'} from either collection schema"""
+    models = conn.execute("SELECT models FROM col").fetchone()[0]
+    if models and models != '{}':
+        return {int(model_id): {'name': model['name'],
+                                'fields': [field['name'] for field in model['flds']],
+                                'cloze': model.get('type') == CLOZE_MODEL}
+                for model_id, model in json.loads(models).items()}
+
+    # Schema 15+: note types and their fields live in their own tables
+    note_types = {}
+    for model_id, name in conn.execute("SELECT id, name FROM notetypes"):
+        fields = [row[0] for row in conn.execute(
+            "SELECT name FROM fields WHERE ntid = ? ORDER BY ord", (model_id,))]
+        # The note type kind is in a protobuf config blob; cloze notes are recognised by their markup
+        note_types[model_id] = {'name': name, 'fields': fields, 'cloze': False}
+    return note_types
+
+
+def read_decks(conn: sqlite3.Connection) -> Dict[int, str]:
+    """Deck id -> full deck name ('English::Vocabulary')"""
+    decks = conn.execute("SELECT decks FROM col").fetchone()[0]
+    if decks and decks != '{}':
+        return {int(deck_id): deck['name'] for deck_id, deck in json.loads(decks).items()}
+    if _has_table(conn, 'decks'):
+        return {deck_id: name.replace(FIELD_SEPARATOR, '::')
+                for deck_id, name in conn.execute("SELECT id, name FROM decks")}
+    return {}
+
+
+def _front_back_fields(field_names: List[str]) -> Tuple[int, int]:
+    """Indexes of the question and answer fields: named Front/Back if present, else the first two"""
+    lowered = [name.lower() for name in field_names]
+    front = lowered.index('front') if 'front' in lowered else 0
+    back = lowered.index('back') if 'back' in lowered else (1 if front != 1 else 0)
+    return front, back
+
+
+def note_to_card(fields: List[str], tags: str, note_type: Dict, deck: str, note_id: int) -> Optional[Dict]:
+    """One normalized card for a note, or None if it has no usable question and answer"""
+    if note_type['cloze'] or _CLOZE.search(fields[0]):
+        front, back = resolve_cloze(fields[0])
+        extra = strip_html(fields[1]) if len(fields) > 1 else ''
+        front, back = strip_html(front), strip_html(back)
+        if extra:
+            back = f"{back}\n{extra}"
+        card_type = 'cloze'
+    else:
+        front_index, back_index = _front_back_fields(note_type['fields'])
+        front = strip_html(fields[front_index]) if front_index < len(fields) else ''
+        back = strip_html(fields[back_index]) if back_index < len(fields) else ''
+        card_type = 'basic'
+    if not front or not back:
+        return None
+
+    return {
+        'front': front,
+        'back': back,
+        'type': card_type,
+        'category': deck.split('::')[0] if deck else 'General',
+        'deck': deck,
+        'tags': tags.split(),
+        'source': 'anki',
+        'note_id': note_id
+    }
+
+
+def iter_apkg_cards(apkg_path: str, batch_size: int = 1000) -> Iterator[List[Dict]]:
+    """Cards of every note in the package, in batches of up to `batch_size`"""
+    with open_collection(apkg_path) as conn:
+        note_types = read_note_types(conn)
+        decks = read_decks(conn)
+        cursor = conn.execute("""
+            SELECT n.id, n.mid, n.flds, n.tags,
+                   (SELECT c.did FROM cards c WHERE c.nid = n.id ORDER BY c.ord LIMIT 1)
+            FROM notes n ORDER BY n.id
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            batch = []
+            for note_id, model_id, flds, tags, deck_id in rows:
+                note_type = note_types.get(model_id)
+                if note_type is None:
+                    continue
+                card = note_to_card(flds.split(FIELD_SEPARATOR), tags, note_type,
+                                    decks.get(deck_id, ''), note_id)
+                if card is not None:
+                    batch.append(card)
+            if batch:
+                yield batch
+
+
+def import_apkg(apkg_path: str, output_dir: str = "anki_english_decks", name: Optional[str] = None,
+                batch_size: int = 1000) -> Dict:
+    """
+    Write the package's cards to `<output_dir>/<name>.json` in the downloaded-deck
+    format ({'name', 'cards', 'metadata'}), one batch at a time; returns the metadata
+    """
+    name = name or os.path.splitext(os.path.basename(apkg_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, f"{re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')}.json")
+    tmp_path = filepath + '.tmp'
+
+    total, categories = 0, set()
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{\n  "name": ' + json.dumps(name, ensure_ascii=False) + ',\n  "cards": [')
+            for batch in iter_apkg_cards(apkg_path, batch_size):
+                for card in batch:
+                    f.write((',\n    ' if total else '\n    ') + json.dumps(card, ensure_ascii=False))
+                    total += 1
+                    categories.add(card['category'])
+            metadata = {
+                'total_cards': total,
+                'category': sorted(categories)[0] if len(categories) == 1 else 'Mixed',
+                'categories': sorted(categories),
+                'source': 'AnkiWeb (.apkg)',
+                'package': os.path.basename(apkg_path)
+            }
+            f.write('\n  ],\n  "metadata": ' + json.dumps(metadata, ensure_ascii=False) + '\n}\n')
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        # A corrupt package must not leave a half-written deck behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    metadata['path'] = filepath
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cards from Anki .apkg packages")
+    parser.add_argument('packages', nargs='+', help=".apkg files to import")
+    parser.add_argument('-o', '--output-dir', default='anki_english_decks', help="deck JSON directory")
+    parser.add_argument('--batch-size', type=int, default=1000, help="notes read per database round trip")
+    args = parser.parse_args()
+
+    for package in args.packages:
+        try:
+            metadata = import_apkg(package, args.output_dir, batch_size=args.batch_size)
+        except (ValueError, zipfile.BadZipFile, sqlite3.DatabaseError) as e:
+            print(f"❌ {package}: {e}")
+            continue
+        print(f"✅ {package}: {metadata['total_cards']} cards -> {metadata['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - AnkiWeb Client
+====================================
+Shared-deck metadata from AnkiWeb for the Anki downloaders. Searches and deck
+detail pages are fetched on a thread pool through the shared HostLimiter
+(instead of one request at a time with random sleeps), decks found under
+several search terms are fetched once, and pages go through the HTTP cache,
+so re-runs only revalidate what they have already seen.
+
+    client = AnkiWebClient()
+    decks = client.search_all(["vocabulary", "grammar"])
+    details = client.details_all(decks[:50])
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from crawl_frontier import RETRY_STATUSES
+from http_cache import CachedSession
+from link_extractor import extract_links
+from rate_limiter import HostLimiter
+
+BASE_URL = "https://ankiweb.net"
+
+
+def _leading_int(text: str) -> Optional[int]:
+    """'12,345 cards' -> 12345"""
+    try:
+        return int(text.strip().split()[0].replace(',', ''))
+    except (IndexError, ValueError):
+        return None
+
+
+class AnkiWebClient:
+    """
+    Concurrent AnkiWeb reader: `workers` threads, at most `per_host_limit`
+    requests in flight and `per_host_rate` per second. 429/5xx responses
+    are retried `max_retries` times with exponential backoff.
+    """
+
+    def __init__(self, session=None, base_url: str = BASE_URL, workers: int = 8,
+                 per_host_limit: int = 4, per_host_rate: float = 2.0, timeout: int = 10,
+                 max_retries: int = 2):
+        self.session = session or CachedSession()
+        self.base_url = base_url
+        self.workers = workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = HostLimiter(max_concurrent=per_host_limit, rate=per_host_rate,
+                                   burst=per_host_limit)
+        self._details = {}  # deck id -> details, so a deck is only ever read once
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str, params: Optional[Dict] = None) -> Optional[bytes]:
+        """Page body, or None if it couldn't be fetched"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.limiter.slot(url):
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = e
+            else:
+                if response.status_code == 200:
+                    return response.content
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"❌ {url}: HTTP {response.status_code}")
+                    return None
+                error = f"HTTP {response.status_code}"
+            if attempt < self.max_retries:
+                time.sleep(min(2 ** attempt, 10))
+        print(f"❌ {url}: {error}")
+        return None
+
+    def deck_url(self, deck_id: str) -> str:
+        return f"{self.base_url}/shared/info/{deck_id}"
+
+    def parse_search(self, content: bytes, category: str) -> List[Dict]:
+        """Decks linked from a search results page, once each, in page order"""
+        decks, seen = [], set()
+        for link in extract_links(content):
+            if '/shared/info/' not in link.href:
+                continue
+            deck_id = link.href.rstrip('/').split('/')[-1]
+            if deck_id in seen or len(link.text) <= 3:
+                continue
+            seen.add(deck_id)
+            decks.append({
+                'id': deck_id,
+                'name': link.text,
+                'category': category,
+                'url': self.deck_url(deck_id),
+                'download_url': f"{self.base_url}/shared/download/{deck_id}"
+            })
+        return decks
+
+    def search(self, term: str, sort: str = "downloads") -> List[Dict]:
+        """Shared decks matching `term`"""
+        content = self.fetch(f"{self.base_url}/shared/decks/", params={'search': term, 'sort': sort})
+        return self.parse_search(content, term) if content is not None else []
+
+    def search_all(self, terms: Iterable[str], sort: str = "downloads") -> List[Dict]:
+        """
+        Search every term concurrently. Each deck appears once, under the
+        first term that found it ('category'), with every matching term
+        listed in 'categories'.
+        """
+        terms = list(terms)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda term: self.search(term, sort), terms))
+
+        decks = {}
+        for term, found in zip(terms, results):
+            print(f"📚 {term}: {len(found)} decks")
+            for deck in found:
+                if deck['id'] in decks:
+                    decks[deck['id']]['categories'].append(term)
+                else:
+                    decks[deck['id']] = dict(deck, categories=[term])
+        return list(decks.values())
+
+    def parse_details(self, content: bytes, deck: Dict) -> Dict:
+        soup = BeautifulSoup(content, 'html.parser')
+        details = {
+            'id': deck['id'],
+            'name': deck['name'],
+            'category': deck.get('category', ''),
+            'categories': deck.get('categories', [deck.get('category', '')]),
+            'description': '',
+            'card_count': 0,
+            'downloads': 0,
+            'rating': 0,
+            'tags': [],
+            'last_updated': '',
+            'download_url': deck.get('download_url', f"{self.base_url}/shared/download/{deck['id']}")
+        }
+
+        description = soup.find('div', class_='description')
+        if description:
+            details['description'] = description.get_text(strip=True)
+        for field, word in (('card_count', 'cards'), ('downloads', 'downloads')):
+            text = soup.find(string=lambda text: text and word in text.lower())
+            if text and _leading_int(text) is not None:
+                details[field] = _leading_int(text)
+        return details
+
+    def deck_details(self, deck: Dict) -> Dict:
+        """Details from the deck's info page; the search result itself if the page can't be read"""
+        with self._lock:
+            if deck['id'] in self._details:
+                return self._details[deck['id']]
+        content = self.fetch(deck.get('url') or self.deck_url(deck['id']))
+        if content is None:
+            return deck
+        try:
+            details = self.parse_details(content, deck)
+        except Exception as e:
+            print(f"❌ {deck['name']}: could not parse deck page: {e}")
+            return deck
+        # Only successful reads are kept; a failed deck is tried again next time
+        with self._lock:
+            self._details[deck['id']] = details
+        return details
+
+    def details_all(self, decks: Iterable[Dict]) -> List[Dict]:
+        """Details for every deck, fetched concurrently, in the order given"""
+        decks = list(decks)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            details = []
+            for i, detail in enumerate(pool.map(self.deck_details, decks), 1):
+                print(f"📖 [{i}/{len(decks)}] {detail['name']}")
+                details.append(detail)
+        return details
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Batch Past Paper Processing
+=================================================
+Scan a directory tree of past papers, pair every question paper with its mark
+scheme, parse the questions and answers of each pair in parallel, join them a
+batch of papers at a time (one indexed pass, with one summary of what didn't
+match) and stream the results into one JSONL file. A processed-paper manifest
+next to the output records every pair's content hash and extractor version,
+so re-runs skip pairs whose PDFs and extractor are unchanged and pick up where
+an interrupted run stopped. Pairs that fail are recorded in the manifest with
+their error rather than in the JSONL, and are tried again on the next run.
+
+    python batch_process_papers.py physics_9702_winter_2022 -o physics_9702.jsonl
+    python batch_process_papers.py --subject-code 9702 --variant 2 --since 2018   # downloaded papers in the catalog
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from download_winter_papers import WinterPapersDownloader
+from extract_mcq_options_v5 import MCQOptionsExtractorV5
+from extract_theory_questions import TheoryQuestionExtractor
+from paper_catalog import PaperCatalog
+from paper_join import JoinReport, join_papers
+from processing_manifest import ProcessingManifest, append_jsonl, content_hash
+
+# Paper 1 is multiple choice; every other component is structured/theory
+MCQ_COMPONENTS = {'1'}
+
+_extractors = {}
+
+
+def pair_id(info: Dict[str, str]) -> str:
+    """9702_w22_12 - identifies a QP/MS pair regardless of type"""
+    return f"{info['subject_code']}_{info['session']}{info['year']}_{info['paper_component']}{info['variant']}"
+
+
+def find_paper_pairs(root: str) -> Tuple[List[Dict], List[str]]:
+    """All QP/MS pairs under `root`, plus the papers that have no partner"""
+    papers = {}
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if not name.lower().endswith('.pdf'):
+                continue
+            info = WinterPapersDownloader._parse_physics_filename(name[:-4])
+            if not info or info['type'] not in ('qp', 'ms'):
+                continue
+            papers.setdefault(pair_id(info), {})[info['type']] = (os.path.join(directory, name), info)
+
+    pairs, unpaired = [], []
+    for key in sorted(papers):
+        found = papers[key]
+        if 'qp' in found and 'ms' in found:
+            qp_path, info = found['qp']
+            pairs.append({
+                'pair_id': key,
+                'question_paper': qp_path,
+                'mark_scheme': found['ms'][0],
+                'subject_code': info['subject_code'],
+                'session': info['session'],
+                'year': info['year'],
+                'paper_component': info['paper_component'],
+                'variant': info['variant'],
+                'kind': 'mcq' if info['paper_component'] in MCQ_COMPONENTS else 'theory'
+            })
+        else:
+            unpaired.extend(path for path, _ in found.values())
+    return pairs, unpaired
+
+
+def catalog_paper_pairs(catalog: PaperCatalog, subject_code: str, variant: Optional[str] = None,
+                        year_from: Optional[int] = None) -> Tuple[List[Dict], List[str]]:
+    """Catalogued QP/MS pairs whose PDFs have both been downloaded, plus the downloaded papers without a partner"""
+    pairs, paired = [], set()
+    for qp, ms in catalog.pairs(subject_code, variant=variant, year_from=year_from):
+        if not all(paper['local_path'] and os.path.exists(paper['local_path']) for paper in (qp, ms)):
+            continue
+        paired.update((qp['url'], ms['url']))
+        info = {'subject_code': qp['subject_code'], 'session': qp['session'], 'year': f"{qp['year'] % 100:02d}",
+                'paper_component': qp['paper'], 'variant': qp['variant']}
+        pairs.append({
+            'pair_id': pair_id(info),
+            'question_paper': qp['local_path'],
+            'mark_scheme': ms['local_path'],
+            **info,
+            'kind': 'mcq' if info['paper_component'] in MCQ_COMPONENTS else 'theory'
+        })
+    unpaired = [paper['local_path'] for paper in catalog.find(subject_code=subject_code, variant=variant,
+                                                              year_from=year_from, paper_type=('qp', 'ms'),
+                                                              downloaded=True)
+                if paper['url'] not in paired]
+    return sorted(pairs, key=lambda pair: pair['pair_id']), unpaired
+
+
+def extractor_version(kind: str, layout: bool = False) -> str:
+    if kind == 'mcq':
+        return MCQOptionsExtractorV5.EXTRACTOR_VERSION + ('+layout' if layout else '')
+    return TheoryQuestionExtractor.EXTRACTOR_VERSION
+
+
+def _init_worker():
+    # Each worker already owns a core; don't start another pool inside it
+    from pdf_text_extractor import configure_extractor
+    configure_extractor(max_workers=1)
+
+
+def get_extractor(kind: str, layout: bool = False):
+    """This process's extractor for a paper kind"""
+    if kind not in _extractors:
+        _extractors[kind] = MCQOptionsExtractorV5(layout=layout) if kind == 'mcq' else TheoryQuestionExtractor()
+    return _extractors[kind]
+
+
+def process_pair(pair: Dict, layout: bool = False) -> Dict:
+    """Parse the questions and answers of one QP/MS pair; runs inside a worker process"""
+    start = time.time()
+    record = dict(pair)
+    record['result'] = None
+    try:
+        extractor = get_extractor(pair['kind'], layout)
+        if pair['kind'] == 'mcq':
+            parsed = extractor.parse_paper(pair['question_paper'], pair['mark_scheme'])
+        else:
+            parsed = extractor.parse_theory_paper(pair['question_paper'], pair['mark_scheme'])
+
+        record['status'] = 'ok' if parsed is not None else 'failed'
+        if parsed is None:
+            record['error'] = 'Failed to extract text from one or both PDFs'
+        else:
+            record.update(parsed)
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = str(e)
+    record['seconds'] = round(time.time() - start, 3)
+    return record
+
+
+def join_records(records: List[Dict], layout: bool = False) -> List[JoinReport]:
+    """
+    Join the questions and answers of every parsed record in one pass per paper
+    kind and build each record's result from its share of the join; returns the join reports
+    """
+    reports = []
+    for kind in ('mcq', 'theory'):
+        parsed = [record for record in records if record['kind'] == kind and record['status'] == 'ok']
+        if not parsed:
+            continue
+        extractor = get_extractor(kind, layout)
+        joined, report = join_papers(((record['pair_id'], record['questions'], record['answers'])
+                                      for record in parsed), key=extractor.JOIN_KEY)
+        for record in parsed:
+            questions, answers = record.pop('questions'), record.pop('answers')
+            qa_pairs = extractor.pairs_from_join(joined[record['pair_id']])
+            if kind == 'mcq':
+                record['result'] = extractor.build_result(record['question_paper'], record['mark_scheme'],
+                                                          questions, qa_pairs)
+            else:
+                record['result'] = extractor.build_result(record['question_paper'], record['mark_scheme'],
+                                                          questions, answers, qa_pairs)
+        reports.append(report)
+    return reports
+
+
+def run_batch(root: str, output_file: str, workers: int = None, resume: bool = True,
+              layout: bool = False, manifest_path: str = None,
+              pairs: Optional[Tuple[List[Dict], List[str]]] = None, join_batch: int = 32) -> Dict:
+    """
+    Process every pair under `root` (or the given `pairs`, as returned by
+    find_paper_pairs/catalog_paper_pairs) into `output_file`, joining questions
+    and answers `join_batch` papers at a time; returns run statistics
+    """
+    pairs, unpaired = pairs if pairs is not None else find_paper_pairs(root)
+    manifest = ProcessingManifest(manifest_path or os.path.splitext(output_file)[0] + '.manifest.sqlite')
+    if not resume:
+        for kind in ('mcq', 'theory'):
+            manifest.forget(f"batch_{kind}")
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(output_file, 'w').close()
+
+    todo = []
+    for pair in pairs:
+        pair['content_hash'] = content_hash([pair['question_paper'], pair['mark_scheme']])
+        pair['extractor_version'] = extractor_version(pair['kind'], layout)
+        if not manifest.is_current(pair['pair_id'], f"batch_{pair['kind']}",
+                                   pair['extractor_version'], pair['content_hash']):
+            todo.append(pair)
+
+    print(f"Found {len(pairs)} QP/MS pairs in {root} ({len(unpaired)} unpaired files)")
+    print(f"Skipping {len(pairs) - len(todo)} already processed, {len(todo)} to go")
+
+    stats = {'pairs': len(pairs), 'skipped': len(pairs) - len(todo), 'ok': 0, 'failed': 0,
+             'unpaired': unpaired}
+    if not todo:
+        manifest.close()
+        return stats
+
+    def write(records):
+        for report in join_records(records, layout):
+            print(report.summary())
+        for record in records:
+            if record['status'] != 'ok':
+                # Failures live in the manifest only, so retrying them doesn't pile up error lines
+                manifest.record(record['pair_id'], f"batch_{record['kind']}", record['content_hash'],
+                                record['extractor_version'], status=record['status'], error=record.get('error'))
+                continue
+            offset = append_jsonl(output_file, record)
+            manifest.record(record['pair_id'], f"batch_{record['kind']}", record['content_hash'],
+                            record['extractor_version'], output_file, offset, record['status'])
+
+    start = time.time()
+    parsed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(process_pair, pair, layout) for pair in todo]
+        for future in as_completed(futures):
+            record = future.result()
+            parsed.append(record)
+            stats[record['status']] += 1
+            error = f" ({record['error']})" if record.get('error') else ''
+            print(f"[{stats['ok'] + stats['failed']}/{len(todo)}] {record['pair_id']}: {record['status']}{error}")
+            if len(parsed) >= join_batch:
+                write(parsed)
+                parsed = []
+        if parsed:
+            write(parsed)
+
+    manifest.close()
+    stats['seconds'] = round(time.time() - start, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-extract Q&A from QP/MS past paper pairs")
+    parser.add_argument('root', nargs='?', help="directory tree containing *_qp_*.pdf and *_ms_*.pdf files")
+    parser.add_argument('--subject-code', help="process this subject's downloaded papers from the paper catalog instead")
+    parser.add_argument('--variant', help="with --subject-code: only this variant")
+    parser.add_argument('--since', type=int, help="with --subject-code: only papers from this year on")
+    parser.add_argument('-o', '--output', default='batch_papers.jsonl', help="JSONL output file")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--restart', action='store_true', help="ignore and overwrite previous results")
+    parser.add_argument('--layout', action='store_true', help="use layout-aware MCQ option extraction")
+    parser.add_argument('--join-batch', type=int, default=32, help="papers whose questions and answers are joined together")
+    args = parser.parse_args()
+    if not args.root and not args.subject_code:
+        parser.error("give a directory or --subject-code")
+
+    pairs = None
+    if args.subject_code:
+        with PaperCatalog() as catalog:
+            pairs = catalog_paper_pairs(catalog, args.subject_code, args.variant, args.since)
+
+    stats = run_batch(catalog.path if args.subject_code else args.root, args.output, workers=args.workers,
+                      resume=not args.restart, layout=args.layout, pairs=pairs, join_batch=args.join_batch)
+
+    print("\n=== BATCH COMPLETE ===")
+    print(f"Pairs: {stats['pairs']}, skipped: {stats['skipped']}, ok: {stats['ok']}, failed: {stats['failed']}")
+    if stats['unpaired']:
+        print(f"Unpaired files: {', '.join(os.path.basename(p) for p in stats['unpaired'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Link Extraction Benchmark
+===============================================
+Time the old BeautifulSoup(html.parser) + find_all('a') path against the
+link_extractor backends on a listing page, and check they find the same links.
+
+    python benchmark_link_extraction.py                  # synthetic 3000-entry listing
+    python benchmark_link_extraction.py page.html -n 20  # a saved page
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from link_extractor import HAS_LXML, Link, extract_links
+
+
+def synthetic_listing(entries: int = 3000) -> bytes:
+    """A pastpapers.co-style directory listing: a table row of markup around every link"""
+    rows = []
+    for i in range(entries):
+        name = f"9702_s22_qp_{i % 50:02d}_{i}.pdf"
+        rows.append(
+            f'<tr class="file"><td class="icon"><img src="/icons/pdf.svg" alt=""></td>'
+            f'<td class="name"><a href="/cie/?dir=A-Level/Physics-9702/2022-May-June/{name}" '
+            f'title="{name}">{name}</a></td><td class="size">{100 + i} KB</td>'
+            f'<td class="date">2022-08-{1 + i % 28:02d}</td></tr>')
+    return (
+        '<!DOCTYPE html><html><head><title>Physics 9702</title>'
+        '<script>var config = {"a": "<a href=\'x\'>"};</script></head><body>'
+        '<nav><a href="/">Home</a> <a href="/cie/?dir=A-Level">A-Level</a></nav>'
+        '<table>' + ''.join(rows) + '</table></body></html>'
+    ).encode('utf-8')
+
+
+def soup_links(content: bytes, parser: str = 'html.parser', strainer: bool = False):
+    soup = BeautifulSoup(content, parser, parse_only=SoupStrainer('a') if strainer else None)
+    return [Link(a.get('href'), a.get_text(strip=True), a.get('title') or '')
+            for a in soup.find_all('a', href=True)]
+
+
+def time_it(function, repeat: int) -> float:
+    """Best-of-`repeat` wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing-page link extraction")
+    parser.add_argument('page', nargs='?', help="saved HTML page (default: synthetic listing)")
+    parser.add_argument('-n', '--repeat', type=int, default=10)
+    parser.add_argument('--entries', type=int, default=3000, help="links in the synthetic listing")
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, 'rb') as f:
+            content = f.read()
+    else:
+        content = synthetic_listing(args.entries)
+
+    candidates = [
+        ("BeautifulSoup html.parser (old)", lambda: soup_links(content)),
+        ("BeautifulSoup html.parser + SoupStrainer", lambda: soup_links(content, strainer=True)),
+        ("extract_links, html.parser stream", lambda: extract_links(content, use_lxml=False)),
+    ]
+    if HAS_LXML:
+        candidates[2:2] = [("BeautifulSoup lxml + SoupStrainer", lambda: soup_links(content, 'lxml', True))]
+        candidates.append(("extract_links, lxml", lambda: extract_links(content, use_lxml=True)))
+
+    expected = soup_links(content)
+    print(f"Page: {len(content) / 1024:.0f} KB, {len(expected)} links, best of {args.repeat} runs\n")
+
+    baseline = None
+    for name, function in candidates:
+        found = function()
+        elapsed = time_it(function, args.repeat)
+        baseline = baseline or elapsed
+        same = "same links" if found == expected else f"DIFFERENT ({len(found)} links)"
+        print(f"  {name:<42} {elapsed:9.1f} ms  {baseline / elapsed:5.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
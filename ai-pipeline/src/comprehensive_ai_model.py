@@ -1,9 +1,12 @@
-import json
 import os
 import time
 from typing import Dict, List, Optional, Tuple
 import random
 
+from knowledge_shards import ShardedKnowledgeBase
+from query_cache import QueryCache
+from semantic_retriever import CardEncoder
+
 class ComprehensiveAIModel:
     """
     Comprehensive AI Model for:
@@ -53,6 +56,20 @@ class ComprehensiveAIModel:
             'creative': 'Imaginative, engaging explanations'
         }
         
+        # Example phrases used to recognise chatbot intents semantically
+        self.intent_examples = {
+            'tutoring_request': ['can you explain this to me', 'help me understand this topic',
+                                 'teach me how this works', 'I need a tutor for this'],
+            'flashcard_request': ['make me some flashcards', 'quiz me on this topic',
+                                  'create revision cards'],
+            'notes_request': ['write study notes for this topic', 'summarise this chapter',
+                              'give me a summary to study from'],
+            'greeting': ['hello there', 'hi, how are you', 'good morning']
+        }
+        
+        # Memoized lookups and responses, keyed on normalized arguments + knowledge base version
+        self.query_cache = QueryCache(max_entries=2048, ttl_seconds=1800)
+        
         # Initialize model components
         self.initialize_model_components()
         
@@ -69,58 +86,27 @@ class ComprehensiveAIModel:
             'content_generator': self.initialize_content_generator(),
             'personalization_engine': self.initialize_personalization_engine()
         }
+        self.components['semantic_retrieval'] = self.initialize_semantic_retrieval()
         
         print("✅ All model components initialized successfully!")
     
     def load_knowledge_base(self) -> Dict:
-        """Load the massive knowledge base from our generated flashcards"""
-        print("📚 Loading massive knowledge base...")
-        
-        knowledge_base = {
-            'english': {},
-            'humanities': {},
-            'complex_subjects': {},
-            'metadata': {}
-        }
+        """Load the knowledge base as per-subject shards of our generated flashcards"""
+        print("📚 Loading sharded knowledge base...")
         
-        # Load English knowledge
-        try:
-            with open('generated_flashcards/massive_english_consolidated.json', 'r', encoding='utf-8') as f:
-                english_data = json.load(f)
-                knowledge_base['english'] = {
-                    'cards': english_data['cards'],
-                    'total_cards': english_data['total_cards'],
-                    'categories': english_data['categories']
-                }
-                print(f"✅ Loaded {english_data['total_cards']:,} English cards")
-        except Exception as e:
-            print(f"⚠️ Error loading English data: {e}")
-        
-        # Load Humanities knowledge
-        try:
-            with open('generated_flashcards/massive_humanities_consolidated.json', 'r', encoding='utf-8') as f:
-                humanities_data = json.load(f)
-                knowledge_base['humanities'] = {
-                    'cards': humanities_data['cards'],
-                    'total_cards': humanities_data['total_cards'],
-                    'categories': humanities_data['categories']
-                }
-                print(f"✅ Loaded {humanities_data['total_cards']:,} Humanities cards")
-        except Exception as e:
-            print(f"⚠️ Error loading Humanities data: {e}")
-        
-        # Load Complex Subjects knowledge
-        try:
-            with open('generated_flashcards/massive_complex_subjects_consolidated.json', 'r', encoding='utf-8') as f:
-                complex_data = json.load(f)
-                knowledge_base['complex_subjects'] = {
-                    'cards': complex_data['cards'],
-                    'total_cards': complex_data['total_cards'],
-                    'categories': complex_data['categories']
-                }
-                print(f"✅ Loaded {complex_data['total_cards']:,} Complex Subjects cards")
-        except Exception as e:
-            print(f"⚠️ Error loading Complex Subjects data: {e}")
+        shards = ShardedKnowledgeBase({
+            'english': 'generated_flashcards/massive_english_consolidated.json',
+            'humanities': 'generated_flashcards/massive_humanities_consolidated.json',
+            'complex_subjects': 'generated_flashcards/massive_complex_subjects_consolidated.json'
+        })
+        
+        knowledge_base = {'shards': shards}
+        
+        # Per-domain totals come from the shard manifest; cards load on first query
+        for domain in ['english', 'humanities', 'complex_subjects']:
+            knowledge_base[domain] = shards.domain_stats(domain)
+            print(f"✅ {domain}: {knowledge_base[domain]['total_cards']:,} cards "
+                  f"in {len(knowledge_base[domain]['shards'])} shards")
         
         # Calculate total knowledge
         total_cards = sum([
@@ -138,6 +124,26 @@ class ComprehensiveAIModel:
         print(f"🎯 Total knowledge base: {total_cards:,} cards")
         return knowledge_base
     
+    def initialize_semantic_retrieval(self) -> Dict:
+        """Set up the shared encoder; shard indexes are built lazily on first query"""
+        print("🔎 Initializing semantic retrieval...")
+        
+        encoder = CardEncoder()
+        self.components['knowledge_base']['shards'].encoder = encoder
+        
+        intent_labels = []
+        intent_phrases = []
+        for intent, phrases in self.intent_examples.items():
+            intent_labels.extend([intent] * len(phrases))
+            intent_phrases.extend(phrases)
+        
+        print(f"✅ Semantic retrieval ready ({encoder.backend} encoder, {encoder.dim} dims)")
+        return {
+            'encoder': encoder,
+            'intent_labels': intent_labels,
+            'intent_vectors': encoder.encode(intent_phrases)
+        }
+    
     def initialize_learning_engine(self) -> Dict:
         """Initialize the adaptive learning engine"""
         print("🧠 Initializing adaptive learning engine...")
@@ -279,8 +285,10 @@ class ComprehensiveAIModel:
         """Generate a personalized flashcard"""
         print(f"🎯 Generating flashcard for: {topic} ({subject}, {difficulty})")
         
-        # Find relevant knowledge in the knowledge base
-        relevant_cards = self.find_relevant_knowledge(topic, subject)
+        # Find relevant knowledge in the knowledge base (cached; the card is still picked at random)
+        relevant_cards = self.cached_query('relevant_knowledge',
+                                           lambda: self.find_relevant_knowledge(topic, subject),
+                                           topic, subject)
         
         if not relevant_cards:
             return self.create_new_flashcard(topic, subject, difficulty, style)
@@ -311,6 +319,11 @@ class ComprehensiveAIModel:
         """Generate comprehensive study notes"""
         print(f"📝 Creating study notes for: {topic} ({subject}, {detail_level})")
         
+        return self.cached_query('study_notes',
+                                 lambda: self._build_study_notes(topic, subject, detail_level, style),
+                                 topic, subject, detail_level, style)
+    
+    def _build_study_notes(self, topic: str, subject: str, detail_level: str, style: str) -> Dict:
         # Gather all relevant information
         relevant_cards = self.find_relevant_knowledge(topic, subject)
         
@@ -335,6 +348,11 @@ class ComprehensiveAIModel:
         """Provide AI tutoring for a specific question"""
         print(f"👨‍🏫 Providing tutoring for: {question[:50]}...")
         
+        return self.cached_query('tutoring',
+                                 lambda: self._build_tutoring(question, subject, user_level, teaching_style),
+                                 question, subject, user_level, teaching_style)
+    
+    def _build_tutoring(self, question: str, subject: str, user_level: str, teaching_style: str) -> Dict:
         # Find relevant knowledge
         relevant_cards = self.find_relevant_knowledge(question, subject)
         
@@ -385,39 +403,30 @@ class ComprehensiveAIModel:
             'model_version': self.version
         }
     
-    def find_relevant_knowledge(self, topic: str, subject: str) -> List[Dict]:
-        """Find relevant knowledge from the knowledge base"""
-        relevant_cards = []
-        
-        # Search in appropriate domain
-        if subject.lower() in ['english', 'language', 'literature', 'grammar']:
-            domain = 'english'
-        elif subject.lower() in ['history', 'geography', 'philosophy', 'sociology', 'psychology']:
-            domain = 'humanities'
-        elif subject.lower() in ['physics', 'chemistry', 'mathematics', 'biology', 'computer science']:
-            domain = 'complex_subjects'
-        else:
-            # Search in all domains
-            for domain_name in ['english', 'humanities', 'complex_subjects']:
-                if domain_name in self.components['knowledge_base']:
-                    relevant_cards.extend(self.components['knowledge_base'][domain_name].get('cards', []))
-            return relevant_cards
-        
-        # Search in specific domain
-        if domain in self.components['knowledge_base']:
-            domain_cards = self.components['knowledge_base'][domain].get('cards', [])
-            
-            # Simple keyword matching (can be enhanced with semantic search)
-            topic_lower = topic.lower()
-            for card in domain_cards:
-                front = card.get('front', '').lower()
-                back = card.get('back', '').lower()
-                
-                if (topic_lower in front or topic_lower in back or 
-                    any(word in front or word in back for word in topic_lower.split())):
-                    relevant_cards.append(card)
-        
-        return relevant_cards
+    def cached_query(self, namespace: str, compute, *args):
+        """Memoize `compute()` on normalized args, dropping everything if the decks changed"""
+        knowledge_base = self.components['knowledge_base']
+        shards = knowledge_base['shards']
+        if shards.refresh_if_changed():
+            self.query_cache.clear()
+            for domain in ['english', 'humanities', 'complex_subjects']:
+                knowledge_base[domain] = shards.domain_stats(domain)
+            knowledge_base['metadata']['total_cards'] = sum(
+                knowledge_base[domain]['total_cards'] for domain in ['english', 'humanities', 'complex_subjects']
+            )
+            knowledge_base['metadata']['loaded_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        
+        key = self.query_cache.make_key(namespace, shards.version, *args)
+        result = self.query_cache.get_or_compute(key, compute)
+        if isinstance(result, dict) and 'generated_at' in result:
+            # A cache hit is served now, not when it was first computed
+            result['generated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        return result
+    
+    def find_relevant_knowledge(self, topic: str, subject: str, top_k: int = 50,
+                                min_score: float = 0.3) -> List[Dict]:
+        """Find relevant knowledge in the shards routed to for this subject"""
+        return self.components['knowledge_base']['shards'].search(topic, subject, top_k, min_score)
     
     def enhance_question(self, base_question: str, difficulty: str) -> str:
         """Enhance question based on difficulty level"""
@@ -561,8 +570,16 @@ class ComprehensiveAIModel:
         
         return resources
     
-    def analyze_user_intent(self, user_message: str) -> str:
+    def analyze_user_intent(self, user_message: str, min_similarity: float = 0.5) -> str:
         """Analyze user intent from message"""
+        semantic = self.components.get('semantic_retrieval')
+        if semantic and user_message.strip():
+            similarities = semantic['intent_vectors'] @ semantic['encoder'].encode([user_message])[0]
+            best = int(similarities.argmax())
+            if similarities[best] >= min_similarity:
+                return semantic['intent_labels'][best]
+        
+        # Keyword fallback for messages that match no example closely
         message_lower = user_message.lower()
         
         if any(word in message_lower for word in ['help', 'explain', 'teach', 'tutor']):
@@ -608,15 +625,18 @@ class ComprehensiveAIModel:
             'knowledge_base_stats': {
                 'total_cards': self.components['knowledge_base'].get('metadata', {}).get('total_cards', 0),
                 'domains': list(self.knowledge_domains.keys()),
+                'shards': self.components['knowledge_base']['shards'].get_stats(),
                 'loaded_at': self.components['knowledge_base'].get('metadata', {}).get('loaded_at', 'Unknown')
             },
+            'query_cache': self.query_cache.get_stats(),
             'components_status': {
                 'knowledge_base': '✅ Loaded',
                 'learning_engine': '✅ Initialized',
                 'tutoring_system': '✅ Initialized',
                 'chatbot_engine': '✅ Initialized',
                 'content_generator': '✅ Initialized',
-                'personalization_engine': '✅ Initialized'
+                'personalization_engine': '✅ Initialized',
+                'semantic_retrieval': f"✅ {self.components['semantic_retrieval']['encoder'].backend} encoder"
             },
             'ready_for_use': True
         }
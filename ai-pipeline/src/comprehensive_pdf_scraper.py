@@ -6,7 +6,6 @@ Follows the exact structure: Subject → Exam Board → Topic → PDFs
 Handles both direct /download/ URLs and /pdf-pages/?pdf= wrapper URLs
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
@@ -14,14 +13,17 @@ import time
 import random
 import re
 from urllib.parse import urljoin, unquote
-from bs4 import BeautifulSoup
+
+from http_cache import CachedSession
+from link_extractor import extract_links, filter_links
+from paper_catalog import PaperCatalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ComprehensivePDFScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
@@ -110,16 +112,16 @@ class ComprehensivePDFScraper:
             if response.status_code != 200:
                 return {}
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page_links = extract_links(response.content)
             
             # Look for exam board links (AQA, Edexcel, OCR, etc.)
             exam_board_patterns = ['aqa', 'edexcel', 'ocr', 'caie', 'wjec', 'eduqas']
             exam_board_links = {}
             
             for pattern in exam_board_patterns:
-                links = soup.find_all('a', href=re.compile(pattern, re.IGNORECASE))
+                links = filter_links(page_links, pattern)
                 for link in links:
-                    href = link.get('href', '')
+                    href = link.href
                     if href and ('past-papers' in href or 'revision' in href):
                         exam_board_name = pattern.upper()
                         exam_board_url = urljoin(subject_url, href)
@@ -140,16 +142,14 @@ class ComprehensivePDFScraper:
             if response.status_code != 200:
                 return {}
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # Look for topic links (Cell Biology, Organic Chemistry, etc.)
             topic_links = {}
             
             # Look for links that might be topics
-            all_links = soup.find_all('a', href=True)
+            all_links = extract_links(response.content)
             for link in all_links:
-                href = link.get('href', '')
-                link_text = link.get_text(strip=True)
+                href = link.href
+                link_text = link.text
                 
                 # Check if this looks like a topic link
                 if (href and 
@@ -174,21 +174,21 @@ class ComprehensivePDFScraper:
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page_links = extract_links(response.content)
             
             pdf_links = []
             
             # Look for PDF links in the /pdf-pages/?pdf= structure (new structure)
-            pdf_page_links = soup.find_all('a', href=re.compile(r'pdf-pages\?pdf=', re.IGNORECASE))
+            pdf_page_links = filter_links(page_links, r'pdf-pages\?pdf=')
             
             for link in pdf_page_links:
-                href = link.get('href', '')
+                href = link.href
                 if href:
                     # Extract the actual PDF URL from the query parameter
                     actual_pdf_url = self._extract_actual_pdf_url(href)
                     
                     if actual_pdf_url:
-                        pdf_title = link.get_text(strip=True) or 'Untitled'
+                        pdf_title = link.text or 'Untitled'
                         
                         pdf_info = {
                             'url': actual_pdf_url,
@@ -205,13 +205,13 @@ class ComprehensivePDFScraper:
                         logger.info(f"            📄 Found PDF (wrapper): {pdf_title}")
             
             # Also look for direct PDF links that might exist
-            direct_pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+            direct_pdf_links = filter_links(page_links, r'\.pdf$')
             
             for link in direct_pdf_links:
-                href = link.get('href', '')
+                href = link.href
                 if href:
                     pdf_url = href if href.startswith('http') else urljoin(topic_url, href)
-                    pdf_title = link.get_text(strip=True) or 'Untitled'
+                    pdf_title = link.text or 'Untitled'
                     
                     pdf_info = {
                         'url': pdf_url,
@@ -267,7 +267,10 @@ class ComprehensivePDFScraper:
         with open(content_file, 'w') as f:
             json.dump(data, f, indent=2)
         
-        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file}")
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(self.found_pdfs, source='PMT')
+        
+        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file} and {catalog.path}")
         self._show_summary()
         
         return content_file
@@ -5,7 +5,6 @@ NOTICAL AI Pipeline - Comprehensive Subject Scraper
 Find and scrape ALL available subjects on PMT
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
@@ -13,14 +12,16 @@ import time
 import random
 import re
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+
+from http_cache import CachedSession
+from link_extractor import link_soup
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ComprehensiveSubjectScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
@@ -39,7 +40,7 @@ class ComprehensiveSubjectScraper:
                 logger.error("Failed to access main page")
                 return {}
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = link_soup(response.content)
             
             # Look for subject navigation links
             subject_links = []
@@ -111,7 +112,7 @@ class ComprehensiveSubjectScraper:
             if response.status_code != 200:
                 return
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = link_soup(response.content)
             
             # Look for PDF links and educational content
             pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
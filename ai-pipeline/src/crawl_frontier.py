@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Crawl Frontier
+====================================
+Breadth-first crawling on a thread pool: a priority frontier of pages to visit
+(deduplicated by URL), per-host politeness through the shared HostLimiter,
+retries with exponential backoff, and periodic checkpoints of the frontier so
+an interrupted crawl resumes where it stopped.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag
+
+import requests
+
+from rate_limiter import HostLimiter
+
+logger = logging.getLogger(__name__)
+
+# handler(task, page content) -> (result passed to on_result, follow-up tasks)
+Handler = Callable[[Dict, bytes], Tuple[Any, List[Dict]]]
+
+# Statuses worth retrying; anything else non-200 fails the page straight away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    pass
+
+
+class CrawlFrontier:
+    """
+    Pages still to visit, ordered by priority (lowest first; the crawler uses
+    depth, which makes the crawl breadth-first) and then by insertion. Every
+    URL is accepted once; failed pages come back through retry() after a delay.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.delayed = []  # (ready_at, seq, task)
+        self.seen = set()
+        self.counter = itertools.count()
+
+    @staticmethod
+    def key(url: str) -> str:
+        return urldefrag(url)[0]
+
+    def push(self, task: Dict, priority: Optional[int] = None) -> bool:
+        """Queue `task` unless its URL has been queued before; returns whether it was added"""
+        url = self.key(task['url'])
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        if priority is None:
+            priority = task.get('depth', 0)
+        heapq.heappush(self.heap, (priority, next(self.counter), task))
+        return True
+
+    def requeue(self, task: Dict):
+        """Queue a task whose URL was seen before (a failed page from an earlier run)"""
+        self.seen.add(self.key(task['url']))
+        heapq.heappush(self.heap, (task.get('depth', 0), next(self.counter), task))
+
+    def retry(self, task: Dict, delay: float):
+        heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.counter), task))
+
+    def _release_delayed(self):
+        now = time.monotonic()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, seq, task = heapq.heappop(self.delayed)
+            heapq.heappush(self.heap, (task.get('depth', 0), seq, task))
+
+    def pop(self) -> Optional[Dict]:
+        """The next ready task, or None if nothing is ready yet"""
+        self._release_delayed()
+        if not self.heap:
+            return None
+        return heapq.heappop(self.heap)[2]
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until the earliest delayed retry is ready (None if there are none)"""
+        if not self.delayed:
+            return None
+        return max(0.0, self.delayed[0][0] - time.monotonic())
+
+    def pending(self) -> List[Dict]:
+        return [task for _, _, task in sorted(self.heap)] + [task for _, _, task in sorted(self.delayed)]
+
+    def __len__(self):
+        return len(self.heap) + len(self.delayed)
+
+    def to_dict(self, in_flight: Iterable[Dict] = ()) -> Dict:
+        # In-flight pages haven't been handled yet, so they go back on the queue
+        return {'pending': list(in_flight) + self.pending(), 'seen': sorted(self.seen)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CrawlFrontier':
+        frontier = cls()
+        for task in data.get('pending', []):
+            heapq.heappush(frontier.heap, (task.get('depth', 0), next(frontier.counter), task))
+        frontier.seen = set(data.get('seen', []))
+        return frontier
+
+
+class Crawler:
+    """
+    Visits pages with `workers` threads. Each task is a dict with at least
+    'url' and 'kind'; `handlers[kind]` parses the page in the worker thread and
+    returns (result, follow-up tasks). Results are passed to `on_result` on the
+    calling thread, so it can update shared state without locks.
+
+    With `checkpoint_path`, the frontier and `state` (a JSON-serialisable
+    dict the caller fills from on_result) are saved every `checkpoint_every`
+    pages and when the crawl stops; constructing a Crawler with the same
+    path picks both up again and queues the pages that failed for another try.
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], session=None, workers: int = 8,
+                 per_host_limit: int = 2, per_host_rate: float = 2.0, timeout: int = 30,
+                 max_retries: int = 3, backoff: float = 1.0,
+                 checkpoint_path: Optional[str] = None, checkpoint_every: int = 50):
+        self.handlers = handlers
+        self.session = session or requests.Session()
+        self.workers = workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.limiter = HostLimiter(max_concurrent=per_host_limit, rate=per_host_rate,
+                                   burst=per_host_limit)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+
+        self.frontier = CrawlFrontier()
+        self.state: Dict = {}
+        self.failures: List[Dict] = []
+        self.stats = {'fetched': 0, 'retried': 0, 'failed': 0}
+        self.resumed = False
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.frontier = CrawlFrontier.from_dict(data['frontier'])
+        self.state = data.get('state', {})
+        # Pages that failed last time get a fresh set of retries
+        failures = data.get('failures', [])
+        for failure in failures:
+            task = dict(failure.get('task') or {'url': failure['url'], 'kind': failure['kind']})
+            task.pop('attempts', None)
+            self.frontier.requeue(task)
+        self.resumed = True
+        logger.info(f"Resuming crawl from {self.checkpoint_path}: "
+                    f"{len(self.frontier)} pages pending ({len(failures)} failed before), "
+                    f"{len(self.frontier.seen)} seen")
+
+    def checkpoint(self, in_flight: Iterable[Dict] = ()):
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            'frontier': self.frontier.to_dict(in_flight),
+            'state': self.state,
+            'failures': self.failures,
+            'saved_at': time.time()
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def add(self, task: Dict) -> bool:
+        return self.frontier.push(task)
+
+    def fetch(self, url: str) -> bytes:
+        with self.limiter.slot(url):
+            response = self.session.get(url, timeout=self.timeout)
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.content
+
+    def _visit(self, task: Dict) -> Tuple[Any, List[Dict]]:
+        content = self.fetch(task['url'])
+        return self.handlers[task['kind']](task, content)
+
+    def _retryable(self, error: Exception) -> bool:
+        return isinstance(error, (RetryableError, requests.ConnectionError, requests.Timeout))
+
+    def run(self, seeds: Iterable[Dict] = (), on_result: Callable[[Dict, Any], None] = None) -> Dict:
+        """Crawl from `seeds` (plus anything left in a loaded checkpoint) until the frontier is empty"""
+        for task in seeds:
+            task.setdefault('depth', 0)
+            self.frontier.push(task)
+
+        in_flight = {}
+        handled = 0
+        start = time.time()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while len(self.frontier) or in_flight:
+                while len(in_flight) < self.workers:
+                    task = self.frontier.pop()
+                    if task is None:
+                        break
+                    in_flight[pool.submit(self._visit, task)] = task
+
+                if not in_flight:
+                    # Only delayed retries left; sleep until the first is due
+                    time.sleep(self.frontier.next_ready_in() or 0)
+                    continue
+
+                done, _ = wait(in_flight, timeout=self.frontier.next_ready_in(),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Stays in flight (and so in any checkpoint) until it has been handled
+                    task = in_flight[future]
+                    try:
+                        result, children = future.result()
+                    except Exception as e:
+                        del in_flight[future]
+                        self._failed(task, e)
+                        continue
+                    del in_flight[future]
+
+                    self.stats['fetched'] += 1
+                    if on_result is not None:
+                        on_result(task, result)
+                    for child in children:
+                        child.setdefault('depth', task.get('depth', 0) + 1)
+                        self.frontier.push(child)
+
+                    handled += 1
+                    if handled % self.checkpoint_every == 0:
+                        self.checkpoint(in_flight.values())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.checkpoint(in_flight.values())
+
+        self.stats['seconds'] = round(time.time() - start, 2)
+        return self.stats
+
+    def _failed(self, task: Dict, error: Exception):
+        attempts = task.get('attempts', 0) + 1
+        if attempts <= self.max_retries and self._retryable(error):
+            task['attempts'] = attempts
+            delay = self.backoff * 2 ** (attempts - 1)
+            logger.debug(f"Retrying {task['url']} in {delay:.1f}s ({error})")
+            self.frontier.retry(task, delay)
+            self.stats['retried'] += 1
+            return
+        logger.error(f"Giving up on {task['url']}: {error}")
+        self.failures.append({'url': task['url'], 'kind': task['kind'], 'error': str(error), 'task': task})
+        self.stats['failed'] += 1
@@ -1,8 +1,10 @@
-import json
 import os
 import glob
 from collections import defaultdict
 
+from deck_split import load_deck
+from near_duplicates import NearDuplicateIndex, card_text
+
 def check_data_quality():
     """Comprehensive data quality check for the massive flashcard dataset"""
     print("🔍 COMPREHENSIVE DATA QUALITY ASSESSMENT")
@@ -26,8 +28,7 @@ def check_data_quality():
         print(f"\n🔍 Analyzing: {os.path.basename(file_path)}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                deck_data = json.load(f)
+            deck_data = load_deck(file_path)
             
             deck_name = deck_data.get('name', 'Unknown')
             card_count = deck_data.get('total_cards', len(deck_data.get('cards', [])))
@@ -197,12 +198,16 @@ def check_for_duplicates(cards, deck_name):
     if duplicates:
         issues.append(f"Found {len(duplicates)} duplicate cards")
     
-    # Check for similar content (potential duplicates)
-    front_texts = [card.get('front', '').lower().strip() for card in cards]
-    unique_fronts = len(set(front_texts))
+    # Check for near-duplicates (template variants, reworded copies)
+    index = NearDuplicateIndex()
+    index.add_many(card_text(card) for card in cards)
+    clusters = index.cluster_positions()
     
-    if unique_fronts < len(cards) * 0.9:  # Less than 90% unique fronts
-        issues.append(f"Many similar front texts - potential duplicates")
+    if clusters:
+        redundant = sum(len(cluster) - 1 for cluster in clusters)
+        largest = clusters[0]
+        issues.append(f"Found {len(clusters)} near-duplicate clusters ({redundant} redundant cards), "
+                      f"largest: {len(largest)} × '{cards[largest[0]].get('front', '')[:50]}'")
     
     return issues
 
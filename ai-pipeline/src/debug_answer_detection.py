@@ -1,4 +1,4 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
 import re
 
 def debug_answer_detection():
@@ -11,11 +11,7 @@ def debug_answer_detection():
     print()
     
     # Extract text from mark scheme
-    doc = fitz.open(ms_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+    text = extract_text(ms_path)
     
     print(f"Total text length: {len(text)} characters")
     print()
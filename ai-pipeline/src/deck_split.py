@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Deck Split
+================================
+Single-pass train/test split for the deck generators. Every card is sent to
+training or testing by a stable hash of its normalised content, so the split
+is the same on every run and nothing has to be shuffled in memory. Digits,
+case and punctuation are dropped before hashing, so cards that differ only in
+those ("Entropy - Question 3", "Entropy - Question 4") land on the same side.
+That is all the streaming split guarantees: a reworded card, or the same front
+with a different back, can still land on the other side. With
+`near_duplicate_threshold`, write_split_deck() first clusters the cards with
+MinHash (near_duplicates.py) and sends every cluster to the side of its first
+card, at the cost of holding the cards in memory.
+
+Both sides are streamed to disk as cards arrive. The consolidated deck is a
+small view file listing the two parts rather than a third copy of the cards;
+load_deck() and iter_deck_cards() read views and plain decks alike.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from jsonl_shards import ShardWriter, iter_jsonl
+
+SPLIT_FIELDS = ('front', 'question', 'back')
+DEFAULT_SALT = 'notical-split-v1'
+
+_NOISE = re.compile(r'[\W\d_]+')
+
+
+def split_key(card: Dict, fields: Sequence[str] = SPLIT_FIELDS) -> str:
+    """The card's content with digits, punctuation and case removed"""
+    return ' '.join(_NOISE.sub(' ', str(card.get(field, ''))).lower().strip() for field in fields)
+
+
+def assign_split(card: Dict, test_fraction: float = 0.2, salt: str = DEFAULT_SALT,
+                 fields: Sequence[str] = SPLIT_FIELDS) -> str:
+    """'training' or 'testing', the same for every run and for cards differing only in digits/punctuation/case"""
+    digest = hashlib.blake2b((salt + split_key(card, fields)).encode('utf-8'), digest_size=8).digest()
+    return 'testing' if int.from_bytes(digest, 'big') < test_fraction * 2 ** 64 else 'training'
+
+
+class DeckWriter:
+    """
+    Streams a deck JSON file ({header..., 'cards': [...], 'total_cards'})
+    one card at a time; the file is renamed into place on close()
+    """
+
+    def __init__(self, path: str, header: Dict):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._file = open(path + '.tmp', 'w', encoding='utf-8', buffering=1024 * 1024)
+        self._file.write('{')
+        for key, value in header.items():
+            self._file.write(f'\n  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},')
+        self._file.write('\n  "cards": [')
+
+    def write(self, card: Dict):
+        self._file.write((',\n    ' if self.count else '\n    ') + json.dumps(card, ensure_ascii=False))
+        self.count += 1
+
+    def close(self, footer: Optional[Dict] = None) -> int:
+        self._file.write('\n  ],\n  "total_cards": ' + str(self.count))
+        for key, value in (footer or {}).items():
+            self._file.write(f',\n  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}')
+        self._file.write('\n}\n')
+        self._file.close()
+        os.replace(self.path + '.tmp', self.path)
+        return self.count
+
+
+class SplitWriter:
+    """
+    Routes cards to a training and a testing deck as they are written and,
+    on close(), writes the consolidated view. With fmt='jsonl' both sides
+    are JSONL shards (named after the training/testing paths, minus extension).
+    """
+
+    def __init__(self, consolidated_path: str, training_path: str, testing_path: str, name: str,
+                 training_name: Optional[str] = None, testing_name: Optional[str] = None,
+                 categories: Optional[List[str]] = None, test_fraction: float = 0.2,
+                 salt: str = DEFAULT_SALT, fields: Sequence[str] = SPLIT_FIELDS,
+                 fmt: str = 'json', shard_size: int = 50000,
+                 near_duplicate_threshold: Optional[float] = None):
+        self.consolidated_path = consolidated_path
+        self.name = name
+        self.categories = categories
+        self.test_fraction = test_fraction
+        self.salt = salt
+        self.fields = tuple(fields)
+        self.fmt = fmt
+        self.near_duplicate_threshold = near_duplicate_threshold  # recorded in the view; see write_split_deck()
+        self.cards_per_category: Dict[str, int] = {}
+        train_percent = round((1 - test_fraction) * 100)
+        names = {'training': training_name or f"{name} - Training ({train_percent}%)",
+                 'testing': testing_name or f"{name} - Testing ({100 - train_percent}%)"}
+        self.names = names
+
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.writers = {}
+        for side, path in (('training', training_path), ('testing', testing_path)):
+            if fmt == 'jsonl':
+                self.writers[side] = ShardWriter(os.path.dirname(path) or '.',
+                                                 os.path.splitext(os.path.basename(path))[0], shard_size)
+            else:
+                header = {'name': names[side], 'split': side}
+                if categories is not None:
+                    header['categories'] = categories
+                header['created_at'] = created_at
+                self.writers[side] = DeckWriter(path, header)
+        self.paths = {'training': training_path, 'testing': testing_path}
+
+    def write(self, card: Dict, group: Optional[Dict] = None) -> str:
+        """Write `card` to its side; with `group`, to the side `group` (e.g. its cluster's first card) hashes to"""
+        side = assign_split(group or card, self.test_fraction, self.salt, self.fields)
+        self.writers[side].write(card)
+        category = card.get('category')
+        if category is not None:
+            self.cards_per_category[category] = self.cards_per_category.get(category, 0) + 1
+        return side
+
+    def write_all(self, cards: Iterable[Dict]) -> 'SplitWriter':
+        for card in cards:
+            self.write(card)
+        return self
+
+    def close(self, **extra) -> Dict:
+        """Finish both sides and write the consolidated view; returns a summary of all three"""
+        base = os.path.dirname(os.path.abspath(self.consolidated_path))
+        parts, summary = [], {}
+        for side, writer in self.writers.items():
+            if self.fmt == 'jsonl':
+                files = writer.close()
+                count = writer.count
+            else:
+                count = writer.close()
+                files = [self.paths[side]]
+            files = [os.path.relpath(os.path.abspath(path), base) for path in files]
+            parts.append({'split': side, 'format': self.fmt, 'files': files, 'total_cards': count})
+            summary[side] = {'name': self.names[side], 'total_cards': count, 'files': files}
+
+        view = {
+            'name': self.name,
+            'total_cards': sum(part['total_cards'] for part in parts),
+            'split': 'consolidated',
+            'categories': self.categories if self.categories is not None else sorted(self.cards_per_category),
+            'cards_per_category': self.cards_per_category,
+            'parts': parts,
+            'split_method': {'hash': 'blake2b', 'salt': self.salt, 'fields': list(self.fields),
+                             'test_fraction': self.test_fraction,
+                             'near_duplicate_threshold': self.near_duplicate_threshold},
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            **extra
+        }
+        directory = os.path.dirname(self.consolidated_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.consolidated_path, 'w', encoding='utf-8') as f:
+            json.dump(view, f, indent=2, ensure_ascii=False)
+        summary['consolidated'] = view
+        return summary
+
+
+def write_split_deck(cards: Iterable[Dict], consolidated_path: str, training_path: str,
+                     testing_path: str, name: str, **options) -> Dict:
+    """
+    Split `cards` in one pass into training/testing decks plus a consolidated view.
+    With `near_duplicate_threshold` (estimated Jaccard similarity), near-duplicate
+    cards are clustered first and every cluster goes to one side
+    """
+    extra = options.pop('extra', {})
+    writer = SplitWriter(consolidated_path, training_path, testing_path, name, **options)
+    if writer.near_duplicate_threshold is None:
+        return writer.write_all(cards).close(**extra)
+
+    from near_duplicates import NearDuplicateIndex, card_text
+
+    cards = list(cards)
+    index = NearDuplicateIndex(threshold=writer.near_duplicate_threshold)
+    index.add_many(card_text(card, writer.fields) for card in cards)
+    group = list(range(len(cards)))
+    for cluster in index.cluster_positions():
+        for position in cluster:
+            group[position] = cluster[0]
+    for position, card in enumerate(cards):
+        writer.write(card, cards[group[position]])
+    return writer.close(**extra)
+
+
+def is_view(deck: Dict) -> bool:
+    return 'parts' in deck and 'cards' not in deck
+
+
+def iter_deck_cards(path: str) -> Iterator[Dict]:
+    """Cards of a deck file, following a consolidated view into its parts (JSONL parts are streamed)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        deck = json.load(f)
+    if not is_view(deck):
+        yield from deck.get('cards', [])
+        return
+
+    base = os.path.dirname(os.path.abspath(path))
+    for part in deck['parts']:
+        files = [os.path.join(base, name) for name in part['files']]
+        if part.get('format') == 'jsonl':
+            yield from iter_jsonl(files)
+        else:
+            for file in files:
+                with open(file, 'r', encoding='utf-8') as f:
+                    yield from json.load(f).get('cards', [])
+
+
+def load_deck(path: str) -> Dict:
+    """A deck with its cards in memory, whether `path` is a plain deck or a consolidated view"""
+    with open(path, 'r', encoding='utf-8') as f:
+        deck = json.load(f)
+    if is_view(deck):
+        deck['cards'] = list(iter_deck_cards(path))
+    return deck
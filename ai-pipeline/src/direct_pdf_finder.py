@@ -5,7 +5,6 @@ NOTICAL AI Pipeline - Direct PDF Finder
 Go directly to past papers section to find PDFs
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
@@ -13,14 +12,17 @@ import time
 import random
 import re
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+
+from http_cache import CachedSession
+from link_extractor import extract_links, filter_links
+from paper_catalog import PaperCatalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DirectPDFFinder:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
@@ -49,17 +51,17 @@ class DirectPDFFinder:
                 response = self.session.get(url, timeout=30)
                 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
+                    page_links = extract_links(response.content)
                     
                     # Look for PDF links
-                    pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+                    pdf_links = filter_links(page_links, r'\.pdf$')
                     
                     if pdf_links:
                         logger.info(f"  📚 Found {len(pdf_links)} PDFs on {url}")
                         
                         for pdf_link in pdf_links:
-                            pdf_url = urljoin(url, pdf_link.get('href', ''))
-                            pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                            pdf_url = urljoin(url, pdf_link.href)
+                            pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                             
                             # Determine subject from URL or title
                             subject = self._determine_subject_from_url(url, pdf_title)
@@ -79,13 +81,13 @@ class DirectPDFFinder:
                         logger.info(f"  ⚠️  No PDFs found on {url}")
                         
                         # Look for links to other pages that might have PDFs
-                        other_links = soup.find_all('a', href=re.compile(r'(past-papers|revision|notes)', re.IGNORECASE))
+                        other_links = filter_links(page_links, r'(past-papers|revision|notes)')
                         logger.info(f"    🔍 Found {len(other_links)} other links to explore")
                         
                         # Explore a few of these links
                         for link in other_links[:3]:
-                            link_url = urljoin(url, link.get('href', ''))
-                            link_text = link.get_text(strip=True)
+                            link_url = urljoin(url, link.href)
+                            link_text = link.text
                             logger.info(f"      🔗 {link_text} -> {link_url}")
                             
                             # Try to find PDFs on this sub-page
@@ -106,15 +108,15 @@ class DirectPDFFinder:
         try:
             response = self.session.get(url, timeout=30)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+                page_links = extract_links(response.content)
+                pdf_links = filter_links(page_links, r'\.pdf$')
                 
                 if pdf_links:
                     logger.info(f"        📚 Found {len(pdf_links)} PDFs on sub-page!")
                     
                     for pdf_link in pdf_links:
-                        pdf_url = urljoin(url, pdf_link.get('href', ''))
-                        pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                        pdf_url = urljoin(url, pdf_link.href)
+                        pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                         
                         subject = self._determine_subject_from_url(url, pdf_title) or parent_subject
                         
@@ -179,7 +181,10 @@ class DirectPDFFinder:
         with open(content_file, 'w') as f:
             json.dump(data, f, indent=2)
         
-        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file}")
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(self.found_pdfs, source='PMT')
+        
+        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file} and {catalog.path}")
         self._show_summary()
         
         return content_file
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Download Manager
+======================================
+Parallel, resumable file downloads for the past-paper scrapers. Files are
+written to `<name>.part` with large buffered writes and renamed into place
+once complete, so a file that exists is a finished download. Interrupted
+downloads resume from the partial file with an HTTP Range request guarded by
+If-Range (the ETag or Last-Modified of the response that started the file,
+kept in `<name>.part.validator`), so a file that changed on the server is
+downloaded again instead of being spliced onto a stale prefix. Files that
+already exist (and match any expected size/hash) are skipped.
+Given a PaperCatalog, every finished download is recorded against its URL.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from rate_limiter import HostLimiter
+
+
+def filename_from_url(url: str) -> str:
+    """Last path segment of `url`, with a .pdf extension"""
+    filename = url.split('/')[-1]
+    if not filename.endswith('.pdf'):
+        filename += '.pdf'
+    return filename
+
+
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _format_size(size: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class DownloadManager:
+    """
+    Downloads on `workers` threads, at most `per_host_limit` at a time and
+    `per_host_rate` starts per second to any one host. Failed downloads are
+    retried `max_retries` times, resuming from whatever reached the disk.
+    """
+
+    def __init__(self, session=None, headers: Optional[Dict] = None, workers: int = 4,
+                 per_host_limit: int = 2, per_host_rate: float = 2.0, timeout: int = 30,
+                 chunk_size: int = 1024 * 1024, max_retries: int = 2, catalog=None):
+        # A plain session: Range requests and large bodies shouldn't go through the HTTP cache
+        self.session = session or requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        self.workers = workers
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.catalog = catalog
+        self.limiter = HostLimiter(max_concurrent=per_host_limit, rate=per_host_rate,
+                                   burst=per_host_limit)
+
+    def _is_complete(self, filepath: str, expected_size: Optional[int],
+                     expected_sha256: Optional[str]) -> bool:
+        if not os.path.exists(filepath):
+            return False
+        if expected_size is not None and os.path.getsize(filepath) != expected_size:
+            return False
+        if expected_sha256 is not None and file_sha256(filepath) != expected_sha256:
+            return False
+        return True
+
+    @staticmethod
+    def _validator_path(partial: str) -> str:
+        return partial + '.validator'
+
+    @staticmethod
+    def _validator(response) -> Optional[str]:
+        """The response's If-Range validator: a strong ETag, else Last-Modified"""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    def _discard(self, partial: str):
+        for path in (partial, self._validator_path(partial)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _fetch(self, url: str, partial: str) -> bool:
+        """Download `url` into `partial`, appending if it already holds a prefix; True if resumed"""
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        validator = None
+        if offset and os.path.exists(self._validator_path(partial)):
+            with open(self._validator_path(partial), 'r', encoding='utf-8') as f:
+                validator = f.read().strip() or None
+        if validator is None:
+            # Without a validator there is no telling whether the prefix is still current
+            offset = 0
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if offset else {}
+
+        with self.limiter.slot(url):
+            response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        with response:
+            if response.status_code == 416:
+                # Nothing past `offset`: either the partial file is already whole
+                # ("Content-Range: bytes */<offset>") or it isn't a prefix of this body
+                if response.headers.get('Content-Range', '') == f'bytes */{offset}':
+                    return True
+                self._discard(partial)
+                return self._fetch(url, partial)
+            response.raise_for_status()
+
+            # A 200 to a ranged request means the file changed (If-Range didn't match): start over
+            resumed = (offset > 0 and response.status_code == 206 and
+                       response.headers.get('Content-Range', '').startswith(f'bytes {offset}-'))
+            if response.status_code == 206 and not resumed:
+                # Some other range than the one asked for; fetch the whole file instead
+                self._discard(partial)
+                return self._fetch(url, partial)
+            if not resumed:
+                validator = self._validator(response)
+                if validator:
+                    with open(self._validator_path(partial), 'w', encoding='utf-8') as f:
+                        f.write(validator)
+                elif os.path.exists(self._validator_path(partial)):
+                    os.remove(self._validator_path(partial))
+            mode = 'ab' if resumed else 'wb'
+            with open(partial, mode, buffering=self.chunk_size) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+        return resumed
+
+    def download(self, url: str, filepath: str, expected_size: Optional[int] = None,
+                 expected_sha256: Optional[str] = None) -> Dict:
+        """
+        Download one file; returns a result dict whose 'status' is 'skipped',
+        'downloaded', 'resumed' or 'failed'
+        """
+        result = {'url': url, 'path': filepath, 'bytes': 0}
+        start = time.time()
+        if self._is_complete(filepath, expected_size, expected_sha256):
+            result.update(status='skipped', seconds=0.0)
+            self._record(url, filepath, expected_sha256)
+            return result
+
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial = filepath + '.part'
+        existing = os.path.getsize(partial) if os.path.exists(partial) else 0
+
+        resumed, error = False, None
+        for attempt in range(self.max_retries + 1):
+            try:
+                resumed = self._fetch(url, partial) or resumed
+                error = None
+                break
+            except (requests.RequestException, OSError) as e:
+                error = e
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt, 10))
+
+        if error is None:
+            if expected_sha256 is not None and file_sha256(partial) != expected_sha256:
+                # A corrupt prefix would poison every resume, so drop it
+                self._discard(partial)
+                error = ValueError("SHA-256 mismatch")
+            elif expected_size is not None and os.path.getsize(partial) != expected_size:
+                error = ValueError(f"expected {expected_size} bytes, got {os.path.getsize(partial)}")
+
+        result['seconds'] = round(time.time() - start, 3)
+        if error is not None:
+            result.update(status='failed', error=str(error))
+            return result
+
+        size = os.path.getsize(partial)
+        os.replace(partial, filepath)
+        if os.path.exists(self._validator_path(partial)):
+            os.remove(self._validator_path(partial))
+        result.update(status='resumed' if resumed else 'downloaded',
+                      bytes=size - existing if resumed else size)
+        self._record(url, filepath, expected_sha256 or (file_sha256(filepath) if self.catalog else None))
+        return result
+
+    def _record(self, url: str, filepath: str, sha256: Optional[str]):
+        if self.catalog is not None:
+            self.catalog.set_local_path(url, filepath, sha256)
+
+    def download_all(self, items: Iterable[Dict], verbose: bool = True) -> List[Dict]:
+        """
+        Download every item ({'url', 'path'} plus optional 'expected_size' /
+        'expected_sha256') in parallel; results come back in completion order
+        """
+        items = list(items)
+        results = []
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.download, item['url'], item['path'],
+                                   item.get('expected_size'), item.get('expected_sha256'))
+                       for item in items]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if verbose:
+                    name = os.path.basename(result['path'])
+                    if result['status'] == 'failed':
+                        print(f"  [{len(results)}/{len(items)}] ✗ {name}: {result['error']}")
+                    else:
+                        print(f"  [{len(results)}/{len(items)}] ✓ {name} ({result['status']}, "
+                              f"{_format_size(result['bytes'])})")
+
+        summary = self.summarize(results, time.time() - start)
+        if verbose:
+            print(f"\nDownloaded {summary['downloaded']} files, resumed {summary['resumed']}, "
+                  f"skipped {summary['skipped']}, failed {summary['failed']} - "
+                  f"{_format_size(summary['bytes'])} in {summary['seconds']}s "
+                  f"({_format_size(summary['bytes_per_second'])}/s)")
+        return results
+
+    @staticmethod
+    def summarize(results: List[Dict], seconds: float) -> Dict:
+        summary = {'downloaded': 0, 'resumed': 0, 'skipped': 0, 'failed': 0}
+        for result in results:
+            summary[result['status']] += 1
+        summary['bytes'] = sum(result['bytes'] for result in results)
+        summary['seconds'] = round(seconds, 2)
+        summary['bytes_per_second'] = summary['bytes'] / seconds if seconds > 0 else 0.0
+        return summary
@@ -1,11 +1,13 @@
-import requests
 from bs4 import BeautifulSoup
 import os
-import time
 from urllib.parse import urljoin
 import json
 from typing import Dict, List, Optional
 
+from download_manager import DownloadManager, filename_from_url
+from http_cache import CachedSession
+from paper_catalog import PaperCatalog
+
 class WinterPapersDownloader:
     """
     Downloader for Physics 9702 A-Level October-November 2022 papers (winter session)
@@ -13,7 +15,7 @@ class WinterPapersDownloader:
     
     def __init__(self, base_url: str = "https://pastpapers.co"):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -72,7 +74,8 @@ class WinterPapersDownloader:
             print(f"Error getting papers: {e}")
             return []
     
-    def _parse_physics_filename(self, filename: str) -> Optional[Dict[str, str]]:
+    @staticmethod
+    def _parse_physics_filename(filename: str) -> Optional[Dict[str, str]]:
         """
         Parse Physics 9702 filename according to the convention
         Example: 9702_w22_qp_21 -> subject: 9702, session: w, year: 22, type: qp, paper: 2, variant: 1
@@ -114,32 +117,17 @@ class WinterPapersDownloader:
     
     def download_paper(self, paper_url: str, output_dir: str = "physics_9702_winter_2022") -> Optional[str]:
         """
-        Download a specific paper PDF
+        Download a specific paper PDF (skipped if already on disk, resumed if interrupted)
         """
-        try:
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            response = self.session.get(paper_url, stream=True)
-            response.raise_for_status()
-            
-            # Extract filename from URL
-            filename = paper_url.split('/')[-1]
-            if not filename.endswith('.pdf'):
-                filename += '.pdf'
-            
-            filepath = os.path.join(output_dir, filename)
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"Downloaded: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            print(f"Error downloading {paper_url}: {e}")
+        filepath = os.path.join(output_dir, filename_from_url(paper_url))
+        with PaperCatalog() as catalog:
+            result = DownloadManager(headers=self.session.headers, catalog=catalog).download(paper_url, filepath)
+        if result['status'] == 'failed':
+            print(f"Error downloading {paper_url}: {result['error']}")
             return None
+        
+        print(f"Downloaded: {filepath}" if result['status'] != 'skipped' else f"Already downloaded: {filepath}")
+        return filepath
     
     def download_variant_2_papers(self, output_dir: str = "physics_9702_winter_2022") -> List[str]:
         """
@@ -161,16 +149,14 @@ class WinterPapersDownloader:
         
         print(f"\nDownloading {len(variant_2_papers)} papers...")
         
-        downloaded_files = []
-        for i, paper in enumerate(variant_2_papers, 1):
-            print(f"\n[{i}/{len(variant_2_papers)}] Downloading: {paper['filename']}")
-            
-            filepath = self.download_paper(paper['url'], output_dir)
-            if filepath:
-                downloaded_files.append(filepath)
-            
-            # Be nice to the server
-            time.sleep(1)
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(variant_2_papers, board='CIE', level='A-Level', subject='Physics', source='pastpapers.co')
+            downloads = DownloadManager(headers=self.session.headers, catalog=catalog)
+            results = downloads.download_all({"url": paper["url"], "path": os.path.join(output_dir, filename_from_url(paper["url"]))}
+                                             for paper in variant_2_papers)
+        
+        done = {result["url"]: result["path"] for result in results if result["status"] != "failed"}
+        downloaded_files = [done[paper["url"]] for paper in variant_2_papers if paper["url"] in done]
         
         return downloaded_files
 
@@ -5,7 +5,6 @@ NOTICAL AI Pipeline - Dual Structure Scraper
 Handle both old /download/ structure (Math & Physics) and new /pdf-pages/?pdf= structure (Chemistry, Biology, English, etc.)
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
@@ -13,14 +12,17 @@ import time
 import random
 import re
 from urllib.parse import urljoin, unquote
-from bs4 import BeautifulSoup
+
+from http_cache import CachedSession
+from link_extractor import extract_links, filter_links
+from paper_catalog import PaperCatalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DualStructureScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
@@ -81,17 +83,17 @@ class DualStructureScraper:
                     logger.error(f"    ❌ Failed to access {subject_name}: HTTP {response.status_code}")
                     continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                page_links = extract_links(response.content)
                 
                 # Look for links that might contain PDFs
-                pdf_links = soup.find_all('a', href=re.compile(r'pdf-pages\?pdf=', re.IGNORECASE))
+                pdf_links = filter_links(page_links, r'pdf-pages\?pdf=')
                 
                 if pdf_links:
                     logger.info(f"    📚 Found {len(pdf_links)} PDF page links in {subject_name}")
                     
                     for pdf_link in pdf_links[:10]:  # Limit to avoid too many requests
-                        pdf_href = pdf_link.get('href', '')
-                        pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                        pdf_href = pdf_link.href
+                        pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                         
                         if pdf_href:
                             pdf_url = urljoin(subject_url, pdf_href)
@@ -114,13 +116,13 @@ class DualStructureScraper:
                                 logger.info(f"      ✅ {pdf_title}")
                 
                 # Also look for direct PDF links that might exist
-                direct_pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+                direct_pdf_links = filter_links(page_links, r'\.pdf$')
                 if direct_pdf_links:
                     logger.info(f"    📚 Found {len(direct_pdf_links)} direct PDF links in {subject_name}")
                     
                     for pdf_link in direct_pdf_links[:5]:
-                        pdf_url = urljoin(subject_url, pdf_link.get('href', ''))
-                        pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                        pdf_url = urljoin(subject_url, pdf_link.href)
+                        pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                         
                         pdf_info = {
                             'url': pdf_url,
@@ -178,7 +180,10 @@ class DualStructureScraper:
         with open(content_file, 'w') as f:
             json.dump(data, f, indent=2)
         
-        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file}")
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(self.found_pdfs, source='PMT')
+        
+        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file} and {catalog.path}")
         self._show_summary()
         
         return content_file
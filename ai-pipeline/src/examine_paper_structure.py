@@ -1,16 +1,15 @@
-import fitz
+from pdf_text_extractor import extract_pages
 
 def examine_paper_structure(pdf_path):
     """Examine the structure of a PDF paper"""
     print(f"Examining: {pdf_path}")
     print("=" * 50)
     
-    doc = fitz.open(pdf_path)
-    print(f"Total pages: {len(doc)}")
+    pages = extract_pages(pdf_path)
+    print(f"Total pages: {len(pages)}")
     
-    for page_num in range(min(10, len(doc))):  # Check first 10 pages
-        page = doc[page_num]
-        text = page.get_text()
+    for page_num in range(min(10, len(pages))):  # Check first 10 pages
+        text = pages[page_num]
         lines = text.split('\n')
         
         print(f"\nPage {page_num + 1}: {len(lines)} lines")
@@ -33,8 +32,6 @@ def examine_paper_structure(pdf_path):
                 print(f"  {q}")
         else:
             print("No question patterns found")
-    
-    doc.close()
 
 if __name__ == "__main__":
     # Examine AS Level Theory Paper 2
@@ -1,4 +1,4 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
 import re
 
 def examine_question_structure(pdf_path, question_numbers):
@@ -6,11 +6,7 @@ def examine_question_structure(pdf_path, question_numbers):
     print(f"=== EXAMINING QUESTION STRUCTURE IN: {pdf_path} ===")
     
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+        text = extract_text(pdf_path)
         
         # Split into lines
         lines = text.split('\n')
@@ -1,4 +1,6 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
 import re
 import json
 import os
@@ -6,16 +8,12 @@ import os
 class BasicPhysicsMCQExtractor:
     def __init__(self):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
@@ -80,145 +78,43 @@ class BasicPhysicsMCQExtractor:
         
         return True
     
-    def find_question_boundaries(self, lines):
-        """Find the start and end boundaries of each question"""
-        boundaries = {}
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s+[A-D]', line)
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    start_line = i
-                    
-                    # Look ahead to find where this question ends
-                    end_line = start_line
-                    for j in range(start_line + 1, len(lines)):
-                        next_line = lines[j].strip()
-                        
-                        # If we hit another question number, stop
-                        if re.match(r'^\d+\s+[A-D]', next_line):
-                            break
-                        
-                        end_line = j
-                    
-                    boundaries[question_num] = {
-                        'start': start_line,
-                        'end': end_line,
-                        'lines': lines[start_line:end_line + 1]
-                    }
-        
-        return boundaries
-    
-    def extract_options_for_question(self, question_lines):
-        """Extract options from the lines of a specific question"""
-        options = {}
-        
-        # Look for option patterns within the question's lines
-        for i, line in enumerate(question_lines):
-            line = line.strip()
-            
-            # Pattern 1: Lines starting with A, B, C, D followed by text
-            option_match = re.match(r'^([A-D])\s+(.+)$', line)
-            if option_match:
-                option_letter = option_match.group(1)
-                option_text = option_match.group(2).strip()
-                options[option_letter] = option_text
-            
-            # Pattern 2: Lines that are just A, B, C, D (might be followed by text on next line)
-            elif re.match(r'^([A-D])$', line):
-                option_letter = line
-                # Look at next line for the option text
-                if i + 1 < len(question_lines):
-                    next_line = question_lines[i + 1].strip()
-                    if next_line and not re.match(r'^[A-D]', next_line):
-                        options[option_letter] = next_line
-                    else:
-                        options[option_letter] = ""  # Empty option
-                else:
-                    options[option_letter] = ""
-            
-            # Pattern 3: Lines containing A, B, C, D with some text
-            elif re.search(r'^[A-D]\s*[^A-Z]', line):
-                # This might be an option with some formatting
-                for option in ['A', 'B', 'C', 'D']:
-                    if line.startswith(option):
-                        # Extract text after the option letter
-                        option_text = line[len(option):].strip()
-                        if option_text:
-                            options[option] = option_text
-                        break
-        
-        return options
-    
     def find_basic_physics_multiple_choice_questions(self, text):
         """Find basic physics MCQ questions with their A, B, C, D options"""
         questions = []
         
-        # Split text into lines for better processing
-        lines = text.split('\n')
-        
-        # Find question boundaries first
-        boundaries = self.find_question_boundaries(lines)
+        # Single pass over the text: questions, options and boundaries together
+        parsed = self.parser.parse(text)
         
-        print(f"Found {len(boundaries)} questions with boundaries")
+        print(f"Found {len(parsed)} questions with boundaries")
         
-        for question_num, boundary in boundaries.items():
-            question_lines = boundary['lines']
+        for question in parsed:
+            options = question['options']
             
-            # Extract question text (everything before options)
-            question_text = ""
-            option_start = -1
-            
-            for i, line in enumerate(question_lines):
-                line = line.strip()
-                
-                # If we hit an option line, stop collecting question text
-                if re.match(r'^[A-D]', line):
-                    option_start = i
-                    break
-                
-                question_text += " " + line
-            
-            question_text = question_text.strip()
-            
-            # Extract options from the remaining lines
-            if option_start != -1:
-                option_lines = question_lines[option_start:]
-                options = self.extract_options_for_question(option_lines)
-                
-                # Only add if we have all 4 options and it's a basic physics MCQ
-                if (len(options) == 4 and 
-                    self.is_basic_physics_question(question_text) and 
-                    self.is_basic_physics_options(options)):
-                    
-                    questions.append({
-                        'question_number': question_num,
-                        'question_content': question_text,
-                        'options': options,
-                        'line_number': boundary['start'] + 1
-                    })
-                    print(f"Found BASIC PHYSICS MCQ {question_num}: {len(options)} options")
-                    print(f"  Options: {list(options.keys())}")
+            # Only add if we have all 4 options and it's a basic physics MCQ
+            if (len(options) == 4 and 
+                self.is_basic_physics_question(question['question_content']) and 
+                self.is_basic_physics_options(options)):
+                questions.append({
+                    'question_number': question['question_number'],
+                    'question_content': question['question_content'],
+                    'options': options,
+                    'line_number': question['line_number']
+                })
+                print(f"Found BASIC PHYSICS MCQ {question['question_number']}: {len(options)} options")
+                print(f"  Options: {list(options.keys())}")
         
         return questions
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -356,17 +252,12 @@ class BasicPhysicsMCQExtractor:
         """Match questions with their answers"""
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers)
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -375,8 +266,9 @@ class BasicPhysicsMCQExtractor:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
+        
+        if report.has_unmatched:
+            print(report.summary())
         
         return qa_pairs
 
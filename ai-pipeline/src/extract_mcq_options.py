@@ -1,4 +1,6 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
 import re
 import json
 import os
@@ -6,83 +8,31 @@ import os
 class MCQOptionsExtractor:
     def __init__(self):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
     
     def find_multiple_choice_questions_with_options(self, text):
         """Find MCQ questions with their A, B, C, D options"""
-        questions = []
-        
-        # Split text into lines for better processing
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s*[A-D]\)', line.strip())
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    # Extract question content (remove the A) part)
-                    question_content = line.strip()
-                    
-                    # Look for the next few lines to find options A, B, C, D
-                    options = {}
-                    option_pattern = re.compile(r'^([A-D])\)\s*(.+)$')
-                    
-                    # Check current line and next few lines for options
-                    current_line = line.strip()
-                    if 'A)' in current_line:
-                        # Extract A option from current line
-                        a_match = re.search(r'A\)\s*(.+?)(?=\s*[B-D]\)|$)', current_line)
-                        if a_match:
-                            options['A'] = a_match.group(1).strip()
-                    
-                    # Look ahead for B, C, D options
-                    for j in range(i, min(i + 10, len(lines))):  # Look ahead up to 10 lines
-                        next_line = lines[j].strip()
-                        
-                        # Look for B, C, D options
-                        for option in ['B', 'C', 'D']:
-                            if f'{option})' in next_line:
-                                option_match = re.search(rf'{option}\)\s*(.+?)(?=\s*[A-D]\)|$)', next_line)
-                                if option_match:
-                                    options[option] = option_match.group(1).strip()
-                    
-                    # Only add if we have at least 2 options
-                    if len(options) >= 2:
-                        questions.append({
-                            'question_number': question_num,
-                            'question_content': question_content,
-                            'options': options,
-                            'line_number': i + 1
-                        })
-        
-        return questions
+        # Single pass over the text: questions, options and boundaries together
+        return self.parser.parse_with_options(text, min_options=2)
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -220,17 +170,12 @@ class MCQOptionsExtractor:
         """Match questions with their answers"""
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers)
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -239,8 +184,9 @@ class MCQOptionsExtractor:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
+        
+        if report.has_unmatched:
+            print(report.summary())
         
         return qa_pairs
 
@@ -1,4 +1,6 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
 import re
 import json
 import os
@@ -6,124 +8,31 @@ import os
 class MCQOptionsExtractorV2:
     def __init__(self):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
     
     def find_multiple_choice_questions_with_options(self, text):
         """Find MCQ questions with their embedded A, B, C, D options"""
-        questions = []
-        
-        # Split text into lines for better processing
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s+[A-D]', line.strip())
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    # Start building the complete question text
-                    question_text = line.strip()
-                    options = {}
-                    
-                    # Look ahead to collect the complete question and options
-                    current_line = i
-                    while current_line < len(lines) - 1:
-                        current_line += 1
-                        next_line = lines[current_line].strip()
-                        
-                        if not next_line:
-                            continue
-                        
-                        # If we hit another question number, stop
-                        if re.match(r'^\d+\s+[A-D]', next_line):
-                            break
-                        
-                        # Add this line to question text
-                        question_text += " " + next_line
-                        
-                        # Look for option patterns within the accumulated text
-                        # Pattern: A followed by text, then B, C, D
-                        if 'A' in question_text and 'B' in question_text and 'C' in question_text and 'D' in question_text:
-                            # Extract options using regex
-                            self.extract_options_from_text(question_text, options)
-                            break
-                    
-                    # Only add if we have at least 2 options
-                    if len(options) >= 2:
-                        questions.append({
-                            'question_number': question_num,
-                            'question_content': question_text,
-                            'options': options,
-                            'line_number': i + 1
-                        })
-        
-        return questions
-    
-    def extract_options_from_text(self, text, options):
-        """Extract A, B, C, D options from question text"""
-        # Look for patterns like "A text B text C text D text"
-        # or "A text B text C text D" (D might be empty)
-        
-        # Pattern 1: A followed by text, then B, C, D
-        pattern1 = r'A\s+([^B]+?)\s+B\s+([^C]+?)\s+C\s+([^D]+?)(?:\s+D\s+([^A-Z]+)?)?'
-        match1 = re.search(pattern1, text, re.DOTALL)
-        
-        if match1:
-            options['A'] = match1.group(1).strip()
-            options['B'] = match1.group(2).strip()
-            options['C'] = match1.group(3).strip()
-            if match1.group(4):
-                options['D'] = match1.group(4).strip()
-            else:
-                options['D'] = ""  # D option might be empty
-            return
-        
-        # Pattern 2: Look for individual options
-        # A option
-        a_match = re.search(r'A\s+([^B]+?)(?=\s+B)', text, re.DOTALL)
-        if a_match:
-            options['A'] = a_match.group(1).strip()
-        
-        # B option
-        b_match = re.search(r'B\s+([^C]+?)(?=\s+C)', text, re.DOTALL)
-        if b_match:
-            options['B'] = b_match.group(1).strip()
-        
-        # C option
-        c_match = re.search(r'C\s+([^D]+?)(?=\s+D)', text, re.DOTALL)
-        if c_match:
-            options['C'] = c_match.group(1).strip()
-        
-        # D option (might be at the end)
-        d_match = re.search(r'D\s+([^A-Z]+)?$', text, re.DOTALL)
-        if d_match:
-            options['D'] = d_match.group(1).strip() if d_match.group(1) else ""
+        # Single pass over the text: questions, options and boundaries together
+        return self.parser.parse_with_options(text, min_options=2)
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -261,17 +170,12 @@ class MCQOptionsExtractorV2:
         """Match questions with their answers"""
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers)
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -280,8 +184,9 @@ class MCQOptionsExtractorV2:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
+        
+        if report.has_unmatched:
+            print(report.summary())
         
         return qa_pairs
 
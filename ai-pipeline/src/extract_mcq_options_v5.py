@@ -1,158 +1,56 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
+from mcq_layout_parser import LayoutMCQParser
 import re
 import json
 import os
+import sys
 
 class MCQOptionsExtractorV5:
-    def __init__(self):
+    # Bump whenever a change alters the extracted output, so manifests re-run old papers
+    EXTRACTOR_VERSION = "5.3"
+    # Answers are matched to questions by number alone
+    JOIN_KEY = 'question_number'
+    
+    def __init__(self, layout=False):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
+        # Layout mode reads options from word positions instead of flattened text
+        self.layout = layout
+        self.layout_parser = LayoutMCQParser(self.valid_question_numbers)
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
     
     def find_multiple_choice_questions_with_options(self, text):
         """Find MCQ questions with their A, B, C, D options using a more targeted approach"""
-        questions = []
-        
-        # Split text into lines for better processing
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s+[A-D]', line.strip())
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    # Start building the complete question text
-                    question_text = line.strip()
-                    
-                    # Look ahead to collect the complete question text (without options)
-                    current_line = i
-                    question_lines = [line.strip()]
-                    
-                    while current_line < len(lines) - 1:
-                        current_line += 1
-                        next_line = lines[current_line].strip()
-                        
-                        if not next_line:
-                            continue
-                        
-                        # If we hit another question number, stop
-                        if re.match(r'^\d+\s+[A-D]', next_line):
-                            break
-                        
-                        # If we hit an option line (A, B, C, D), stop collecting question text
-                        if re.match(r'^[A-D]\s', next_line) or re.match(r'^[A-D]$', next_line):
-                            break
-                        
-                        # Add this line to question text
-                        question_lines.append(next_line)
-                    
-                    # Now look for options after the question, but only until the next question
-                    options = self.find_options_for_question(lines, current_line, i)
-                    
-                    # Only add if we have at least 2 options
-                    if len(options) >= 2:
-                        # Clean up question text (remove extra spaces)
-                        clean_question = " ".join(question_lines).strip()
-                        
-                        questions.append({
-                            'question_number': question_num,
-                            'question_content': clean_question,
-                            'options': options,
-                            'line_number': i + 1
-                        })
-        
-        return questions
+        # Single pass over the text: questions, options and boundaries together
+        return self.parser.parse_with_options(text, min_options=2)
     
-    def find_options_for_question(self, lines, start_line, question_start):
-        """Find options for a specific question, stopping at the next question"""
-        options = {}
-        
-        # Look ahead from the start line
-        current_line = start_line
-        
-        while current_line < len(lines) - 1:
-            current_line += 1
-            line = lines[current_line].strip()
-            
-            if not line:
-                continue
-            
-            # If we hit another question number, stop
-            if re.match(r'^\d+\s+[A-D]', line):
-                break
-            
-            # Look for option patterns
-            # Pattern 1: Lines starting with A, B, C, D followed by text
-            option_match = re.match(r'^([A-D])\s+(.+)$', line)
-            if option_match:
-                option_letter = option_match.group(1)
-                option_text = option_match.group(2).strip()
-                options[option_letter] = option_text
-            
-            # Pattern 2: Lines that are just A, B, C, D (might be followed by text on next line)
-            elif re.match(r'^([A-D])$', line):
-                option_letter = line
-                # Look at next line for the option text
-                if current_line + 1 < len(lines):
-                    next_line = lines[current_line + 1].strip()
-                    if next_line and not re.match(r'^[A-D]', next_line):
-                        options[option_letter] = next_line
-                    else:
-                        options[option_letter] = ""  # Empty option
-                else:
-                    options[option_letter] = ""
-            
-            # Pattern 3: Lines containing A, B, C, D with some text
-            elif re.search(r'^[A-D]\s*[^A-Z]', line):
-                # This might be an option with some formatting
-                for option in ['A', 'B', 'C', 'D']:
-                    if line.startswith(option):
-                        # Extract text after the option letter
-                        option_text = line[len(option):].strip()
-                        if option_text:
-                            options[option] = option_text
-                        break
-            
-            # Pattern 4: Look for table-like structures
-            elif re.search(r'[A-D]\s*[^A-Z]', line):
-                # This might be a table row with options
-                for option in ['A', 'B', 'C', 'D']:
-                    if option in line:
-                        # Try to extract the option text
-                        parts = line.split(option)
-                        if len(parts) > 1:
-                            option_text = parts[1].strip()
-                            if option_text and not re.match(r'^[A-Z]', option_text):
-                                options[option] = option_text
-                                break
-        
-        return options
+    def find_multiple_choice_questions_with_layout(self, pdf_path):
+        """Find MCQ questions with their options from word positions (columns and tables included)"""
+        try:
+            return self.layout_parser.parse_with_options(pdf_path, min_options=2)
+        except Exception as e:
+            print(f"Error reading layout of {pdf_path}: {e}")
+            return []
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -182,29 +80,57 @@ class MCQOptionsExtractorV5:
     
     def process_paper(self, qp_path, ms_path, output_file):
         """Process a complete paper to extract Q&A with MCQ options"""
+        result = self.extract_paper(qp_path, ms_path)
+        if result is None:
+            return
+        
+        # Save to JSON
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        
+        print(f"Results saved to {output_file}")
+        return result
+    
+    def parse_paper(self, qp_path, ms_path):
+        """Questions (with options) and answers of one paper, not yet joined; None if a PDF can't be read"""
         print(f"Processing question paper: {qp_path}")
         print(f"Processing mark scheme: {ms_path}")
         
-        # Extract text from both PDFs
-        qp_text = self.extract_text_from_pdf(qp_path)
+        # Extract text from both PDFs (layout mode reads the question paper's words directly)
+        qp_text = None if self.layout else self.extract_text_from_pdf(qp_path)
         ms_text = self.extract_text_from_pdf(ms_path)
         
-        if not qp_text or not ms_text:
+        if (not self.layout and not qp_text) or not ms_text:
             print("Failed to extract text from one or both PDFs")
             return
         
         # Find questions with options from question paper
-        questions_with_options = self.find_multiple_choice_questions_with_options(qp_text)
+        if self.layout:
+            questions_with_options = self.find_multiple_choice_questions_with_layout(qp_path)
+        else:
+            questions_with_options = self.find_multiple_choice_questions_with_options(qp_text)
         print(f"Found {len(questions_with_options)} questions with options")
         
         # Find answers from mark scheme (using existing logic)
         answers = self.find_multiple_choice_answers_fixed(ms_text)
         print(f"Found {len(answers)} answers")
         
+        return {'questions': questions_with_options, 'answers': answers}
+    
+    def extract_paper(self, qp_path, ms_path):
+        """Extract Q&A with MCQ options for one paper, without saving anything"""
+        parsed = self.parse_paper(qp_path, ms_path)
+        if parsed is None:
+            return
+        
         # Match Q&A pairs
-        qa_pairs = self.match_qa_pairs(questions_with_options, answers)
+        qa_pairs = self.match_qa_pairs(parsed['questions'], parsed['answers'])
         print(f"Matched {len(qa_pairs)} Q&A pairs")
         
+        return self.build_result(qp_path, ms_path, parsed['questions'], qa_pairs)
+    
+    def build_result(self, qp_path, ms_path, questions_with_options, qa_pairs):
+        """The paper's result structure from its matched Q&A pairs"""
         # Merge with options
         merged_data = self.merge_qa_with_options(qa_pairs, questions_with_options)
         
@@ -224,11 +150,6 @@ class MCQOptionsExtractorV5:
             }
         }
         
-        # Save to JSON
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        print(f"Results saved to {output_file}")
         return result
     
     def find_multiple_choice_answers_fixed(self, text):
@@ -288,19 +209,23 @@ class MCQOptionsExtractorV5:
     
     def match_qa_pairs(self, questions, answers):
         """Match questions with their answers"""
+        joined, report = join_paper(questions, answers, key=self.JOIN_KEY)
+        qa_pairs = self.pairs_from_join(joined)
+        
+        if report.has_unmatched:
+            print(report.summary())
+        
+        return qa_pairs
+    
+    def pairs_from_join(self, joined):
+        """Q&A pairs from one paper's (question, matching answers) join output"""
         qa_pairs = []
         
-        for question in questions:
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -309,13 +234,11 @@ class MCQOptionsExtractorV5:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
         
         return qa_pairs
 
 def main():
-    extractor = MCQOptionsExtractorV5()
+    extractor = MCQOptionsExtractorV5(layout='--layout' in sys.argv[1:])
     
     # Process summer paper
     print("=== PROCESSING SUMMER PAPER (May-June 2022) ===")
@@ -1,4 +1,7 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
+from text_filters import STRICT_PURE_TEXT_FILTER
 import re
 import json
 import os
@@ -6,224 +9,64 @@ import os
 class StrictPureTextMCQExtractor:
     def __init__(self):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
+        # Keyword and maths rules, compiled once in text_filters
+        self.filter = STRICT_PURE_TEXT_FILTER
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
     
     def is_pure_text_question(self, question_text):
         """Check if this is a pure text-based question (no formulas, equations, etc.)"""
-        question_lower = question_text.lower()
-        
-        # Skip if question contains complex elements
-        complex_keywords = [
-            'diagram', 'graph', 'table', 'figure', 'shown', 'illustration', 'sketch',
-            'formula', 'equation', 'derive', 'calculate', 'determine', 'find',
-            '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10', '10–', '10-',
-            'density', 'modulus', 'constant', 'frequency', 'wavelength', 'velocity'
-        ]
-        
-        if any(keyword in question_lower for keyword in complex_keywords):
-            return False
-        
-        # Skip if question contains mathematical expressions
-        math_patterns = [
-            r'\d+\s*×\s*10',  # Scientific notation
-            r'[A-Z]\s*=\s*[A-Z]',  # Equations like F = ma
-            r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Mathematical operations with variables
-            r'[A-Z]²',  # Squared variables
-            r'[A-Z]⁻¹',  # Negative powers
-            r'\d+\s*[A-Z]',  # Numbers followed by units (like 5.0 m, 40 kg)
-            r'[A-Z]+\s*[+\-]\s*[A-Z]+',  # Variable operations
-        ]
-        
-        for pattern in math_patterns:
-            if re.search(pattern, question_text):
-                return False
-        
-        return True
+        return self.filter.is_pure_text_question(question_text)
     
     def is_pure_text_options(self, options):
         """Check if options are pure text (no formulas, equations)"""
-        # Check if all options have meaningful content
-        for option_text in options.values():
-            if not option_text.strip() or len(option_text.strip()) < 3:
-                return False
-            
-            option_lower = option_text.lower()
-            
-            # Skip if options contain complex elements
-            complex_keywords = [
-                '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10', '10–', '10-',
-                'formula', 'equation', 'derive', 'calculate', 'kg', 'm', 's', 'w', 'j', 'n'
-            ]
-            
-            if any(keyword in option_lower for keyword in complex_keywords):
-                return False
-            
-            # Skip if options contain mathematical expressions
-            math_patterns = [
-                r'[A-Z]\s*=\s*[A-Z]',  # Equations
-                r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Math operations
-                r'[A-Z]²',  # Squared variables
-                r'[A-Z]⁻¹',  # Negative powers
-                r'\d+\s*[A-Z]',  # Numbers with units
-            ]
-            
-            for pattern in math_patterns:
-                if re.search(pattern, option_text):
-                    return False
-        
-        return True
-    
-    def find_question_boundaries(self, lines):
-        """Find the start and end boundaries of each question"""
-        boundaries = {}
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s+[A-D]', line)
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    start_line = i
-                    
-                    # Look ahead to find where this question ends
-                    end_line = start_line
-                    for j in range(start_line + 1, len(lines)):
-                        next_line = lines[j].strip()
-                        
-                        # If we hit another question number, stop
-                        if re.match(r'^\d+\s+[A-D]', next_line):
-                            break
-                        
-                        end_line = j
-                    
-                    boundaries[question_num] = {
-                        'start': start_line,
-                        'end': end_line,
-                        'lines': lines[start_line:end_line + 1]
-                    }
-        
-        return boundaries
-    
-    def extract_options_for_question(self, question_lines):
-        """Extract options from the lines of a specific question"""
-        options = {}
-        
-        # Look for option patterns within the question's lines
-        for i, line in enumerate(question_lines):
-            line = line.strip()
-            
-            # Pattern 1: Lines starting with A, B, C, D followed by text
-            option_match = re.match(r'^([A-D])\s+(.+)$', line)
-            if option_match:
-                option_letter = option_match.group(1)
-                option_text = option_match.group(2).strip()
-                options[option_letter] = option_text
-            
-            # Pattern 2: Lines that are just A, B, C, D (might be followed by text on next line)
-            elif re.match(r'^([A-D])$', line):
-                option_letter = line
-                # Look at next line for the option text
-                if i + 1 < len(question_lines):
-                    next_line = question_lines[i + 1].strip()
-                    if next_line and not re.match(r'^[A-D]', next_line):
-                        options[option_letter] = next_line
-                    else:
-                        options[option_letter] = ""  # Empty option
-                else:
-                    options[option_letter] = ""
-            
-            # Pattern 3: Lines containing A, B, C, D with some text
-            elif re.search(r'^[A-D]\s*[^A-Z]', line):
-                # This might be an option with some formatting
-                for option in ['A', 'B', 'C', 'D']:
-                    if line.startswith(option):
-                        # Extract text after the option letter
-                        option_text = line[len(option):].strip()
-                        if option_text:
-                            options[option] = option_text
-                        break
-        
-        return options
+        return self.filter.is_pure_text_options(options)
     
     def find_strict_pure_text_multiple_choice_questions(self, text):
         """Find strict pure text-based MCQ questions with their A, B, C, D options"""
         questions = []
         
-        # Split text into lines for better processing
-        lines = text.split('\n')
+        # Single pass over the text: questions, options and boundaries together
+        parsed = self.parser.parse(text)
         
-        # Find question boundaries first
-        boundaries = self.find_question_boundaries(lines)
+        print(f"Found {len(parsed)} questions with boundaries")
         
-        print(f"Found {len(boundaries)} questions with boundaries")
+        # Classify every 4-option question in one batch: one scan for questions, one for options
+        candidates = [question for question in parsed if len(question['options']) == 4]
         
-        for question_num, boundary in boundaries.items():
-            question_lines = boundary['lines']
-            
-            # Extract question text (everything before options)
-            question_text = ""
-            option_start = -1
-            
-            for i, line in enumerate(question_lines):
-                line = line.strip()
-                
-                # If we hit an option line, stop collecting question text
-                if re.match(r'^[A-D]', line):
-                    option_start = i
-                    break
-                
-                question_text += " " + line
+        for question, is_pure_text in zip(candidates, self.filter.classify(candidates)):
+            options = question['options']
             
-            question_text = question_text.strip()
-            
-            # Extract options from the remaining lines
-            if option_start != -1:
-                option_lines = question_lines[option_start:]
-                options = self.extract_options_for_question(option_lines)
-                
-                # Only add if we have all 4 options and it's a strict pure text MCQ
-                if (len(options) == 4 and 
-                    self.is_pure_text_question(question_text) and 
-                    self.is_pure_text_options(options)):
-                    
-                    questions.append({
-                        'question_number': question_num,
-                        'question_content': question_text,
-                        'options': options,
-                        'line_number': boundary['start'] + 1
-                    })
-                    print(f"Found STRICT pure text MCQ {question_num}: {len(options)} options")
-                    print(f"  Options: {list(options.keys())}")
+            # Only add if it's a strict pure text MCQ
+            if is_pure_text:
+                questions.append({
+                    'question_number': question['question_number'],
+                    'question_content': question['question_content'],
+                    'options': options,
+                    'line_number': question['line_number']
+                })
+                print(f"Found STRICT pure text MCQ {question['question_number']}: {len(options)} options")
+                print(f"  Options: {list(options.keys())}")
         
         return questions
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -361,17 +204,12 @@ class StrictPureTextMCQExtractor:
         """Match questions with their answers"""
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers)
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -380,8 +218,9 @@ class StrictPureTextMCQExtractor:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
+        
+        if report.has_unmatched:
+            print(report.summary())
         
         return qa_pairs
 
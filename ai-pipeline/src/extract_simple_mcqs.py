@@ -1,4 +1,6 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from mcq_parser import MCQParser
+from paper_join import index_first, join_paper
 import re
 import json
 import os
@@ -6,16 +8,12 @@ import os
 class SimpleMCQExtractor:
     def __init__(self):
         self.valid_question_numbers = set(str(i) for i in range(1, 41))
+        self.parser = MCQParser(self.valid_question_numbers)
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
@@ -46,123 +44,34 @@ class SimpleMCQExtractor:
         """Find simple MCQ questions with their A, B, C, D options"""
         questions = []
         
-        # Split text into lines for better processing
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for question numbers (1-40) followed by content
-            question_match = re.match(r'^(\d+)\s+[A-D]', line.strip())
-            if question_match:
-                question_num = question_match.group(1)
-                if question_num in self.valid_question_numbers:
-                    # Start building the complete question text
-                    question_text = line.strip()
-                    
-                    # Look ahead to collect the complete question text (without options)
-                    current_line = i
-                    question_lines = [line.strip()]
-                    
-                    while current_line < len(lines) - 1:
-                        current_line += 1
-                        next_line = lines[current_line].strip()
-                        
-                        if not next_line:
-                            continue
-                        
-                        # If we hit another question number, stop
-                        if re.match(r'^\d+\s+[A-D]', next_line):
-                            break
-                        
-                        # If we hit an option line (A, B, C, D), stop collecting question text
-                        if re.match(r'^[A-D]\s', next_line) or re.match(r'^[A-D]$', next_line):
-                            break
-                        
-                        # Add this line to question text
-                        question_lines.append(next_line)
-                    
-                    # Now look for options after the question
-                    options = self.find_options_for_question(lines, current_line, i)
-                    
-                    # Only add if we have all 4 options and it's a simple MCQ
-                    if len(options) == 4 and self.is_simple_mcq(question_text, options):
-                        # Clean up question text (remove extra spaces)
-                        clean_question = " ".join(question_lines).strip()
-                        
-                        questions.append({
-                            'question_number': question_num,
-                            'question_content': clean_question,
-                            'options': options,
-                            'line_number': i + 1
-                        })
-                        print(f"Found simple MCQ {question_num}: {len(options)} options")
-        
-        return questions
-    
-    def find_options_for_question(self, lines, start_line, question_start):
-        """Find options for a specific question, stopping at the next question"""
-        options = {}
+        # Single pass over the text: questions, options and boundaries together
+        parsed = self.parser.parse(text)
         
-        # Look ahead from the start line
-        current_line = start_line
-        
-        while current_line < len(lines) - 1:
-            current_line += 1
-            line = lines[current_line].strip()
-            
-            if not line:
-                continue
-            
-            # If we hit another question number, stop
-            if re.match(r'^\d+\s+[A-D]', line):
-                break
-            
-            # Look for option patterns
-            # Pattern 1: Lines starting with A, B, C, D followed by text
-            option_match = re.match(r'^([A-D])\s+(.+)$', line)
-            if option_match:
-                option_letter = option_match.group(1)
-                option_text = option_match.group(2).strip()
-                options[option_letter] = option_text
-            
-            # Pattern 2: Lines that are just A, B, C, D (might be followed by text on next line)
-            elif re.match(r'^([A-D])$', line):
-                option_letter = line
-                # Look at next line for the option text
-                if current_line + 1 < len(lines):
-                    next_line = lines[current_line + 1].strip()
-                    if next_line and not re.match(r'^[A-D]', next_line):
-                        options[option_letter] = next_line
-                    else:
-                        options[option_letter] = ""  # Empty option
-                else:
-                    options[option_letter] = ""
+        for question in parsed:
+            options = question['options']
             
-            # Pattern 3: Lines containing A, B, C, D with some text
-            elif re.search(r'^[A-D]\s*[^A-Z]', line):
-                # This might be an option with some formatting
-                for option in ['A', 'B', 'C', 'D']:
-                    if line.startswith(option):
-                        # Extract text after the option letter
-                        option_text = line[len(option):].strip()
-                        if option_text:
-                            options[option] = option_text
-                        break
+            # Only add if we have all 4 options and it's a simple MCQ
+            if len(options) == 4 and self.is_simple_mcq(question['question_content'], options):
+                questions.append({
+                    'question_number': question['question_number'],
+                    'question_content': question['question_content'],
+                    'options': options,
+                    'line_number': question['line_number']
+                })
+                print(f"Found simple MCQ {question['question_number']}: {len(options)} options")
         
-        return options
+        return questions
     
     def merge_qa_with_options(self, qa_pairs, questions_with_options):
         """Merge Q&A pairs with their MCQ options"""
         merged_data = []
+        questions_by_number = index_first(questions_with_options)
         
         for qa_pair in qa_pairs:
             question_num = qa_pair['question_number']
             
             # Find matching question with options
-            matching_question = None
-            for q in questions_with_options:
-                if q['question_number'] == question_num:
-                    matching_question = q
-                    break
+            matching_question = questions_by_number.get(question_num)
             
             if matching_question:
                 merged_item = {
@@ -300,17 +209,12 @@ class SimpleMCQExtractor:
         """Match questions with their answers"""
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers)
+        for question, matching_answers in joined:
             question_num = question['question_number']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if answer['question_number'] == question_num:
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'question_content': question['question_content'],
@@ -319,8 +223,9 @@ class SimpleMCQExtractor:
                     'answer_line': matching_answer['answer_line'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num}")
+        
+        if report.has_unmatched:
+            print(report.summary())
         
         return qa_pairs
 
@@ -1,21 +1,22 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from paper_join import join_paper
 import re
 import json
 import os
 
 class TheoryQuestionExtractor:
+    # Bump whenever a change alters the extracted output, so manifests re-run old papers
+    EXTRACTOR_VERSION = "1.1"
+    # Theory questions are numbered per part: 1(a), 1(b), ...
+    JOIN_KEY = ('question_number', 'part')
+    
     def __init__(self):
         pass
     
     def extract_text_from_pdf(self, pdf_path):
         """Extract text from PDF using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
@@ -142,21 +143,24 @@ class TheoryQuestionExtractor:
     
     def match_qa_pairs(self, questions, answers):
         """Match questions with their answers"""
+        joined, report = join_paper(questions, answers, key=self.JOIN_KEY)
+        qa_pairs = self.pairs_from_join(joined)
+        
+        if report.has_unmatched:
+            print(report.summary())
+        
+        return qa_pairs
+    
+    def pairs_from_join(self, joined):
+        """Q&A pairs from one paper's (question, matching answers) join output"""
         qa_pairs = []
         
-        for question in questions:
+        for question, matching_answers in joined:
             question_num = question['question_number']
             part = question['part']
             
-            # Find matching answer
-            matching_answer = None
-            for answer in answers:
-                if (answer['question_number'] == question_num and 
-                    answer['part'] == part):
-                    matching_answer = answer
-                    break
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     'question_number': question_num,
                     'part': part,
@@ -166,13 +170,24 @@ class TheoryQuestionExtractor:
                     'answer_line': matching_answer['line_number'],
                     'confidence': 'high'
                 })
-            else:
-                print(f"No matching answer found for question {question_num} ({part})")
         
         return qa_pairs
     
     def process_theory_paper(self, qp_path, ms_path, output_file):
         """Process a theory paper to extract Q&A pairs"""
+        result = self.extract_theory_paper(qp_path, ms_path)
+        if result is None:
+            return
+        
+        # Save to JSON
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        
+        print(f"Results saved to {output_file}")
+        return result
+    
+    def parse_theory_paper(self, qp_path, ms_path):
+        """Questions and mark scheme answers of one theory paper, not yet joined; None if a PDF can't be read"""
         print(f"Processing theory question paper: {qp_path}")
         print(f"Processing theory mark scheme: {ms_path}")
         
@@ -192,11 +207,22 @@ class TheoryQuestionExtractor:
         answers = self.find_mark_scheme_answers(ms_text)
         print(f"Found {len(answers)} mark scheme answers")
         
+        return {'questions': questions, 'answers': answers}
+    
+    def extract_theory_paper(self, qp_path, ms_path):
+        """Extract Q&A pairs for one theory paper, without saving anything"""
+        parsed = self.parse_theory_paper(qp_path, ms_path)
+        if parsed is None:
+            return
+        
         # Match Q&A pairs
-        qa_pairs = self.match_qa_pairs(questions, answers)
+        qa_pairs = self.match_qa_pairs(parsed['questions'], parsed['answers'])
         print(f"Matched {len(qa_pairs)} Q&A pairs")
         
-        # Create final result structure
+        return self.build_result(qp_path, ms_path, parsed['questions'], parsed['answers'], qa_pairs)
+    
+    def build_result(self, qp_path, ms_path, questions, answers, qa_pairs):
+        """The paper's result structure from its matched Q&A pairs"""
         result = {
             'paper_info': {
                 'question_paper': os.path.basename(qp_path),
@@ -214,11 +240,6 @@ class TheoryQuestionExtractor:
             }
         }
         
-        # Save to JSON
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        print(f"Results saved to {output_file}")
         return result
 
 def main():
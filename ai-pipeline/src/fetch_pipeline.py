@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Concurrent Fetch Pipeline
+===============================================
+Fetch PDFs on a thread pool and hand them to an extraction stage through a
+bounded queue, so downloads and parsing overlap. Bodies travel as PDFBuffers
+(memory-mapped temp files), so nothing is copied between download and parse.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from pdf_buffer import fetch_to_buffer
+from rate_limiter import HostLimiter
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class FetchPipeline:
+    """
+    Two-stage pipeline: `fetch_workers` threads download items (respecting the
+    per-host limits), and `extract_workers` threads run `extract(item, content)`
+    on whatever has arrived, where `content` is a PDFBuffer that is closed once
+    extract returns. The queue between the stages holds at most `queue_size`
+    downloaded bodies, so fast networks can't outrun parsing.
+    """
+
+    def __init__(self, session=None, fetch_workers=8, extract_workers=1, queue_size=16,
+                 per_host_limit=2, per_host_rate=2.0, timeout=30):
+        self.session = session or requests.Session()
+        self.fetch_workers = fetch_workers
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.limiter = HostLimiter(max_concurrent=per_host_limit, rate=per_host_rate,
+                                   burst=per_host_limit)
+
+    def fetch(self, url):
+        """Download one URL into a PDFBuffer, or None on failure"""
+        with self.limiter.slot(url):
+            buffer = fetch_to_buffer(self.session, url, timeout=self.timeout)
+        if buffer is None:
+            logger.debug(f"Non-200 response for {url}")
+        return buffer
+
+    @staticmethod
+    def _next_result(results, extractors):
+        """The next finished item; raises instead of waiting forever once no extractor is left"""
+        while True:
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in extractors):
+                    raise RuntimeError("Every extract worker stopped before all items were processed")
+
+    def run(self, items, extract):
+        """Yield (item, extract(item, content)) for each item as it finishes, in completion order"""
+        items = list(items)
+        if not items:
+            return
+
+        work = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+        # Set when the consumer is done (or gave up early): no more fetching or handing on
+        stop = threading.Event()
+
+        def hand_on(entry):
+            """Put `entry` on the work queue unless the run is stopped; False if it was dropped"""
+            while not stop.is_set():
+                try:
+                    work.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch_stage(item):
+            if stop.is_set():
+                return
+            content = None
+            try:
+                content = self.fetch(item['url'])
+            except Exception as e:
+                logger.error(f"Error fetching {item.get('title', item['url'])}: {e}")
+            finally:
+                # Always hand the item on, or the consumer would wait for it forever
+                if not hand_on((item, content)) and content is not None:
+                    content.close()
+
+        def extract_stage():
+            while True:
+                entry = work.get()
+                if entry is _DONE:
+                    return
+                item, content = entry
+                result = None
+                try:
+                    if content is not None and not stop.is_set():
+                        result = extract(item, content)
+                except Exception as e:
+                    logger.error(f"Error extracting {item.get('title', item['url'])}: {e}")
+                finally:
+                    if content is not None:
+                        content.close()
+                    results.put((item, result))
+
+        extractors = [threading.Thread(target=extract_stage, daemon=True)
+                      for _ in range(self.extract_workers)]
+        for thread in extractors:
+            thread.start()
+
+        fetchers = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        try:
+            for item in items:
+                fetchers.submit(fetch_stage, item)
+
+            for _ in range(len(items)):
+                yield self._next_result(results, extractors)
+        finally:
+            # Unblock fetchers waiting on a full queue, drop what was never extracted,
+            # then stop the extractors; otherwise an abandoned run keeps the process alive
+            stop.set()
+            fetchers.shutdown(wait=False, cancel_futures=True)
+            while True:
+                try:
+                    item, content = work.get_nowait()
+                except queue.Empty:
+                    break
+                if content is not None:
+                    content.close()
+            for _ in extractors:
+                while any(thread.is_alive() for thread in extractors):
+                    try:
+                        work.put(_DONE, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
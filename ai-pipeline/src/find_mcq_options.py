@@ -1,4 +1,4 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
 import re
 
 def find_mcq_options(pdf_path):
@@ -6,11 +6,7 @@ def find_mcq_options(pdf_path):
     print(f"=== SEARCHING FOR MCQ OPTIONS IN: {pdf_path} ===")
     
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+        text = extract_text(pdf_path)
         
         # Split into lines
         lines = text.split('\n')
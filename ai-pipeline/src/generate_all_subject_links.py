@@ -10,6 +10,8 @@ import logging
 from pathlib import Path
 import re
 
+from paper_catalog import PaperCatalog
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -80,8 +82,11 @@ def generate_subject_pdf_links():
     with open(output_file, 'w') as f:
         json.dump(data, f, indent=2)
     
+    with PaperCatalog() as catalog:
+        catalog.upsert_many(all_pdf_links)
+    
     logger.info(f"💾 Generated {len(all_pdf_links)} PDF links for {len(accessible_subjects)} subjects")
-    logger.info(f"📁 Saved to: {output_file}")
+    logger.info(f"📁 Saved to: {output_file} and {catalog.path}")
     
     return all_pdf_links
 
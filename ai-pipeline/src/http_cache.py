@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - HTTP Cache
+================================
+A requests.Session that keeps GET response bodies of pages (HTML, JSON,
+XML, text) on disk, keyed by URL. Fresh entries are served without touching
+the network, stale ones are revalidated with If-None-Match / If-Modified-Since
+so unchanged pages come back as a 304 with no body, and offline mode replays
+the cache without any network access at all. Streamed responses and binary
+bodies such as PDFs are passed through untouched, so downloads keep streaming
+to disk in bounded memory; the cache itself is capped at `max_bytes`, least
+recently used entries going first.
+
+    NOTICAL_HTTP_CACHE=off       disable caching (default: ai-pipeline/cache/http)
+    NOTICAL_HTTP_OFFLINE=1       replay only; uncached URLs raise ConnectionError
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'http')
+
+# Bodies worth keeping: listing and search pages, not the documents they link to
+_CACHEABLE_TYPES = ('text/', 'application/json', 'application/xml', 'application/xhtml+xml')
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class CachedSession(requests.Session):
+    """
+    Drop-in replacement for requests.Session. Only successful, non-streamed
+    GETs of page content up to `max_entry_bytes` are stored, and Range
+    requests bypass the cache. An entry is fresh for the response's
+    Cache-Control max-age, or `max_age` seconds when the server doesn't say;
+    no-cache forces revalidation every time and no-store keeps the response
+    out of the cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_age: int = 24 * 3600,
+                 offline: Optional[bool] = None, max_bytes: int = 256 * 1024 * 1024,
+                 max_entry_bytes: int = 8 * 1024 * 1024):
+        super().__init__()
+        if cache_dir is None:
+            cache_dir = os.environ.get('NOTICAL_HTTP_CACHE', DEFAULT_CACHE_DIR)
+        if cache_dir.lower() in ('off', '0', 'false', ''):
+            cache_dir = None
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._size: Optional[int] = None
+        self.offline = _env_flag('NOTICAL_HTTP_OFFLINE') if offline is None else offline
+        self.stats = {'fresh': 0, 'revalidated': 0, 'downloaded': 0, 'offline': 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest[:2], digest)
+        return base + '.json', base + '.body'
+
+    def _load(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                meta['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return meta
+
+    def _write(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _store(self, key: str, response: requests.Response):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            'url': key,
+            'final_url': response.url,
+            'headers': dict(response.headers),
+            'fetched_at': time.time()
+        }
+        # Body first: a metadata file always has a complete body next to it
+        self._write(body_path, response.content)
+        self._write(meta_path, json.dumps(meta).encode('utf-8'))
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(response.content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _cacheable(self, response: requests.Response, stream: bool) -> bool:
+        """Whether a 200 response should be stored: small page content, not a streamed download"""
+        if stream or 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return False
+        content_type = response.headers.get('Content-Type', '').lower()
+        if not content_type.startswith(_CACHEABLE_TYPES):
+            return False
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_entry_bytes:
+            return False
+        return len(response.content) <= self.max_entry_bytes
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.body'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its limit"""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, body_path in entries:
+            if self._size <= target:
+                break
+            try:
+                # Metadata first, so no entry is left pointing at a missing body
+                os.remove(body_path[:-len('.body')] + '.json')
+                os.remove(body_path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def _touch(self, key: str, meta: Dict, response: requests.Response):
+        """Record a successful revalidation, taking any updated validators from the 304"""
+        for header in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date'):
+            if header in response.headers:
+                meta['headers'][header] = response.headers[header]
+        meta['fetched_at'] = time.time()
+        body = meta.pop('body')
+        self._write(self._paths(key)[0], json.dumps(meta).encode('utf-8'))
+        meta['body'] = body
+
+    def _fresh_for(self, headers: Dict) -> Optional[int]:
+        """Seconds an entry stays fresh, or None if it must always be revalidated"""
+        cache_control = CaseInsensitiveDict(headers).get('Cache-Control', '').lower()
+        if 'no-cache' in cache_control:
+            return None
+        match = _MAX_AGE.search(cache_control)
+        return int(match.group(1)) if match else self.max_age
+
+    def _replay(self, meta: Dict, request: requests.PreparedRequest) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.url = meta.get('final_url') or meta['url']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.request = request
+        response.reason = 'OK'
+        response._content = meta['body']
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        partial = headers is not None and 'Range' in CaseInsensitiveDict(headers)
+        if method.upper() != 'GET' or self.cache_dir is None or partial:
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        prepared = self.prepare_request(requests.Request('GET', url, params=params, headers=headers))
+        key = prepared.url
+        meta = self._load(key)
+
+        if self.offline:
+            if meta is None:
+                raise requests.ConnectionError(f"Offline mode: {key} is not in the HTTP cache")
+            self._count('offline')
+            return self._replay(meta, prepared)
+
+        if meta is not None:
+            fresh_for = self._fresh_for(meta['headers'])
+            if fresh_for is not None and time.time() - meta['fetched_at'] < fresh_for:
+                self._count('fresh')
+                return self._replay(meta, prepared)
+
+            headers = dict(headers or {})
+            cached_headers = CaseInsensitiveDict(meta['headers'])
+            if 'ETag' in cached_headers:
+                headers['If-None-Match'] = cached_headers['ETag']
+            if 'Last-Modified' in cached_headers:
+                headers['If-Modified-Since'] = cached_headers['Last-Modified']
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            response.close()
+            self._touch(key, meta, response)
+            self._count('revalidated')
+            return self._replay(meta, prepared)
+
+        if response.status_code == 200 and self._cacheable(response, kwargs.get('stream', False)):
+            self._store(key, response)
+            self._count('downloaded')
+        return response
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
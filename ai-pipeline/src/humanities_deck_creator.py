@@ -1,6 +1,6 @@
-import json
 import time
-import os
+
+from deck_split import write_split_deck
 
 class HumanitiesDeckCreator:
     def __init__(self):
@@ -302,56 +302,26 @@ class HumanitiesDeckCreator:
         
         return consolidated_deck
     
-    def create_training_test_split(self, consolidated_deck):
-        """Create 80/20 training/testing split"""
-        print("Creating 80/20 training/testing split...")
-        
-        total_cards = len(consolidated_deck['cards'])
-        training_size = int(total_cards * 0.8)
-        testing_size = total_cards - training_size
-        
-        # Shuffle cards
-        import random
-        random.shuffle(consolidated_deck['cards'])
-        
-        training_deck = {
-            'name': 'Humanities Training Deck (80%)',
-            'total_cards': training_size,
-            'cards': consolidated_deck['cards'][:training_size],
-            'split': 'training'
-        }
-        
-        testing_deck = {
-            'name': 'Humanities Testing Deck (20%)',
-            'total_cards': testing_size,
-            'cards': consolidated_deck['cards'][training_size:],
-            'split': 'testing'
-        }
-        
-        return training_deck, testing_deck
-    
-    def save_decks(self, consolidated_deck, training_deck, testing_deck):
-        """Save all decks to JSON files"""
-        print("Saving Humanities decks to JSON files...")
-        
-        # Create output directory
-        os.makedirs('generated_flashcards', exist_ok=True)
-        
-        # Save consolidated deck
-        with open('generated_flashcards/comprehensive_humanities_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(consolidated_deck, f, indent=2, ensure_ascii=False)
-        
-        # Save training deck
-        with open('generated_flashcards/humanities_training_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(training_deck, f, indent=2, ensure_ascii=False)
-        
-        # Save testing deck
-        with open('generated_flashcards/humanities_testing_deck.json', 'w', encoding='utf-8') as f:
-            json.dump(testing_deck, f, indent=2, ensure_ascii=False)
+    def save_decks(self, consolidated_deck):
+        """Split the cards 80/20 by content hash into training/testing decks; the consolidated deck is a view of both"""
+        print("Saving Humanities decks with an 80/20 training/testing split...")
+        
+        saved = write_split_deck(
+            consolidated_deck['cards'],
+            'generated_flashcards/comprehensive_humanities_deck.json',
+            'generated_flashcards/humanities_training_deck.json',
+            'generated_flashcards/humanities_testing_deck.json',
+            consolidated_deck['name'],
+            training_name='Humanities Training Deck (80%)',
+            testing_name='Humanities Testing Deck (20%)',
+            categories=consolidated_deck['categories'],
+            near_duplicate_threshold=0.8
+        )
         
         print(f"✅ Saved {consolidated_deck['total_cards']} total Humanities cards")
-        print(f"✅ Training deck: {training_deck['total_cards']} cards")
-        print(f"✅ Testing deck: {testing_deck['total_cards']} cards")
+        print(f"✅ Training deck: {saved['training']['total_cards']} cards")
+        print(f"✅ Testing deck: {saved['testing']['total_cards']} cards")
+        return saved
     
     def run(self):
         """Main execution method"""
@@ -369,11 +339,9 @@ class HumanitiesDeckCreator:
         # Consolidate all decks
         consolidated_deck = self.consolidate_decks()
         
-        # Create training/testing split
-        training_deck, testing_deck = self.create_training_test_split(consolidated_deck)
-        
-        # Save all decks
-        self.save_decks(consolidated_deck, training_deck, testing_deck)
+        # Split and save all decks
+        saved = self.save_decks(consolidated_deck)
+        training_deck, testing_deck = saved['training'], saved['testing']
         
         print("🎉 Humanities Deck Creation Complete!")
         print(f"📊 Total Cards: {consolidated_deck['total_cards']}")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - JSONL Shards
+==================================
+Write a stream of cards as numbered JSONL files of at most `shard_size`
+lines each (massive_english-00000.jsonl, -00001, ...) and read them back
+lazily, so decks far larger than memory can be generated and consumed.
+"""
+
+import glob
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class ShardWriter:
+    """
+    Appends records to `<directory>/<prefix>-NNNNN.jsonl`, starting a new
+    shard every `shard_size` records. Shards are written under a .tmp name
+    and renamed when full or on close(), so a shard file that exists is complete.
+    """
+
+    def __init__(self, directory: str, prefix: str, shard_size: int = 50000,
+                 buffer_size: int = 1024 * 1024):
+        self.directory = directory
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.shards: List[str] = []
+        self._file = None
+        self._in_shard = 0
+        os.makedirs(directory, exist_ok=True)
+        # Shards of an earlier, larger run would otherwise be read back with this one
+        for stale in glob.glob(os.path.join(directory, f"{glob.escape(prefix)}-[0-9]*.jsonl")):
+            os.remove(stale)
+
+    def _rotate(self):
+        self._finish()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.shards):05d}.jsonl")
+        self.shards.append(path)
+        self._file = open(path + '.tmp', 'w', encoding='utf-8', buffering=self.buffer_size)
+        self._in_shard = 0
+
+    def _finish(self):
+        if self._file is not None:
+            self._file.close()
+            os.replace(self.shards[-1] + '.tmp', self.shards[-1])
+            self._file = None
+
+    def write(self, record: Dict):
+        if self._file is None or self._in_shard >= self.shard_size:
+            self._rotate()
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._in_shard += 1
+        self.count += 1
+
+    def write_all(self, records: Iterable[Dict]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self) -> List[str]:
+        self._finish()
+        return self.shards
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def shard_paths(directory: str, prefix: str) -> List[str]:
+    """A sharded file's shards, in order"""
+    return sorted(glob.glob(os.path.join(directory, f"{glob.escape(prefix)}-[0-9]*.jsonl")))
+
+
+def iter_jsonl(paths: Iterable[str], limit: Optional[int] = None) -> Iterator[Dict]:
+    """Records of every JSONL file in turn, one line at a time"""
+    seen = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if limit is not None and seen >= limit:
+                    return
+                seen += 1
+                yield json.loads(line)
@@ -0,0 +1,269 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from deck_split import load_deck
+from semantic_retriever import CardEncoder, SemanticRetriever
+
+
+class KnowledgeShard:
+    """
+    One subject's cards (e.g. complex_subjects/Physics).
+    Cards and the semantic index are only loaded the first time the shard is searched.
+    """
+
+    def __init__(self, shard_id: str, info: Dict, index_root: str):
+        self.shard_id = shard_id
+        self.domain = info['domain']
+        self.subject = info['subject']
+        self.path = info['path']
+        self.total_cards = info['total_cards']
+        self.index_dir = os.path.join(index_root, shard_id)
+        self._cards: Optional[List[Dict]] = None
+        self._retriever: Optional[SemanticRetriever] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._cards is not None
+
+    def cards(self) -> List[Dict]:
+        """Load the shard's cards on first use"""
+        if self._cards is None:
+            with self._lock:
+                if self._cards is None:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._cards = json.load(f)['cards']
+        return self._cards
+
+    def retriever(self, encoder: CardEncoder) -> SemanticRetriever:
+        """Open (and incrementally sync) the shard's semantic index on first use"""
+        if self._retriever is None:
+            cards = self.cards()
+            with self._lock:
+                if self._retriever is None:
+                    retriever = SemanticRetriever(self.index_dir, encoder)
+                    retriever.sync(cards)
+                    self._retriever = retriever
+        return self._retriever
+
+    def semantic_search(self, query: str, encoder: CardEncoder, top_k: int,
+                        min_score: float) -> List[Tuple[Dict, float]]:
+        """Top-k cards in this shard by embedding similarity"""
+        return self.retriever(encoder).search([query], top_k, min_score)[0]
+
+    def keyword_search(self, topic: str) -> List[Dict]:
+        """Substring match of the topic (or any of its words) against front/back"""
+        relevant_cards = []
+        topic_lower = topic.lower()
+        words = topic_lower.split()
+
+        for card in self.cards():
+            front = card.get('front', '').lower()
+            back = card.get('back', '').lower()
+
+            if (topic_lower in front or topic_lower in back or
+                any(word in front or word in back for word in words)):
+                relevant_cards.append(card)
+
+        return relevant_cards
+
+
+class ShardedKnowledgeBase:
+    """
+    Knowledge base split into per-subject shards, built from the consolidated decks'
+    `category` field. A router picks the shards for a query's subject and searches
+    them in parallel.
+    """
+
+    # Subject names users type that refer to a whole domain rather than one shard
+    DOMAIN_ALIASES = {
+        'english': ['english', 'language'],
+        'humanities': ['humanities'],
+        'complex_subjects': ['complex subjects', 'science', 'sciences', 'stem']
+    }
+
+    def __init__(self, deck_files: Dict[str, str], shard_dir: str = 'knowledge_shards',
+                 index_root: str = 'models/semantic_index', max_workers: int = 4):
+        self.deck_files = deck_files
+        self.shard_dir = shard_dir
+        self.index_root = index_root
+        self.manifest_path = os.path.join(shard_dir, 'manifest.json')
+        self.encoder: Optional[CardEncoder] = None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.manifest = self.build_shards()
+        self.shards = {
+            shard_id: KnowledgeShard(shard_id, info, index_root)
+            for shard_id, info in self.manifest['shards'].items()
+        }
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any source deck is regenerated"""
+        sources = sorted((domain, source['mtime']) for domain, source in self.manifest['sources'].items())
+        return hashlib.sha1(json.dumps(sources).encode('utf-8')).hexdigest()[:12]
+
+    def refresh_if_changed(self) -> bool:
+        """Re-shard decks whose files changed on disk; returns True if anything did"""
+        changed_domains = [
+            domain for domain, deck_path in self.deck_files.items()
+            if os.path.exists(deck_path) and
+            os.path.getmtime(deck_path) != self.manifest['sources'].get(domain, {}).get('mtime')
+        ] + self.removed_domains(self.manifest)
+        if not changed_domains:
+            return False
+
+        print(f"🔄 Decks regenerated ({', '.join(changed_domains)}), rebuilding shards")
+        self.manifest = self.build_shards()
+        self.shards = {
+            shard_id: (self.shards[shard_id]
+                       if shard_id in self.shards and info['domain'] not in changed_domains
+                       else KnowledgeShard(shard_id, info, self.index_root))
+            for shard_id, info in self.manifest['shards'].items()
+        }
+        return True
+
+    @staticmethod
+    def slugify(name: str) -> str:
+        return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') or 'general'
+
+    def removed_domains(self, manifest: Dict) -> List[str]:
+        """Domains in `manifest` whose deck is no longer configured or on disk"""
+        return [domain for domain in manifest['sources']
+                if not os.path.exists(self.deck_files.get(domain, ''))]
+
+    def remove_stale_shards(self, manifest: Dict):
+        """Delete shard files that `manifest` no longer lists (renamed subjects, removed decks)"""
+        current = {os.path.normpath(info['path']) for info in manifest['shards'].values()}
+        for shard_path in glob.glob(os.path.join(self.shard_dir, '*', '*.json')):
+            if os.path.normpath(shard_path) not in current:
+                os.remove(shard_path)
+
+    def build_shards(self) -> Dict:
+        """Split any consolidated deck that changed since the last build into shard files"""
+        manifest = {'sources': {}, 'shards': {}}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error reading shard manifest, rebuilding: {e}")
+
+        changed = False
+        for domain, deck_path in self.deck_files.items():
+            if not os.path.exists(deck_path):
+                print(f"⚠️ Deck not found for {domain}: {deck_path}")
+                continue
+
+            mtime = os.path.getmtime(deck_path)
+            if manifest['sources'].get(domain, {}).get('mtime') == mtime:
+                continue
+
+            try:
+                deck = load_deck(deck_path)
+            except Exception as e:
+                print(f"⚠️ Error loading {domain} deck: {e}")
+                continue
+
+            by_subject: Dict[str, List[Dict]] = {}
+            for card in deck.get('cards', []):
+                subject = card.get('subject') or card.get('category') or 'General'
+                by_subject.setdefault(subject, []).append(card)
+
+            for shard_id in [sid for sid, info in manifest['shards'].items() if info['domain'] == domain]:
+                del manifest['shards'][shard_id]
+
+            os.makedirs(os.path.join(self.shard_dir, domain), exist_ok=True)
+            for subject, cards in by_subject.items():
+                shard_id = f"{domain}/{self.slugify(subject)}"
+                shard_path = os.path.join(self.shard_dir, domain, f"{self.slugify(subject)}.json")
+                with open(shard_path, 'w', encoding='utf-8') as f:
+                    json.dump({'domain': domain, 'subject': subject,
+                               'total_cards': len(cards), 'cards': cards}, f, ensure_ascii=False)
+                manifest['shards'][shard_id] = {
+                    'domain': domain,
+                    'subject': subject,
+                    'path': shard_path,
+                    'total_cards': len(cards)
+                }
+
+            manifest['sources'][domain] = {
+                'path': deck_path,
+                'mtime': mtime,
+                'total_cards': deck.get('total_cards', sum(len(c) for c in by_subject.values())),
+                'categories': deck.get('categories', sorted(by_subject))
+            }
+            changed = True
+            print(f"🧩 Sharded {domain} into {len(by_subject)} subject shards")
+
+        for domain in self.removed_domains(manifest):
+            print(f"🗑️ Dropping shards of removed {domain} deck")
+            for shard_id in [sid for sid, info in manifest['shards'].items() if info['domain'] == domain]:
+                del manifest['shards'][shard_id]
+            del manifest['sources'][domain]
+            changed = True
+
+        if changed:
+            self.remove_stale_shards(manifest)
+            manifest['built_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            os.makedirs(self.shard_dir, exist_ok=True)
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+        return manifest
+
+    def domain_stats(self, domain: str) -> Dict:
+        """Card totals and categories for a domain without loading any shard"""
+        source = self.manifest['sources'].get(domain, {})
+        return {
+            'total_cards': source.get('total_cards', 0),
+            'categories': source.get('categories', []),
+            'shards': [sid for sid, shard in self.shards.items() if shard.domain == domain]
+        }
+
+    def route(self, subject: str) -> List[str]:
+        """Pick the shards relevant to a subject, falling back to every shard"""
+        subject_lower = subject.lower().strip()
+
+        exact = [sid for sid, shard in self.shards.items() if shard.subject.lower() == subject_lower]
+        if exact:
+            return exact
+
+        for domain, aliases in self.DOMAIN_ALIASES.items():
+            if subject_lower == domain or subject_lower in aliases:
+                return [sid for sid, shard in self.shards.items() if shard.domain == domain]
+
+        return list(self.shards)
+
+    def search(self, query: str, subject: str, top_k: int = 50,
+               min_score: float = 0.3) -> List[Dict]:
+        """Search the routed shards in parallel; keyword match only if nothing scores"""
+        shard_ids = self.route(subject)
+
+        if self.encoder is not None:
+            results = self.executor.map(
+                lambda sid: self.shards[sid].semantic_search(query, self.encoder, top_k, min_score),
+                shard_ids
+            )
+            scored = [pair for shard_result in results for pair in shard_result]
+            if scored:
+                scored.sort(key=lambda pair: pair[1], reverse=True)
+                return [card for card, _ in scored[:top_k]]
+
+        results = self.executor.map(lambda sid: self.shards[sid].keyword_search(query), shard_ids)
+        return [card for shard_result in results for card in shard_result]
+
+    def get_stats(self) -> Dict:
+        """Shard counts, including how many have been loaded so far"""
+        return {
+            'total_shards': len(self.shards),
+            'loaded_shards': sum(1 for shard in self.shards.values() if shard.loaded),
+            'version': self.version,
+            'built_at': self.manifest.get('built_at', 'Unknown')
+        }
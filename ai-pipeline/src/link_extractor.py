@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Link Extraction
+=====================================
+Pull <a href> links out of listing pages without building a BeautifulSoup
+tree of the whole document. lxml's C parser is used when it is installed,
+with a streaming html.parser fallback; link text is normalised the way
+BeautifulSoup's get_text(strip=True) does it, so results are interchangeable.
+
+Pages that still need the BeautifulSoup API (CSS selectors, string matches)
+can use link_soup(), which parses only the <a> tags.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, NamedTuple, Optional, Pattern, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+class Link(NamedTuple):
+    href: str
+    text: str
+    title: str = ''
+
+
+def _strip_join(pieces) -> str:
+    return ''.join(piece.strip() for piece in pieces)
+
+
+class _LinkCollector(HTMLParser):
+    """Streaming fallback: keeps only the <a> tags and their text"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Link] = []
+        self._open = None  # (href, title, text pieces) of the current <a>
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            attrs = dict(attrs)
+            self._open = (attrs.get('href'), attrs.get('title') or '', [])
+
+    def handle_data(self, data):
+        if self._open is not None:
+            self._open[2].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._open is not None:
+            href, title, pieces = self._open
+            if href is not None:
+                self.links.append(Link(href, _strip_join(pieces), title))
+            self._open = None
+
+
+def _decode(content: Union[bytes, str]) -> str:
+    if isinstance(content, str):
+        return content
+    return content.decode('utf-8', errors='replace')
+
+
+def extract_links(content: Union[bytes, str], use_lxml: Optional[bool] = None) -> List[Link]:
+    """Every <a> with an href, in document order"""
+    if use_lxml is None:
+        use_lxml = HAS_LXML
+    if use_lxml:
+        try:
+            document = lxml.html.document_fromstring(content)
+        except (ParserError, ValueError):
+            return []
+        return [Link(anchor.get('href'), _strip_join(anchor.itertext()), anchor.get('title') or '')
+                for anchor in document.iter('a') if anchor.get('href') is not None]
+
+    collector = _LinkCollector()
+    collector.feed(_decode(content))
+    collector.close()
+    return collector.links
+
+
+def filter_links(links: List[Link], href_pattern: Union[str, Pattern],
+                 flags: int = re.IGNORECASE) -> List[Link]:
+    """Links whose href contains a match for `href_pattern` (like find_all('a', href=re.compile(...)))"""
+    if isinstance(href_pattern, str):
+        href_pattern = re.compile(href_pattern, flags)
+    return [link for link in links if href_pattern.search(link.href)]
+
+
+def link_soup(content: Union[bytes, str]) -> BeautifulSoup:
+    """A BeautifulSoup holding only the page's <a> tags"""
+    return BeautifulSoup(content, 'lxml' if HAS_LXML else 'html.parser', parse_only=SoupStrainer('a'))
@@ -1,7 +1,14 @@
-import json
+import argparse
+import contextlib
+import io
 import os
 import time
 import random
+from concurrent.futures import ProcessPoolExecutor
+
+from deck_split import write_split_deck
+
+SHARD_DIR = 'generated_flashcards/shards'
 
 class MassiveDataGenerator:
     def __init__(self):
@@ -500,271 +507,137 @@ class MassiveDataGenerator:
         print(f"✅ Loaded {len(concepts)} Psychology concepts")
         return concepts
     
-    def generate_massive_english_deck(self):
-        """Generate massive English deck with thousands of cards"""
-        print("🚀 Generating massive English deck...")
+    # Templated sections per domain: (attribute holding the concepts, cards per concept,
+    # question template, answer template, card type, category); {concept} is lowercased
+    GRAMMAR_TOPICS = [
+        'Parts of Speech', 'Sentence Structure', 'Tenses', 'Voice', 'Mood',
+        'Articles', 'Prepositions', 'Conjunctions', 'Interjections', 'Punctuation',
+        'Subject-Verb Agreement', 'Pronoun Agreement', 'Modifiers', 'Clauses', 'Phrases',
+        'Parallel Structure', 'Dangling Modifiers', 'Misplaced Modifiers', 'Run-on Sentences', 'Sentence Fragments'
+    ]
+    LITERATURE_TOPICS = [
+        'Shakespeare', 'Modern Literature', 'Classic Novels', 'Poetry', 'Drama',
+        'Short Stories', 'Literary Devices', 'Character Analysis', 'Theme Analysis', 'Plot Structure'
+    ]
+    SECTIONS = {
+        'english': [
+            ('GRAMMAR_TOPICS', 25, "What is the correct usage of {concept}?",
+             "Answer about {concept} usage and examples", 'grammar', 'Grammar'),
+            ('LITERATURE_TOPICS', 30, "Analyze {concept} in literature",
+             "Analysis of {concept} with examples", 'literature', 'Literature'),
+        ],
+        'humanities': [
+            ('history_events', 20, "What happened during {concept}?",
+             "Detailed explanation of {concept}", 'history', 'History'),
+            ('geography_facts', 20, "What is {concept}?",
+             "Comprehensive explanation of {concept}", 'geography', 'Geography'),
+            ('philosophy_concepts', 15, "Explain {concept}",
+             "Detailed explanation of {concept}", 'philosophy', 'Philosophy'),
+            ('sociology_concepts', 20, "What is {concept}?",
+             "Comprehensive explanation of {concept}", 'sociology', 'Sociology'),
+            ('psychology_concepts', 15, "Explain {concept}",
+             "Detailed explanation of {concept}", 'psychology', 'Psychology'),
+        ],
+        'complex_subjects': [
+            ('physics_concepts', 20, "Explain {concept} in physics",
+             "Comprehensive explanation of {concept} with formulas and examples", 'physics', 'Physics'),
+            ('chemistry_concepts', 20, "What is {concept}?",
+             "Detailed explanation of {concept} with examples", 'chemistry', 'Chemistry'),
+            ('math_concepts', 20, "Explain {concept}",
+             "Comprehensive explanation of {concept} with examples", 'mathematics', 'Mathematics'),
+            ('biology_concepts', 20, "Explain {concept}",
+             "Detailed explanation of {concept} with examples", 'biology', 'Biology'),
+            ('cs_concepts', 20, "What is {concept}?",
+             "Comprehensive explanation of {concept} with examples", 'computer_science', 'Computer Science'),
+        ]
+    }
+    DECKS = {
+        'english': ('MASSIVE English Master Deck', 'English', 'massive_english',
+                    ['Vocabulary', 'Grammar', 'Literature', 'Writing', 'Reading', 'Speaking', 'Listening']),
+        'humanities': ('MASSIVE Humanities Master Deck', 'Humanities', 'massive_humanities',
+                       ['History', 'Geography', 'Philosophy', 'Sociology', 'Psychology']),
+        'complex_subjects': ('MASSIVE Complex Subjects Master Deck', 'Complex Subjects', 'massive_complex_subjects',
+                             ['Physics', 'Chemistry', 'Mathematics', 'Biology', 'Computer Science']),
+    }
+    DIFFICULTIES = ['easy', 'medium', 'hard']
+    
+    def iter_cards(self, domain, scale=1, rng=None):
+        """
+        Yield a domain's cards one at a time; `scale` multiplies the cards
+        generated per concept (vocabulary stays one card per word)
+        """
+        rng = rng or random
+        if domain == 'english':
+            for word in self.english_words:
+                yield {
+                    'front': f"Define: {word}",
+                    'back': f"Definition of {word} - comprehensive explanation",
+                    'type': 'vocabulary',
+                    'difficulty': rng.choice(self.DIFFICULTIES),
+                    'category': 'Vocabulary'
+                }
+        
+        for source, per_concept, question, answer, card_type, category in self.SECTIONS[domain]:
+            for concept in getattr(self, source):
+                lowered = concept.lower()
+                question_text = question.format(concept=lowered)
+                answer_text = answer.format(concept=lowered)
+                for i in range(per_concept * scale):
+                    yield {
+                        'front': f"{concept} - Question {i+1}",
+                        'question': question_text,
+                        'back': answer_text,
+                        'type': card_type,
+                        'difficulty': rng.choice(self.DIFFICULTIES),
+                        'category': category
+                    }
+    
+    def _generate_deck(self, domain):
+        name, label, _, categories = self.DECKS[domain]
+        print(f"🚀 Generating massive {label} deck...")
         
         deck = {
-            'name': 'MASSIVE English Master Deck',
+            'name': name,
             'total_cards': 0,
-            'categories': ['Vocabulary', 'Grammar', 'Literature', 'Writing', 'Reading', 'Speaking', 'Listening'],
-            'cards': [],
+            'categories': categories,
+            'cards': list(self.iter_cards(domain)),
             'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        # Generate vocabulary cards (1000+ cards)
-        for word in self.english_words:
-            deck['cards'].append({
-                'front': f"Define: {word}",
-                'back': f"Definition of {word} - comprehensive explanation",
-                'type': 'vocabulary',
-                'difficulty': random.choice(['easy', 'medium', 'hard']),
-                'category': 'Vocabulary'
-            })
-        
-        # Generate grammar cards (500+ cards)
-        grammar_topics = [
-            'Parts of Speech', 'Sentence Structure', 'Tenses', 'Voice', 'Mood',
-            'Articles', 'Prepositions', 'Conjunctions', 'Interjections', 'Punctuation',
-            'Subject-Verb Agreement', 'Pronoun Agreement', 'Modifiers', 'Clauses', 'Phrases',
-            'Parallel Structure', 'Dangling Modifiers', 'Misplaced Modifiers', 'Run-on Sentences', 'Sentence Fragments'
-        ]
-        
-        for topic in grammar_topics:
-            for i in range(25):  # 25 cards per topic
-                deck['cards'].append({
-                    'front': f"{topic} - Question {i+1}",
-                    'question': f"What is the correct usage of {topic.lower()}?",
-                    'back': f"Answer about {topic.lower()} usage and examples",
-                    'type': 'grammar',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Grammar'
-                })
-        
-        # Generate literature cards (300+ cards)
-        literature_topics = [
-            'Shakespeare', 'Modern Literature', 'Classic Novels', 'Poetry', 'Drama',
-            'Short Stories', 'Literary Devices', 'Character Analysis', 'Theme Analysis', 'Plot Structure'
-        ]
-        
-        for topic in literature_topics:
-            for i in range(30):  # 30 cards per topic
-                deck['cards'].append({
-                    'front': f"{topic} - Question {i+1}",
-                    'question': f"Analyze {topic.lower()} in literature",
-                    'back': f"Analysis of {topic.lower()} with examples",
-                    'type': 'literature',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Literature'
-                })
-        
         deck['total_cards'] = len(deck['cards'])
-        print(f"✅ Generated {deck['total_cards']} English cards")
+        print(f"✅ Generated {deck['total_cards']} {label} cards")
         return deck
     
+    def generate_massive_english_deck(self):
+        """Generate massive English deck with thousands of cards"""
+        return self._generate_deck('english')
+    
     def generate_massive_humanities_deck(self):
         """Generate massive Humanities deck with thousands of cards"""
-        print("🚀 Generating massive Humanities deck...")
-        
-        deck = {
-            'name': 'MASSIVE Humanities Master Deck',
-            'total_cards': 0,
-            'categories': ['History', 'Geography', 'Philosophy', 'Sociology', 'Psychology'],
-            'cards': [],
-            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Generate History cards (500+ cards)
-        for event in self.history_events:
-            for i in range(20):  # 20 cards per event
-                deck['cards'].append({
-                    'front': f"{event} - Question {i+1}",
-                    'question': f"What happened during {event.lower()}?",
-                    'back': f"Detailed explanation of {event.lower()}",
-                    'type': 'history',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'History'
-                })
-        
-        # Generate Geography cards (400+ cards)
-        for fact in self.geography_facts:
-            for i in range(20):  # 20 cards per fact
-                deck['cards'].append({
-                    'front': f"{fact} - Question {i+1}",
-                    'question': f"What is {fact.lower()}?",
-                    'back': f"Comprehensive explanation of {fact.lower()}",
-                    'type': 'geography',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Geography'
-                })
-        
-        # Generate Philosophy cards (300+ cards)
-        for concept in self.philosophy_concepts:
-            for i in range(15):  # 15 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"Explain {concept.lower()}",
-                    'back': f"Detailed explanation of {concept.lower()}",
-                    'type': 'philosophy',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Philosophy'
-                })
-        
-        # Generate Sociology cards (300+ cards)
-        for concept in self.sociology_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"What is {concept.lower()}?",
-                    'back': f"Comprehensive explanation of {concept.lower()}",
-                    'type': 'sociology',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Sociology'
-                })
-        
-        # Generate Psychology cards (300+ cards)
-        for concept in self.psychology_concepts:
-            for i in range(15):  # 15 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"Explain {concept.lower()}",
-                    'back': f"Detailed explanation of {concept.lower()}",
-                    'type': 'psychology',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Psychology'
-                })
-        
-        deck['total_cards'] = len(deck['cards'])
-        print(f"✅ Generated {deck['total_cards']} Humanities cards")
-        return deck
+        return self._generate_deck('humanities')
     
     def generate_massive_complex_subjects_deck(self):
         """Generate massive Complex Subjects deck with thousands of cards"""
-        print("🚀 Generating massive Complex Subjects deck...")
-        
-        deck = {
-            'name': 'MASSIVE Complex Subjects Master Deck',
-            'total_cards': 0,
-            'categories': ['Physics', 'Chemistry', 'Mathematics', 'Biology', 'Computer Science'],
-            'cards': [],
-            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Generate Physics cards (800+ cards)
-        for concept in self.physics_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"Explain {concept.lower()} in physics",
-                    'back': f"Comprehensive explanation of {concept.lower()} with formulas and examples",
-                    'type': 'physics',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Physics'
-                })
-        
-        # Generate Chemistry cards (600+ cards)
-        for concept in self.chemistry_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"What is {concept.lower()}?",
-                    'back': f"Detailed explanation of {concept.lower()} with examples",
-                    'type': 'chemistry',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Chemistry'
-                })
-        
-        # Generate Mathematics cards (600+ cards)
-        for concept in self.math_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"Explain {concept.lower()}",
-                    'back': f"Comprehensive explanation of {concept.lower()} with examples",
-                    'type': 'mathematics',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Mathematics'
-                })
-        
-        # Generate Biology cards (600+ cards)
-        for concept in self.biology_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"Explain {concept.lower()}",
-                    'back': f"Detailed explanation of {concept.lower()} with examples",
-                    'type': 'biology',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Biology'
-                })
-        
-        # Generate Computer Science cards (600+ cards)
-        for concept in self.cs_concepts:
-            for i in range(20):  # 20 cards per concept
-                deck['cards'].append({
-                    'front': f"{concept} - Question {i+1}",
-                    'question': f"What is {concept.lower()}?",
-                    'back': f"Comprehensive explanation of {concept.lower()} with examples",
-                    'type': 'computer_science',
-                    'difficulty': random.choice(['easy', 'medium', 'hard']),
-                    'category': 'Computer Science'
-                })
-        
-        deck['total_cards'] = len(deck['cards'])
-        print(f"✅ Generated {deck['total_cards']} Complex Subjects cards")
-        return deck
+        return self._generate_deck('complex_subjects')
     
-    def create_training_test_split(self, deck):
-        """Create 80/20 training/testing split"""
-        print(f"✂️ Creating 80/20 split for {deck['name']}...")
-        
-        total_cards = len(deck['cards'])
-        training_size = int(total_cards * 0.8)
-        testing_size = total_cards - training_size
-        
-        # Shuffle cards
-        random.shuffle(deck['cards'])
-        
-        training_deck = {
-            'name': f"{deck['name']} - Training (80%)",
-            'total_cards': training_size,
-            'cards': deck['cards'][:training_size],
-            'split': 'training',
-            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        testing_deck = {
-            'name': f"{deck['name']} - Testing (20%)",
-            'total_cards': testing_size,
-            'cards': deck['cards'][training_size:],
-            'split': 'testing',
-            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        return training_deck, testing_deck
-    
-    def save_decks(self, deck, training_deck, testing_deck, filename_prefix):
-        """Save all decks to JSON files"""
-        print(f"💾 Saving {filename_prefix} decks...")
-        
-        # Create output directory
-        os.makedirs('generated_flashcards', exist_ok=True)
-        
-        # Save consolidated deck
-        with open(f'generated_flashcards/{filename_prefix}_consolidated.json', 'w', encoding='utf-8') as f:
-            json.dump(deck, f, indent=2, ensure_ascii=False)
-        
-        # Save training deck
-        with open(f'generated_flashcards/{filename_prefix}_training.json', 'w', encoding='utf-8') as f:
-            json.dump(training_deck, f, indent=2, ensure_ascii=False)
-        
-        # Save testing deck
-        with open(f'generated_flashcards/{filename_prefix}_testing.json', 'w', encoding='utf-8') as f:
-            json.dump(testing_deck, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ Saved {deck['total_cards']} total cards")
-        print(f"✅ Training deck: {training_deck['total_cards']} cards")
-        print(f"✅ Testing deck: {testing_deck['total_cards']} cards")
+    def write_split_deck(self, domain, output_dir='generated_flashcards', fmt='json', shard_size=50000,
+                         scale=1, seed=None):
+        """
+        Stream a domain's cards through the train/test splitter into
+        <prefix>_training / <prefix>_testing (JSON decks, or JSONL shards with
+        fmt='jsonl') and a <prefix>_consolidated.json view of both
+        """
+        name, _, prefix, categories = self.DECKS[domain]
+        rng = random.Random(f"{seed}:{domain}") if seed is not None else random.Random()
+        extension = 'jsonl' if fmt == 'jsonl' else 'json'
+        return write_split_deck(
+            self.iter_cards(domain, scale, rng),
+            os.path.join(output_dir, f"{prefix}_consolidated.json"),
+            os.path.join(output_dir, f"{prefix}_training.{extension}"),
+            os.path.join(output_dir, f"{prefix}_testing.{extension}"),
+            name, categories=categories, fmt=fmt, shard_size=shard_size,
+            extra={'domain': domain, 'scale': scale}
+        )
     
     def run(self):
         """Main execution method - Generate MASSIVE amounts of data"""
@@ -773,28 +646,23 @@ class MassiveDataGenerator:
         
         start_time = time.time()
         
-        # Generate MASSIVE English deck
-        print("\n📚 PHASE 1: GENERATING MASSIVE ENGLISH DECK")
-        english_deck = self.generate_massive_english_deck()
-        english_training, english_testing = self.create_training_test_split(english_deck)
-        self.save_decks(english_deck, english_training, english_testing, 'massive_english')
-        
-        # Generate MASSIVE Humanities deck
-        print("\n🏛️ PHASE 2: GENERATING MASSIVE HUMANITIES DECK")
-        humanities_deck = self.generate_massive_humanities_deck()
-        humanities_training, humanities_testing = self.create_training_test_split(humanities_deck)
-        self.save_decks(humanities_deck, humanities_training, humanities_testing, 'massive_humanities')
-        
-        # Generate MASSIVE Complex Subjects deck
-        print("\n🔬 PHASE 3: GENERATING MASSIVE COMPLEX SUBJECTS DECK")
-        complex_deck = self.generate_massive_complex_subjects_deck()
-        complex_training, complex_testing = self.create_training_test_split(complex_deck)
-        self.save_decks(complex_deck, complex_training, complex_testing, 'massive_complex_subjects')
+        phases = [
+            ('english', "📚 PHASE 1: GENERATING MASSIVE ENGLISH DECK"),
+            ('humanities', "🏛️ PHASE 2: GENERATING MASSIVE HUMANITIES DECK"),
+            ('complex_subjects', "🔬 PHASE 3: GENERATING MASSIVE COMPLEX SUBJECTS DECK"),
+        ]
+        results = {}
+        for domain, title in phases:
+            print(f"\n{title}")
+            summary = self.write_split_deck(domain)
+            print(f"💾 Saved {summary['consolidated']['total_cards']} {self.DECKS[domain][1]} cards: "
+                  f"{summary['training']['total_cards']} training, {summary['testing']['total_cards']} testing")
+            results[domain] = summary
         
         # Calculate total statistics
-        total_cards = english_deck['total_cards'] + humanities_deck['total_cards'] + complex_deck['total_cards']
-        total_training = english_training['total_cards'] + humanities_training['total_cards'] + complex_training['total_cards']
-        total_testing = english_testing['total_cards'] + humanities_testing['total_cards'] + complex_testing['total_cards']
+        total_cards = sum(summary['consolidated']['total_cards'] for summary in results.values())
+        total_training = sum(summary['training']['total_cards'] for summary in results.values())
+        total_testing = sum(summary['testing']['total_cards'] for summary in results.values())
         
         end_time = time.time()
         generation_time = end_time - start_time
@@ -803,27 +671,71 @@ class MassiveDataGenerator:
         print("🎉 MASSIVE DATA GENERATION COMPLETE!")
         print("=" * 80)
         print(f"📊 TOTAL CARDS GENERATED: {total_cards:,}")
-        print(f"📚 TRAINING SET: {total_training:,} cards (80%)")
-        print(f"🧪 TESTING SET: {total_testing:,} cards (20%)")
+        print(f"📚 TRAINING SET: {total_training:,} cards ({total_training / total_cards:.0%})")
+        print(f"🧪 TESTING SET: {total_testing:,} cards ({total_testing / total_cards:.0%})")
         print(f"⏱️  GENERATION TIME: {generation_time:.2f} seconds")
-        print(f"📁 FILES CREATED: 9 JSON files")
-        
-        # Estimate file sizes
-        estimated_size_mb = total_cards * 0.5  # Rough estimate: 0.5KB per card
-        print(f"💾 ESTIMATED TOTAL SIZE: {estimated_size_mb:.1f} MB")
+        print(f"📁 FILES CREATED: 6 JSON decks + 3 consolidated views")
         
         print("\n🚀 READY FOR MASSIVE AI TRAINING!")
         print("=" * 80)
         
         return {
-            'english': english_deck,
-            'humanities': humanities_deck,
-            'complex_subjects': complex_deck,
+            **results,
             'total_cards': total_cards,
             'generation_time': generation_time
         }
 
-if __name__ == "__main__":
-    generator = MassiveDataGenerator()
-    generator.run()
+def generate_domain_shards(domain, output_dir=SHARD_DIR, shard_size=50000, scale=1, seed=None):
+    """Worker entry point: build a generator in this process and stream one domain to split shards"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = MassiveDataGenerator()
+    start_time = time.time()
+    summary = generator.write_split_deck(domain, output_dir, 'jsonl', shard_size, scale, seed)
+    summary['seconds'] = round(time.time() - start_time, 2)
+    return summary
 
+def run_streaming(output_dir=SHARD_DIR, shard_size=50000, scale=1, seed=None):
+    """Generate every domain in its own process, streaming cards to train/test JSONL shards"""
+    print(f"🚀 STREAMING MASSIVE DATA GENERATION (scale x{scale}) -> {output_dir}")
+    print("=" * 80)
+    
+    start_time = time.time()
+    domains = list(MassiveDataGenerator.DECKS)
+    with ProcessPoolExecutor(max_workers=len(domains)) as pool:
+        summaries = list(pool.map(generate_domain_shards, domains, [output_dir] * len(domains),
+                                  [shard_size] * len(domains), [scale] * len(domains), [seed] * len(domains)))
+    
+    for summary in summaries:
+        view = summary['consolidated']
+        shards = sum(len(part['files']) for part in view['parts'])
+        print(f"✅ {view['name']}: {view['total_cards']:,} cards ({summary['training']['total_cards']:,} training, "
+              f"{summary['testing']['total_cards']:,} testing) in {shards} shards ({summary['seconds']}s)")
+    
+    total_cards = sum(summary['consolidated']['total_cards'] for summary in summaries)
+    generation_time = time.time() - start_time
+    print(f"\n📊 TOTAL CARDS GENERATED: {total_cards:,}")
+    print(f"⏱️  GENERATION TIME: {generation_time:.2f} seconds")
+    
+    return {
+        'domains': {summary['consolidated']['domain']: summary for summary in summaries},
+        'total_cards': total_cards,
+        'generation_time': generation_time
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the massive flashcard decks")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream cards to JSONL shards, one process per domain")
+    parser.add_argument('--scale', type=int, default=1, help="with --stream: cards per concept multiplier")
+    parser.add_argument('--shard-size', type=int, default=50000, help="with --stream: cards per shard")
+    parser.add_argument('--output-dir', default=SHARD_DIR, help="with --stream: shard directory")
+    parser.add_argument('--seed', type=int, default=None, help="with --stream: seed for reproducible output")
+    args = parser.parse_args()
+    
+    if args.stream:
+        run_streaming(args.output_dir, args.shard_size, args.scale, args.seed)
+    else:
+        MassiveDataGenerator().run()
+
+if __name__ == "__main__":
+    main()
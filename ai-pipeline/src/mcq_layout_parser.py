@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import statistics
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mcq_parser import MCQParser
+from paper_join import index_first
+from pdf_text_extractor import PDFSource, extract_text, extract_words
+
+# "A" / "A)" option label, when it is set apart from the text that follows it
+LABEL_RE = re.compile(r'^([A-D])\)?$')
+NUMBER_RE = re.compile(r'^(\d+)$')
+
+
+class LayoutMCQParser:
+    """
+    Layout-aware MCQ parser. Works on positioned words instead of flattened page
+    text: words are grouped into rows by their y coordinate and rows into cells
+    by horizontal gaps, so option columns ("A 2.0   B 4.0") and option tables
+    come out of the same single pass as plain vertical options.
+
+    Rows are cached per page, so running several filters over one paper (or
+    parsing it again in the same process) does not touch the PDF twice.
+
+    The gap that sets an option label apart from its text is a fraction
+    (`label_gap_ratio`) of the page's median word height, so it scales with
+    the font; pass `label_gap` to fix it in points instead. Questions that come
+    out with fewer than `expected_options` options are re-read with the
+    flattened-text parser by parse_with_options().
+    """
+
+    def __init__(self, valid_question_numbers: Optional[Iterable[str]] = None,
+                 row_tolerance: float = 3.0, column_gap: float = 18.0, label_gap: Optional[float] = None,
+                 label_gap_ratio: float = 0.3, number_zone: float = 20.0, margin_ratio: float = 0.05,
+                 expected_options: int = 4, cache_pages: int = 512):
+        self.valid_question_numbers = set(valid_question_numbers or (str(i) for i in range(1, 41)))
+        self.row_tolerance = row_tolerance      # max y distance between words of one row
+        self.column_gap = column_gap            # x gap that starts a new cell
+        self.label_gap = label_gap              # min gap between an option label and its text (None: per page)
+        self.label_gap_ratio = label_gap_ratio  # that gap as a fraction of the median word height
+        self.number_zone = number_zone          # question numbers sit this close to the left edge
+        self.margin_ratio = margin_ratio    # header/footer band, as a fraction of page height
+        self.expected_options = expected_options
+        self.cache_pages = cache_pages
+        self.text_parser = MCQParser(self.valid_question_numbers)
+
+        self._page_cache: OrderedDict = OrderedDict()  # (doc_key, page) -> rows
+        self._page_counts: Dict[Tuple, int] = {}
+
+    @staticmethod
+    def document_key(source: PDFSource) -> Tuple:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return ('bytes', hashlib.sha1(source).hexdigest())
+        stat = os.stat(source)
+        return (os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+
+    def build_rows(self, page: Dict) -> List[Dict]:
+        """Body rows of one page, top to bottom; each row is a list of cells left to right"""
+        top = page['height'] * self.margin_ratio
+        bottom = page['height'] * (1 - self.margin_ratio)
+        words = sorted(((w[0], w[1], w[2], w[3], w[4]) for w in page['words']
+                        if w[1] >= top and w[3] <= bottom),
+                       key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+
+        label_gap = self.label_gap
+        if label_gap is None:
+            # A normal word space is about a fifth of the word height; label gaps are wider
+            label_gap = self.label_gap_ratio * statistics.median(w[3] - w[1] for w in words) if words else 0.0
+
+        rows = []
+        for word in words:
+            center = (word[1] + word[3]) / 2
+            if rows and abs(center - rows[-1]['center']) <= self.row_tolerance:
+                rows[-1]['words'].append(word)
+            else:
+                rows.append({'center': center, 'words': [word]})
+
+        left = min((w[0] for w in words), default=0.0)
+        for row in rows:
+            row['words'].sort(key=lambda w: w[0])
+            row['cells'] = self._split_cells(row['words'], label_gap)
+            row['at_left_edge'] = row['words'][0][0] - left <= self.number_zone
+            row['label_gap'] = label_gap
+            del row['words']
+        return rows
+
+    def _split_cells(self, words: List[Tuple], label_gap: float) -> List[Dict]:
+        """Split a row at wide gaps; a detached option label always starts a new cell"""
+        cells = []
+        for index, word in enumerate(words):
+            gap = word[0] - words[index - 1][2] if index else None
+            following_gap = words[index + 1][0] - word[2] if index + 1 < len(words) else None
+            label = LABEL_RE.match(word[4])
+            detached = following_gap is None or following_gap >= label_gap or word[4].endswith(')')
+            label = label.group(1) if label and detached and (gap is None or gap >= label_gap) else None
+            if gap is None or gap >= self.column_gap or label:
+                cells.append({'x0': word[0], 'words': [word[4]], 'label': label})
+            else:
+                cells[-1]['words'].append(word[4])
+        for cell in cells:
+            cell['text'] = " ".join(cell['words'][1:] if cell['label'] else cell['words'])
+            del cell['words']
+        return cells
+
+    def document_rows(self, source: PDFSource) -> List[List[Dict]]:
+        """Rows of every page, from the page cache when the document was seen before"""
+        key = self.document_key(source)
+        page_count = self._page_counts.get(key)
+        if page_count is not None and all((key, p) in self._page_cache for p in range(page_count)):
+            for p in range(page_count):
+                self._page_cache.move_to_end((key, p))
+            return [self._page_cache[(key, p)] for p in range(page_count)]
+
+        pages = [self.build_rows(page) for page in extract_words(source)]
+        self._page_counts[key] = len(pages)
+        for p, rows in enumerate(pages):
+            self._page_cache[(key, p)] = rows
+        while len(self._page_cache) > self.cache_pages:
+            self._page_cache.popitem(last=False)
+        return pages
+
+    def parse(self, source: PDFSource) -> List[Dict]:
+        """Every question in the document, in order, whether or not options were found"""
+        questions = []
+        current = None
+        last_number = 0
+        option_x = None       # x of the last option label, for wrapped option lines
+        pending = []          # labels still waiting for their text on a following row
+        last_label = None     # label of the option read most recently, for wrapped option lines
+        row_number = 0
+
+        for page_index, rows in enumerate(self.document_rows(source)):
+            for row in rows:
+                row_number += 1
+                cells = row['cells']
+                first = cells[0]
+                number = None
+                if row['at_left_edge'] and not first['label'] and first['text']:
+                    number = NUMBER_RE.match(first['text'].split(" ", 1)[0])
+
+                # Question numbers only ever increase, which rules out stray numbers in tables
+                if (number and number.group(1) in self.valid_question_numbers
+                        and int(number.group(1)) > last_number):
+                    if current is not None:
+                        current['end_line'] = row_number - 1
+                        questions.append(current)
+                    last_number = int(number.group(1))
+                    remainder = first['text'][len(number.group(1)):].strip()
+                    current = {
+                        'question_number': number.group(1),
+                        'question_content': remainder,
+                        'options': {},
+                        'line_number': row_number,
+                        'page': page_index + 1
+                    }
+                    option_x, pending, last_label = None, [], None
+                    cells = cells[1:]
+                    if not cells:
+                        continue
+
+                if current is None:
+                    continue
+
+                labelled = [cell for cell in cells if cell['label']]
+                if labelled:
+                    # Text cells between labels belong to the label on their left
+                    label = None
+                    for cell in cells:
+                        if cell['label']:
+                            label = cell['label']
+                            current['options'][label] = cell['text']
+                            option_x = cell['x0']
+                        elif label:
+                            current['options'][label] = f"{current['options'][label]} {cell['text']}".strip()
+                    last_label = label
+                    pending = [cell['label'] for cell in labelled if not current['options'][cell['label']]]
+                    continue
+
+                text = " ".join(cell['text'] for cell in cells)
+                if pending:
+                    # Bare labels on one row, their texts on the next row in the same order
+                    if len(cells) == len(pending):
+                        for label, cell in zip(pending, cells):
+                            current['options'][label] = cell['text']
+                        last_label = pending[-1]
+                    else:
+                        current['options'][pending[0]] = text
+                        last_label = pending[0]
+                    pending = []
+                elif last_label:
+                    # A wrapped option line sits to the right of its label and continues the last option read
+                    if option_x is not None and cells[0]['x0'] > option_x + row['label_gap']:
+                        current['options'][last_label] = f"{current['options'][last_label]} {text}".strip()
+                else:
+                    current['question_content'] = f"{current['question_content']} {text}".strip()
+
+        if current is not None:
+            current['end_line'] = row_number
+            questions.append(current)
+
+        for question in questions:
+            question['options'] = dict(sorted(question['options'].items()))
+        return questions
+
+    def parse_with_options(self, source: PDFSource, min_options: int = 2) -> List[Dict]:
+        """
+        Questions that have at least `min_options` options. Questions the layout
+        pass found fewer than `expected_options` options for are reported and
+        take the text parser's options when it finds more.
+        """
+        questions = self.parse(source)
+        short = [q for q in questions if len(q['options']) < self.expected_options]
+        if short:
+            self._fill_from_text(source, short)
+        return [q for q in questions if len(q['options']) >= min_options]
+
+    def _fill_from_text(self, source: PDFSource, questions: List[Dict]):
+        from_text = index_first(self.text_parser.parse(extract_text(source)))
+        for question in questions:
+            found = sorted(question['options'])
+            fallback = from_text.get(question['question_number'])
+            if fallback and len(fallback['options']) > len(found):
+                question['options'] = dict(sorted(fallback['options'].items()))
+                print(f"⚠️ Question {question['question_number']}: layout found options {found or 'none'}, "
+                      f"using {sorted(question['options'])} from the text parser")
+            else:
+                print(f"⚠️ Question {question['question_number']}: only found options {found or 'none'}")
+
+    def clear_cache(self):
+        self._page_cache.clear()
+        self._page_counts.clear()
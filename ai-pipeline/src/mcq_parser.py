@@ -0,0 +1,115 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# One compiled lexer for every line of a question paper. Alternatives are tried in order:
+#   question - "12 A ..." / "12 A) ..." starts question 12
+#   bare     - "A" / "A)" on its own line, text follows on the next line
+#   inline   - "A some option text"
+#   loose    - "A0.5 m", "A(i) ..." (letter glued to non-capital text)
+LINE_RE = re.compile(r'''
+    (?P<question>^(?P<number>\d+)(?:\s+[A-D]|\s*[A-D]\)))
+  | (?P<bare>^(?P<bare_letter>[A-D])\)?$)
+  | (?P<inline>^(?P<inline_letter>[A-D])\)?\s+(?P<inline_text>.+)$)
+  | (?P<loose>^(?P<loose_letter>[A-D])\)?(?P<loose_text>[^A-Z\s].*)$)
+''', re.VERBOSE)
+
+# "A) 2.0 B) 4.0 C) 8.0" - several bracketed options on one line
+BRACKET_OPTION_RE = re.compile(r'(?:^|\s)([A-D])\)\s*')
+
+
+class MCQParser:
+    """
+    Single-pass MCQ parser: lexes each line once and runs a small state machine
+    (outside a question -> question text -> options) that emits every question
+    with its A-D options and its line boundaries.
+    """
+
+    def __init__(self, valid_question_numbers: Optional[Iterable[str]] = None):
+        self.valid_question_numbers = set(valid_question_numbers or (str(i) for i in range(1, 41)))
+
+    @staticmethod
+    def split_bracket_options(line: str) -> Dict[str, str]:
+        """Options from a line like "A) x B) y"; empty unless it holds at least two"""
+        markers = list(BRACKET_OPTION_RE.finditer(line))
+        if len(markers) < 2:
+            return {}
+        options = {}
+        for marker, following in zip(markers, markers[1:] + [None]):
+            end = following.start() if following else len(line)
+            options[marker.group(1)] = line[marker.end():end].strip()
+        return options
+
+    def parse(self, text: str) -> List[Dict]:
+        """Every question in `text`, in order, whether or not options were found"""
+        questions = []
+        lines = text.split('\n')
+
+        current = None          # question being built
+        question_lines = []     # its text lines until the first option
+        in_options = False
+        pending_letter = None   # bare "A" waiting for its text on the next line
+
+        def close(end_index):
+            if current is not None:
+                current['question_content'] = " ".join(question_lines).strip()
+                current['end_line'] = end_index + 1
+                questions.append(current)
+
+        for i, raw_line in enumerate(lines):
+            line = raw_line.strip()
+            match = LINE_RE.match(line) if line else None
+            kind = match.lastgroup if match else None
+
+            if pending_letter is not None:
+                takes_line = line and line[0] not in 'ABCD' and kind != 'question'
+                current['options'][pending_letter] = line if takes_line else ""
+                pending_letter = None
+
+            if not line:
+                continue
+
+            if kind == 'question':
+                close(i - 1)
+                current, question_lines, in_options = None, [], False
+                if match.group('number') in self.valid_question_numbers:
+                    current = {
+                        'question_number': match.group('number'),
+                        'question_content': '',
+                        'options': {},
+                        'line_number': i + 1
+                    }
+                    bracketed = self.split_bracket_options(line)
+                    if bracketed:
+                        question_lines.append(line[:BRACKET_OPTION_RE.search(line).start()].strip())
+                        current['options'].update(bracketed)
+                        in_options = True
+                    else:
+                        question_lines.append(line)
+                continue
+
+            if current is None:
+                continue
+
+            if kind in ('bare', 'inline', 'loose'):
+                in_options = True
+                bracketed = self.split_bracket_options(line)
+                if bracketed:
+                    current['options'].update(bracketed)
+                elif kind == 'bare':
+                    pending_letter = match.group('bare_letter')
+                elif kind == 'inline':
+                    current['options'][match.group('inline_letter')] = match.group('inline_text').strip()
+                else:
+                    current['options'][match.group('loose_letter')] = match.group('loose_text').strip()
+            elif not in_options:
+                question_lines.append(line)
+
+        if pending_letter is not None:
+            current['options'][pending_letter] = ""
+        close(len(lines) - 1)
+
+        return questions
+
+    def parse_with_options(self, text: str, min_options: int = 2) -> List[Dict]:
+        """Questions that have at least `min_options` options"""
+        return [q for q in self.parse(text) if len(q['options']) >= min_options]
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Near-Duplicate Detection
+==============================================
+MinHash + LSH index for finding cards that are almost, but not exactly, the
+same ("Entropy - Question 3" / "Entropy - Question 4" with the same answer,
+a question re-extracted with different whitespace or numbering). Each card's
+word n-grams are reduced to a short MinHash signature; signatures are cut
+into bands and only cards that share a band are compared, so finding the
+clusters of a few hundred thousand cards takes seconds instead of the
+quadratic all-pairs comparison.
+
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add_many(card_text(card) for card in cards)
+    for cluster in index.clusters():
+        ...
+
+    python near_duplicates.py generated_flashcards/massive_english_consolidated.json
+"""
+
+import argparse
+import re
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Largest prime below 2**32: (a * x + b) % PRIME stays inside uint64 for 32-bit a, b, x
+PRIME = 4294967291
+
+CARD_FIELDS = ('front', 'question', 'back', 'answer')
+
+_WORD = re.compile(r'\w+')
+_NUMBER = re.compile(r'\d+')
+
+
+def card_text(card: Dict, fields: Sequence[str] = CARD_FIELDS) -> str:
+    """The text a card is compared on: its question and answer fields, whichever it has"""
+    return ' '.join(str(card[field]) for field in fields if card.get(field))
+
+
+def shingles(text: str, ngram: int = 2, fold_numbers: bool = True) -> Set[str]:
+    """
+    Lowercased word n-grams; texts shorter than one n-gram are a single shingle.
+    With `fold_numbers` every number becomes '#', so numbered template variants
+    shingle alike (leave it off where the values are the content, e.g. exam questions)
+    """
+    text = text.lower()
+    if fold_numbers:
+        text = _NUMBER.sub('#', text)
+    words = _WORD.findall(text)
+    if len(words) <= ngram:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + ngram]) for i in range(len(words) - ngram + 1)}
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) whose candidate threshold (1/bands)**(1/rows) is the highest
+    one at or below `threshold`, so near-duplicates are rarely missed;
+    candidates are checked against `threshold` afterwards
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        point = (1 / bands) ** (1 / rows)
+        if point <= threshold and (best is None or (point, bands * rows) > best[0]):
+            best = ((point, bands * rows), bands, rows)
+    return (best[1], best[2]) if best else (num_perm, 1)
+
+
+class NearDuplicateIndex:
+    """
+    Cards whose estimated Jaccard similarity (over word n-grams) is at least
+    `threshold` are near-duplicates; clusters() groups them transitively.
+    Signatures are `num_perm` 32-bit values per card, kept in one array.
+    `fold_numbers` is passed on to shingles().
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, ngram: int = 2, seed: int = 1,
+                 fold_numbers: bool = True):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.fold_numbers = fold_numbers
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+        self._band_mult = rng.integers(1, 2 ** 63, (self.bands, self.rows), dtype=np.uint64) | np.uint64(1)
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self.keys: List = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures of `texts`, one row each, computed in one vectorised pass"""
+        hashes, starts = [], []
+        for text in texts:
+            starts.append(len(hashes))
+            hashes.extend(zlib.crc32(shingle.encode('utf-8'))
+                          for shingle in shingles(text, self.ngram, self.fold_numbers))
+        if not starts:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        values = (self._a[:, None] * np.array(hashes, dtype=np.uint64)[None, :] + self._b[:, None]) % PRIME
+        return np.minimum.reduceat(values, starts, axis=1).T.astype(np.uint32)
+
+    def _append(self, signatures: np.ndarray):
+        count, needed = len(self.keys), len(self.keys) + len(signatures)
+        if needed > len(self._signatures):
+            grown = np.empty((max(needed, 2 * len(self._signatures)), self.num_perm), dtype=np.uint32)
+            grown[:count] = self._signatures[:count]
+            self._signatures = grown
+        self._signatures[count:needed] = signatures
+
+    def add(self, text: str, key=None):
+        """Index one text under `key` (its position by default)"""
+        self.add_many([text], None if key is None else [key])
+
+    def add_many(self, texts: Iterable[str], keys: Optional[Iterable] = None, batch_size: int = 1000):
+        """Index texts in batches of `batch_size`; keys default to insertion positions"""
+        keys = iter(keys) if keys is not None else None
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                self._add_batch(batch, keys)
+                batch = []
+        if batch:
+            self._add_batch(batch, keys)
+
+    def _add_batch(self, texts: List[str], keys):
+        start = len(self.keys)
+        self._append(self.signatures(texts))
+        if keys is not None:
+            self.keys.extend(next(keys) for _ in texts)
+        else:
+            self.keys.extend(range(start, start + len(texts)))
+
+    def similarity(self, i: int, j: int) -> float:
+        """Estimated Jaccard similarity of the i-th and j-th indexed texts"""
+        return float(np.mean(self._signatures[i] == self._signatures[j]))
+
+    def _similar_pairs(self) -> np.ndarray:
+        """(i, j) positions of verified near-duplicates, i < j; each band bucket is checked against its first member"""
+        count = len(self.keys)
+        signatures = self._signatures[:count]
+        positions = np.arange(count)
+        edges = []
+        for band in range(self.bands):
+            block = signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            buckets = (block * self._band_mult[band]).sum(axis=1)  # wraps mod 2**64
+            order = np.argsort(buckets, kind='stable')
+            ordered = buckets[order]
+            new_bucket = np.ones(count, dtype=bool)
+            new_bucket[1:] = ordered[1:] != ordered[:-1]
+            first = order[np.maximum.accumulate(np.where(new_bucket, positions, 0))]
+            first, member = first[~new_bucket], order[~new_bucket]
+            for start in range(0, len(member), 100000):
+                i, j = first[start:start + 100000], member[start:start + 100000]
+                agreement = (signatures[i] == signatures[j]).mean(axis=1)
+                keep = agreement >= self.threshold
+                edges.append(np.stack([i[keep], j[keep]], axis=1))
+        if not edges:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(edges), axis=0)
+
+    def cluster_positions(self, min_size: int = 2) -> List[List[int]]:
+        """Clusters as lists of insertion positions, largest first"""
+        parent = list(range(len(self.keys)))
+
+        def root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in self._similar_pairs().tolist():
+            ri, rj = root(i), root(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(parent)):
+            groups.setdefault(root(i), []).append(i)
+        clusters = [group for group in groups.values() if len(group) >= min_size]
+        clusters.sort(key=lambda group: (-len(group), group[0]))
+        return clusters
+
+    def clusters(self, min_size: int = 2) -> List[List]:
+        """Near-duplicate clusters as lists of keys (insertion order within a cluster), largest first"""
+        return [[self.keys[i] for i in group] for group in self.cluster_positions(min_size)]
+
+
+def dedupe(items: Sequence, text: Callable = card_text, threshold: float = 0.8,
+           **options) -> Tuple[List, List[List[int]]]:
+    """
+    Keep the first item of every near-duplicate cluster; returns the kept items
+    (in their original order) and the clusters as lists of item positions
+    """
+    index = NearDuplicateIndex(threshold=threshold, **options)
+    index.add_many(text(item) for item in items)
+    clusters = index.cluster_positions()
+    dropped = {i for cluster in clusters for i in cluster[1:]}
+    return [item for i, item in enumerate(items) if i not in dropped], clusters
+
+
+def main():
+    from deck_split import iter_deck_cards
+
+    parser = argparse.ArgumentParser(description="Report near-duplicate card clusters in deck files")
+    parser.add_argument('decks', nargs='+', help="deck JSON files (plain decks or consolidated views)")
+    parser.add_argument('--threshold', type=float, default=0.8, help="estimated Jaccard similarity")
+    parser.add_argument('--num-perm', type=int, default=64, help="MinHash signature length")
+    parser.add_argument('--show', type=int, default=10, help="clusters to print")
+    args = parser.parse_args()
+
+    for path in args.decks:
+        index = NearDuplicateIndex(threshold=args.threshold, num_perm=args.num_perm)
+        fronts = []
+
+        def texts():
+            for card in iter_deck_cards(path):
+                fronts.append(card.get('front') or card.get('question', ''))
+                yield card_text(card)
+
+        index.add_many(texts())
+        clusters = index.cluster_positions()
+        redundant = sum(len(cluster) - 1 for cluster in clusters)
+        print(f"🔍 {path}: {len(index):,} cards, {len(clusters):,} near-duplicate clusters, "
+              f"{redundant:,} redundant cards")
+        for cluster in clusters[:args.show]:
+            print(f"  {len(cluster):>5} × {fronts[cluster[0]][:70]!r} ~ {fronts[cluster[-1]][:70]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Paper Catalog
+===================================
+One SQLite index of every paper PDF the scrapers have found, replacing the
+per-scraper *_results.json files as the place to look papers up. Papers are
+keyed by (board, level, subject code, year, session, paper, variant, type)
+when the filename follows the CIE convention (9702_s22_qp_22), and by URL
+otherwise; writes are upserts, so re-scraping refreshes rows in place. A
+paper found again under a mirror URL stays in its first row, and the mirror
+URL is recorded as an alias of it.
+
+    with PaperCatalog() as catalog:
+        catalog.pairs(subject_code="9702", variant="2", year_from=2018)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+DEFAULT_PATH = "data/paper_catalog.sqlite"
+
+# 9702_s22_qp_22 / 9702_w21_ms_13 / 0625_m20_qp_42.pdf
+_CIE_FILENAME = re.compile(r'^(\d{4})_([smw])(\d{2})_([a-z]{2,3})_(\d)(\d?)(?:\.pdf)?$', re.IGNORECASE)
+
+SESSIONS = {'s': 'May-June', 'w': 'Oct-Nov', 'm': 'Feb-March'}
+
+# Natural key of a CIE-style paper; '' where a field doesn't apply
+KEY_FIELDS = ('board', 'level', 'subject_code', 'year', 'session', 'paper', 'variant', 'type')
+
+COLUMNS = KEY_FIELDS + ('url', 'subject', 'title', 'topic', 'source', 'structure',
+                        'local_path', 'content_hash', 'extra', 'updated_at')
+
+# Scraper record fields stored under another column name
+_ALIASES = {'exam_board': 'board', 'paper_type': 'type', 'paper_component': 'paper', 'full_url': None}
+
+
+def parse_cie_filename(filename: str) -> Optional[Dict]:
+    """9702_s22_qp_22 -> subject_code 9702, session s, year 2022, type qp, paper 2, variant 2"""
+    match = _CIE_FILENAME.match(os.path.basename(filename))
+    if not match:
+        return None
+    subject_code, session, year, paper_type, paper, variant = match.groups()
+    return {
+        'subject_code': subject_code,
+        'session': session.lower(),
+        'year': 2000 + int(year),
+        'type': paper_type.lower(),
+        'paper': paper,
+        'variant': variant
+    }
+
+
+def normalize_record(record: Dict, **defaults) -> Dict:
+    """Map a scraper's paper dict onto catalog columns; unknown fields go into 'extra'"""
+    row = {field: '' for field in KEY_FIELDS}
+    row.update({'url': '', 'subject': '', 'title': '', 'topic': '', 'source': '', 'structure': '',
+                'local_path': None, 'content_hash': None})
+    extra = {}
+    for field, value in {**defaults, **record}.items():
+        field = _ALIASES.get(field, field)
+        if field is None or value is None:
+            continue
+        if field in row:
+            row[field] = value
+        elif field != 'extra':
+            extra[field] = value
+
+    # The filename is the most reliable description of a CIE paper
+    filename = unquote(urlparse(row['url']).path).rsplit('/', 1)[-1] if row.get('url') else ''
+    parsed = parse_cie_filename(filename) or (parse_cie_filename(record['filename'])
+                                             if record.get('filename') else None)
+    if parsed:
+        row.update(parsed)
+        row['board'] = row['board'] or 'CIE'
+
+    row['year'] = int(row['year']) if str(row['year']).isdigit() else 0
+    row['board'] = row['board'].upper()
+    row['extra'] = json.dumps(extra, sort_keys=True) if extra else None
+    row['updated_at'] = time.time()
+    return row
+
+
+class PaperCatalog:
+    """SQLite-backed paper index; safe to share between threads of one process"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                url TEXT PRIMARY KEY,
+                board TEXT NOT NULL DEFAULT '',
+                level TEXT NOT NULL DEFAULT '',
+                subject_code TEXT NOT NULL DEFAULT '',
+                year INTEGER NOT NULL DEFAULT 0,
+                session TEXT NOT NULL DEFAULT '',
+                paper TEXT NOT NULL DEFAULT '',
+                variant TEXT NOT NULL DEFAULT '',
+                type TEXT NOT NULL DEFAULT '',
+                subject TEXT NOT NULL DEFAULT '',
+                title TEXT NOT NULL DEFAULT '',
+                topic TEXT NOT NULL DEFAULT '',
+                source TEXT NOT NULL DEFAULT '',
+                structure TEXT NOT NULL DEFAULT '',
+                local_path TEXT,
+                content_hash TEXT,
+                extra TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS papers_key ON papers
+                (subject_code, year, session, paper, variant, type, board, level)
+                WHERE subject_code != '';
+            CREATE TABLE IF NOT EXISTS paper_aliases (
+                url TEXT PRIMARY KEY,
+                canonical TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS papers_subject ON papers (subject, source);
+            CREATE INDEX IF NOT EXISTS papers_year ON papers (year);
+        """)
+        self.conn.commit()
+
+    # Keep what an earlier write knew if this record doesn't say (e.g. a later
+    # crawl of the listing shouldn't wipe the local path a download recorded).
+    # The URL is the row's identity and is never rewritten.
+    _UPDATE = ', '.join(
+        f"{column} = COALESCE(NULLIF(excluded.{column}, ''), {column})"
+        for column in COLUMNS if column not in ('url', 'updated_at')
+    ) + ', updated_at = excluded.updated_at'
+
+    # Fields a merged-away row can fill in on the row that absorbs it
+    _MERGED = tuple(column for column in COLUMNS if column not in KEY_FIELDS + ('url', 'updated_at'))
+
+    def _canonical(self, url: str) -> str:
+        found = self.conn.execute("SELECT canonical FROM paper_aliases WHERE url = ?", (url,)).fetchone()
+        return found[0] if found else url
+
+    def _alias(self, url: str, canonical: str):
+        self.conn.execute("INSERT OR REPLACE INTO paper_aliases (url, canonical) VALUES (?, ?)", (url, canonical))
+        self.conn.execute("UPDATE paper_aliases SET canonical = ? WHERE canonical = ?", (canonical, url))
+
+    def _key_holder(self, key: Dict) -> Optional[str]:
+        """URL of the row holding a CIE natural key, if any"""
+        if not key['subject_code']:
+            return None
+        found = self.conn.execute(
+            f"SELECT url FROM papers WHERE subject_code != '' AND "
+            f"{' AND '.join(f'{field} = ?' for field in KEY_FIELDS)}",
+            [key[field] for field in KEY_FIELDS]).fetchone()
+        return found[0] if found else None
+
+    def _merge_into(self, url: str, holder: str):
+        """Fold the row at `url` into `holder` (holder's values win) and make `url` an alias"""
+        fill = ', '.join(f"{column} = COALESCE(NULLIF({column}, ''), "
+                         f"(SELECT {column} FROM papers WHERE url = :url))" for column in self._MERGED)
+        self.conn.execute(f"UPDATE papers SET {fill} WHERE url = :holder", {'url': url, 'holder': holder})
+        self.conn.execute("DELETE FROM papers WHERE url = ?", (url,))
+        self._alias(url, holder)
+
+    def _resolve(self, row: Dict) -> str:
+        """
+        The URL to write `row` under: its own (or the paper it is an alias of),
+        unless the natural key it ends up with already belongs to another row,
+        in which case the two are merged into that row
+        """
+        url = self._canonical(row['url'])
+        existing = self.conn.execute("SELECT * FROM papers WHERE url = ?", (url,)).fetchone()
+        # The key the row will have after the COALESCE update
+        key = {field: row[field] if row[field] not in ('', None) or existing is None else existing[field]
+               for field in KEY_FIELDS}
+        holder = self._key_holder(key)
+        if holder is None or holder == url:
+            return url
+        if existing is not None:
+            self._merge_into(url, holder)
+        else:
+            self._alias(url, holder)
+        return holder
+
+    def upsert(self, record: Dict, **defaults) -> Dict:
+        return self.upsert_many([record], **defaults)[0]
+
+    def upsert_many(self, records: Iterable[Dict], **defaults) -> List[Dict]:
+        """Insert or refresh papers; `defaults` fill fields the records leave out (e.g. source='PMT')"""
+        rows = [normalize_record(record, **defaults) for record in records]
+        placeholders = ', '.join(f':{column}' for column in COLUMNS)
+        upsert = (f"INSERT INTO papers ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+                  f"ON CONFLICT (url) DO UPDATE SET {self._UPDATE}")
+        with self.lock, self.conn:
+            # Rows are resolved one at a time: a CIE paper seen under a mirror URL
+            # updates the row that already holds its natural key
+            for row in rows:
+                self.conn.execute(upsert, dict(row, url=self._resolve(row)))
+        return rows
+
+    def set_local_path(self, url: str, local_path: str, content_hash: Optional[str] = None):
+        """Record where a paper was downloaded to, adding it to the catalog if needed"""
+        self.upsert({'url': url, 'local_path': local_path, 'content_hash': content_hash})
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict:
+        paper = dict(row)
+        extra = paper.pop('extra')
+        if extra:
+            paper.update(json.loads(extra))
+        return paper
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM papers WHERE url = ?", (self._canonical(url),)).fetchone()
+        return self._row(row) if row else None
+
+    @staticmethod
+    def _where(filters: Dict, alias: str = '') -> Tuple[str, List]:
+        prefix = f"{alias}." if alias else ''
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column == 'year_from':
+                clauses.append(f"{prefix}year >= ?")
+            elif column == 'year_to':
+                clauses.append(f"{prefix}year <= ?")
+            elif column == 'downloaded':
+                clauses.append(f"{prefix}local_path IS {'NOT ' if value else ''}NULL")
+                continue
+            elif isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f"{prefix}{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+                continue
+            else:
+                clauses.append(f"{prefix}{column} = ?")
+            params.append(value.upper() if column == 'board' else value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def find(self, board: Optional[str] = None, level: Optional[str] = None,
+             subject_code: Optional[str] = None, subject: Optional[str] = None,
+             year_from: Optional[int] = None, year_to: Optional[int] = None,
+             session: Optional[str] = None, paper: Optional[str] = None,
+             variant: Optional[str] = None, paper_type: Optional[Sequence[str]] = None,
+             source: Optional[str] = None, downloaded: Optional[bool] = None,
+             limit: Optional[int] = None) -> List[Dict]:
+        """Papers matching every given filter (a list/tuple means any of); newest first"""
+        filters = dict(board=board, level=level, subject_code=subject_code, subject=subject,
+                       year_from=year_from, year_to=year_to, session=session, paper=paper,
+                       variant=variant, type=paper_type, source=source, downloaded=downloaded)
+        where, params = self._where(filters)
+        sql = f"SELECT * FROM papers{where} ORDER BY year DESC, session, paper, variant, type, url"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def pairs(self, subject_code: str, variant: Optional[str] = None, paper: Optional[str] = None,
+              year_from: Optional[int] = None, year_to: Optional[int] = None,
+              session: Optional[str] = None) -> List[Tuple[Dict, Dict]]:
+        """(question paper, mark scheme) pairs of one subject, newest first"""
+        where, params = self._where(dict(subject_code=subject_code, variant=variant, paper=paper,
+                                         year_from=year_from, year_to=year_to, session=session,
+                                         type='qp'), 'qp')
+        sql = f"""
+            SELECT qp.url AS qp_url, ms.url AS ms_url FROM papers qp
+            JOIN papers ms ON ms.subject_code = qp.subject_code AND ms.year = qp.year
+                AND ms.session = qp.session AND ms.paper = qp.paper AND ms.variant = qp.variant
+                AND ms.board = qp.board AND ms.level = qp.level AND ms.type = 'ms'
+            {where}
+            ORDER BY qp.year DESC, qp.session, qp.paper, qp.variant
+        """
+        with self.lock:
+            found = self.conn.execute(sql, params).fetchall()
+        return [(self.get(row['qp_url']), self.get(row['ms_url'])) for row in found]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+Key = Union[str, Sequence[str]]
+
+
+def _key_fields(key: Key) -> Tuple[str, ...]:
+    return (key,) if isinstance(key, str) else tuple(key)
+
+
+def index_first(items: Iterable[Dict], key: Key = 'question_number') -> Dict[Any, Dict]:
+    """The first item for each key; single-field keys are not wrapped in a tuple"""
+    fields = _key_fields(key)
+    index = {}
+    for item in items:
+        value = item[fields[0]] if len(fields) == 1 else tuple(item[field] for field in fields)
+        index.setdefault(value, item)
+    return index
+
+
+class JoinReport:
+    """What a join could not pair up, per paper"""
+
+    def __init__(self):
+        self.papers = 0
+        self.questions = 0
+        self.matched = 0
+        self.unmatched_questions: Dict[str, List] = defaultdict(list)
+        self.unused_answers: Dict[str, List] = defaultdict(list)
+
+    @property
+    def has_unmatched(self) -> bool:
+        return bool(self.unmatched_questions or self.unused_answers)
+
+    @staticmethod
+    def _format(groups: Dict[str, List]) -> str:
+        parts = []
+        for paper, keys in groups.items():
+            labels = ", ".join("/".join(str(v) for v in key) for key in keys)
+            parts.append(f"{paper} [{labels}]" if paper else f"[{labels}]")
+        return "; ".join(parts)
+
+    def summary(self) -> str:
+        lines = [f"Matched {self.matched}/{self.questions} questions across {self.papers} paper(s)"]
+        if self.unmatched_questions:
+            lines.append(f"  No answer for: {self._format(self.unmatched_questions)}")
+        if self.unused_answers:
+            lines.append(f"  Answers without a question: {self._format(self.unused_answers)}")
+        return "\n".join(lines)
+
+
+def join_papers(papers: Iterable[Tuple[str, Iterable[Dict], Iterable[Dict]]],
+                key: Key = 'question_number',
+                answer_key: Key = None) -> Tuple[Dict[str, List[Tuple[Dict, List[Dict]]]], JoinReport]:
+    """
+    Join the questions and answers of a batch of papers in one pass.
+
+    `papers` yields (paper_id, questions, answers). Answers of every paper are
+    indexed by (paper_id, *key) up front, then each question is looked up once.
+    Returns {paper_id: [(question, matching_answers), ...]} in question order,
+    and a JoinReport of what was left over.
+    """
+    question_fields = _key_fields(key)
+    answer_fields = _key_fields(answer_key or key)
+
+    papers = [(paper_id, list(questions), list(answers)) for paper_id, questions, answers in papers]
+    answer_index = defaultdict(list)
+    for paper_id, _, answers in papers:
+        for answer in answers:
+            answer_index[(paper_id,) + tuple(answer[field] for field in answer_fields)].append(answer)
+
+    report = JoinReport()
+    joined = {}
+    used = set()
+    for paper_id, questions, _ in papers:
+        report.papers += 1
+        pairs = []
+        for question in questions:
+            index_key = (paper_id,) + tuple(question[field] for field in question_fields)
+            matches = answer_index.get(index_key, [])
+            pairs.append((question, matches))
+            report.questions += 1
+            if matches:
+                report.matched += 1
+                used.add(index_key)
+            else:
+                report.unmatched_questions[paper_id].append(index_key[1:])
+        joined[paper_id] = pairs
+
+    for index_key in answer_index:
+        if index_key not in used:
+            report.unused_answers[index_key[0]].append(index_key[1:])
+
+    return joined, report
+
+
+def join_paper(questions: Iterable[Dict], answers: Iterable[Dict], key: Key = 'question_number',
+               answer_key: Key = None, paper_id: str = '') -> Tuple[List[Tuple[Dict, List[Dict]]], JoinReport]:
+    """join_papers for a single paper"""
+    joined, report = join_papers([(paper_id, questions, answers)], key=key, answer_key=answer_key)
+    return joined[paper_id], report
@@ -1,12 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
 import os
-import time
 from urllib.parse import urljoin, urlparse
 import json
 from typing import Dict, List, Optional, Tuple
 import re
 
+from crawl_frontier import Crawler
+from download_manager import DownloadManager, filename_from_url
+from http_cache import CachedSession
+from paper_catalog import PaperCatalog
+from link_extractor import extract_links
+
 class PastPapersCoScraper:
     """
     Scraper for pastpapers.co website with clean URL structure
@@ -14,7 +17,7 @@ class PastPapersCoScraper:
     
     def __init__(self, base_url: str = "https://pastpapers.co"):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -38,34 +41,38 @@ class PastPapersCoScraper:
         try:
             response = self.session.get(level_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            subjects = []
-            # Look for folder links that contain subject codes
-            folder_links = soup.find_all('a', href=True)
-            
-            for link in folder_links:
-                href = link.get('href')
-                if href and 'dir=' in href:
-                    # Extract subject info from URL
-                    dir_part = href.split('dir=')[-1]
-                    if '/' in dir_part:
-                        level, subject_part = dir_part.split('/', 1)
-                        if '-' in subject_part:
-                            subject_name, code = subject_part.rsplit('-', 1)
-                            subjects.append({
-                                "name": subject_name.replace('-', ' ').title(),
-                                "code": code,
-                                "url": urljoin(self.base_url, href),
-                                "full_path": f"{level}/{subject_part}"
-                            })
-            
-            return subjects
+            return self.parse_subjects(response.content)
             
         except Exception as e:
             print(f"Error getting subjects for {level_url}: {e}")
             return []
     
+    def parse_subjects(self, content: bytes) -> List[Dict[str, str]]:
+        """
+        Subject folders listed on an exam level page
+        """
+        subjects = []
+        # Look for folder links that contain subject codes
+        folder_links = extract_links(content)
+        
+        for link in folder_links:
+            href = link.href
+            if href and 'dir=' in href:
+                # Extract subject info from URL
+                dir_part = href.split('dir=')[-1]
+                if '/' in dir_part:
+                    level, subject_part = dir_part.split('/', 1)
+                    if '-' in subject_part:
+                        subject_name, code = subject_part.rsplit('-', 1)
+                        subjects.append({
+                            "name": subject_name.replace('-', ' ').title(),
+                            "code": code,
+                            "url": urljoin(self.base_url, href),
+                            "full_path": f"{level}/{subject_part}"
+                        })
+        
+        return subjects
+    
     def get_years_for_subject(self, subject_url: str) -> List[Dict[str, str]]:
         """
         Get all available years/sessions for a specific subject
@@ -73,32 +80,36 @@ class PastPapersCoScraper:
         try:
             response = self.session.get(subject_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            years = []
-            # Look for folder links that contain year patterns
-            folder_links = soup.find_all('a', href=True)
-            
-            for link in folder_links:
-                href = link.get('href')
-                text = link.get_text(strip=True)
-                
-                if href and 'dir=' in href and text:
-                    # Check if it's a year folder (e.g., "2022-May-June")
-                    if re.match(r'\d{4}-[A-Za-z-]+', text):
-                        years.append({
-                            "name": text,
-                            "url": urljoin(self.base_url, href),
-                            "year": text.split('-')[0],
-                            "session": '-'.join(text.split('-')[1:])
-                        })
-            
-            return years
+            return self.parse_years(response.content)
             
         except Exception as e:
             print(f"Error getting years for {subject_url}: {e}")
             return []
     
+    def parse_years(self, content: bytes) -> List[Dict[str, str]]:
+        """
+        Year/session folders listed on a subject page
+        """
+        years = []
+        # Look for folder links that contain year patterns
+        folder_links = extract_links(content)
+        
+        for link in folder_links:
+            href = link.href
+            text = link.text
+            
+            if href and 'dir=' in href and text:
+                # Check if it's a year folder (e.g., "2022-May-June")
+                if re.match(r'\d{4}-[A-Za-z-]+', text):
+                    years.append({
+                        "name": text,
+                        "url": urljoin(self.base_url, href),
+                        "year": text.split('-')[0],
+                        "session": '-'.join(text.split('-')[1:])
+                    })
+        
+        return years
+    
     def get_papers_for_year(self, year_url: str) -> List[Dict[str, str]]:
         """
         Get all available papers for a specific year/session
@@ -106,39 +117,43 @@ class PastPapersCoScraper:
         try:
             response = self.session.get(year_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            papers = []
-            # Look for PDF files and their associated mark schemes
-            file_links = soup.find_all('a', href=True)
-            
-            for link in file_links:
-                href = link.get('href')
-                text = link.get_text(strip=True)
-                
-                if href and text and (href.endswith('.pdf') or 'pdf' in href.lower()):
-                    # Parse filename to extract paper info
-                    filename = text.strip()
-                    if filename.endswith('.pdf'):
-                        filename = filename[:-4]
-                    
-                    # Extract paper type and variant
-                    paper_info = self._parse_paper_filename(filename)
-                    if paper_info:
-                        papers.append({
-                            "filename": filename,
-                            "url": urljoin(self.base_url, href),
-                            "paper_type": paper_info["type"],
-                            "variant": paper_info["variant"],
-                            "full_url": urljoin(self.base_url, href)
-                        })
-            
-            return papers
+            return self.parse_papers(response.content)
             
         except Exception as e:
             print(f"Error getting papers for {year_url}: {e}")
             return []
     
+    def parse_papers(self, content: bytes) -> List[Dict[str, str]]:
+        """
+        Paper PDFs listed on a year/session page
+        """
+        papers = []
+        # Look for PDF files and their associated mark schemes
+        file_links = extract_links(content)
+        
+        for link in file_links:
+            href = link.href
+            text = link.text
+            
+            if href and text and (href.endswith('.pdf') or 'pdf' in href.lower()):
+                # Parse filename to extract paper info
+                filename = text.strip()
+                if filename.endswith('.pdf'):
+                    filename = filename[:-4]
+                
+                # Extract paper type and variant
+                paper_info = self._parse_paper_filename(filename)
+                if paper_info:
+                    papers.append({
+                        "filename": filename,
+                        "url": urljoin(self.base_url, href),
+                        "paper_type": paper_info["type"],
+                        "variant": paper_info["variant"],
+                        "full_url": urljoin(self.base_url, href)
+                    })
+        
+        return papers
+    
     def _parse_paper_filename(self, filename: str) -> Optional[Dict[str, str]]:
         """
         Parse paper filename to extract type and variant
@@ -165,32 +180,28 @@ class PastPapersCoScraper:
     
     def download_paper(self, paper_url: str, output_dir: str = "downloads") -> Optional[str]:
         """
-        Download a specific paper PDF
+        Download a specific paper PDF (skipped if already on disk, resumed if interrupted)
         """
-        try:
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            response = self.session.get(paper_url, stream=True)
-            response.raise_for_status()
-            
-            # Extract filename from URL or content-disposition
-            filename = paper_url.split('/')[-1]
-            if not filename.endswith('.pdf'):
-                filename += '.pdf'
-            
-            filepath = os.path.join(output_dir, filename)
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"Downloaded: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            print(f"Error downloading {paper_url}: {e}")
+        filepath = os.path.join(output_dir, filename_from_url(paper_url))
+        with PaperCatalog() as catalog:
+            result = DownloadManager(headers=self.session.headers, catalog=catalog).download(paper_url, filepath)
+        if result['status'] == 'failed':
+            print(f"Error downloading {paper_url}: {result['error']}")
             return None
+        
+        print(f"Downloaded: {filepath}" if result['status'] != 'skipped' else f"Already downloaded: {filepath}")
+        return filepath
+    
+    def download_papers(self, paper_urls: List[str], output_dir: str = "downloads", workers: int = 4) -> List[str]:
+        """
+        Download several papers in parallel; returns the paths now on disk
+        """
+        with PaperCatalog() as catalog:
+            downloads = DownloadManager(headers=self.session.headers, workers=workers, catalog=catalog)
+            results = downloads.download_all({"url": url, "path": os.path.join(output_dir, filename_from_url(url))}
+                                             for url in paper_urls)
+        done = {result["url"]: result["path"] for result in results if result["status"] != "failed"}
+        return [done[url] for url in paper_urls if url in done]
     
     def get_physics_9702_2022_may_june_variant_2(self) -> Dict[str, str]:
         """
@@ -216,48 +227,79 @@ class PastPapersCoScraper:
             "total_variant_2_papers": len(variant_2_papers)
         }
     
-    def scrape_full_structure(self) -> Dict:
+    def _crawl_level(self, task: Dict, content: bytes) -> Tuple[List[Dict], List[Dict]]:
+        subjects = self.parse_subjects(content)
+        children = [{"url": subject["url"], "kind": "subject", "level_name": task["level_name"],
+                     "subject": subject["name"], "key": f"{task['level_name']}_{subject['code']}"}
+                    for subject in subjects]
+        return subjects, children
+    
+    def _crawl_subject(self, task: Dict, content: bytes) -> Tuple[List[Dict], List[Dict]]:
+        years = self.parse_years(content)
+        children = [{"url": year["url"], "kind": "year", "level_name": task.get("level_name", ""),
+                     "subject": task.get("subject", ""), "key": f"{task['key']}_{year['name']}"}
+                    for year in years]
+        return years, children
+    
+    def _crawl_year(self, task: Dict, content: bytes) -> Tuple[List[Dict], List[Dict]]:
+        return self.parse_papers(content), []
+    
+    def scrape_full_structure(self, workers: int = 8, per_host_limit: int = 2, per_host_rate: float = 2.0,
+                              checkpoint_path: Optional[str] = None,
+                              catalog: Optional[PaperCatalog] = None) -> Dict:
         """
         Scrape the complete structure of pastpapers.co
+        
+        Levels, subjects, years and papers are crawled breadth-first on a thread
+        pool, politely per host. With `checkpoint_path` the crawl can be stopped
+        and resumed; the checkpoint is removed once a crawl completes without failures,
+        and otherwise kept so the next run retries the pages that failed.
+        Every paper found is also upserted into `catalog` (by default the shared
+        paper catalog, opened for the crawl and closed afterwards).
         """
-        structure = {
-            "exam_levels": [],
-            "subjects": {},
-            "years": {},
-            "papers": {}
-        }
+        if catalog is None:
+            with PaperCatalog() as catalog:
+                return self.scrape_full_structure(workers, per_host_limit, per_host_rate, checkpoint_path, catalog)
         
-        # Get exam levels
-        levels = self.get_exam_levels()
-        structure["exam_levels"] = levels
+        crawler = Crawler({
+            "level": self._crawl_level,
+            "subject": self._crawl_subject,
+            "year": self._crawl_year
+        }, session=self.session, workers=workers, per_host_limit=per_host_limit,
+            per_host_rate=per_host_rate, checkpoint_path=checkpoint_path)
         
-        # For each level, get subjects
-        for level in levels:
-            level_name = level["name"]
-            print(f"Scraping subjects for {level_name}...")
-            
-            subjects = self.get_subjects_for_level(level["url"])
-            structure["subjects"][level_name] = subjects
-            
-            # For each subject, get years
-            for subject in subjects:
-                subject_key = f"{level_name}_{subject['code']}"
-                print(f"  Scraping years for {subject['name']} ({subject['code']})...")
-                
-                years = self.get_years_for_subject(subject["url"])
-                structure["years"][subject_key] = years
-                
-                # For each year, get papers
-                for year in years:
-                    year_key = f"{subject_key}_{year['name']}"
-                    print(f"    Scraping papers for {year['name']}...")
-                    
-                    papers = self.get_papers_for_year(year["url"])
-                    structure["papers"][year_key] = papers
-                    
-                    # Be nice to the server
-                    time.sleep(1)
+        structure = crawler.state
+        if not crawler.resumed:
+            levels = self.get_exam_levels()
+            structure.update({
+                "exam_levels": levels,
+                "subjects": {},
+                "years": {},
+                "papers": {}
+            })
+            for level in levels:
+                crawler.add({"url": level["url"], "kind": "level", "level_name": level["name"], "depth": 0})
+        
+        sections = {"level": "subjects", "subject": "years", "year": "papers"}
+        
+        def on_result(task: Dict, result: List[Dict]):
+            if task["kind"] == "level":
+                print(f"Found {len(result)} subjects for {task['level_name']}")
+                structure["subjects"][task["level_name"]] = result
+            else:
+                print(f"  Found {len(result)} {sections[task['kind']]} for {task['key']}")
+                structure[sections[task["kind"]]][task["key"]] = result
+            if task["kind"] == "year":
+                catalog.upsert_many(result, board="CIE", level=task.get("level_name", ""),
+                                    subject=task.get("subject", ""), source="pastpapers.co")
+        
+        stats = crawler.run(on_result=on_result)
+        print(f"Crawled {stats['fetched']} pages in {stats['seconds']}s "
+              f"({stats['retried']} retries, {stats['failed']} failed)")
         
+        structure["failures"] = crawler.failures
+        if checkpoint_path and not crawler.failures and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
         return structure
 
 def main():
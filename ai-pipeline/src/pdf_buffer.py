@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Download Buffers
+======================================
+Land downloaded PDFs in a memory-mapped temp file (RAM-backed /dev/shm when
+available) instead of a bytes object, so a download is never held in the
+Python heap. fitz.open(stream=...) still copies the memoryview into its own
+buffer, so parsing in-process is not zero-copy; the gain is for worker
+processes, which open the same temp file by path instead of receiving
+pickled copies of the bytes.
+"""
+
+import mmap
+import os
+import tempfile
+from typing import Optional
+
+
+def _temp_dir() -> Optional[str]:
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+
+class PDFBuffer:
+    """
+    A PDF body in a temp file. Write chunks, call finish(), then use `view`
+    (a memoryview over the mapped file) or `path`. Use as a context manager
+    or call close() to release the mapping and delete the file.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        fd, self.path = tempfile.mkstemp(prefix='notical-', suffix='.pdf', dir=directory or _temp_dir())
+        self._file = os.fdopen(fd, 'w+b')
+        self._mmap = None
+        self.view: Optional[memoryview] = None
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def finish(self) -> 'PDFBuffer':
+        """Map the written bytes; after this the buffer is read-only"""
+        self._file.flush()
+        if self.size:
+            self._mmap = mmap.mmap(self._file.fileno(), self.size, access=mmap.ACCESS_READ)
+            self.view = memoryview(self._mmap)
+        else:
+            self.view = memoryview(b'')
+        return self
+
+    def close(self):
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __len__(self):
+        return self.size
+
+    def __del__(self):
+        # Buffers abandoned mid-pipeline must not leave files behind in /dev/shm
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch_to_buffer(session, url: str, timeout: int = 30, chunk_size: int = 64 * 1024,
+                    directory: Optional[str] = None) -> Optional[PDFBuffer]:
+    """Stream `url` into a PDFBuffer; None for non-200 responses"""
+    with session.get(url, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            return None
+        buffer = PDFBuffer(directory)
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                buffer.write(chunk)
+            return buffer.finish()
+        except Exception:
+            buffer.close()
+            raise
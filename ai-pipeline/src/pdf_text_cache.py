@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Extracted Text Cache
+==========================================
+Content-addressed on-disk cache for PDF extraction results. Entries are keyed
+by the SHA-256 of the PDF bytes, so a paper is decoded once no matter which
+script, path or download it comes from.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+PDFSource = Union[str, bytes]
+
+# Next to the pipeline sources, not wherever a script happens to be run from
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'pdf_text')
+
+
+class PDFTextCache:
+    """
+    One gzipped JSON file per (content hash, kind), e.g. per-page text or
+    per-page positioned words. Reads refresh a file's mtime, and writes evict
+    the least recently used files once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._digests: Dict[Tuple, str] = {}  # (path, mtime, size) -> sha256
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def content_hash(self, source: PDFSource) -> str:
+        """SHA-256 of the PDF bytes; file digests are remembered while the file is unchanged"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(source).hexdigest()
+
+        stat = os.stat(source)
+        file_key = (os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(file_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            self._digests[file_key] = digest
+        return digest
+
+    def _path(self, digest: str, kind: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{kind}.json.gz")
+
+    def get(self, digest: str, kind: str) -> Optional[Any]:
+        path = self._path(digest, kind)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, digest: str, kind: str, value: Any):
+        path = self._path(digest, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(value, f, ensure_ascii=False, separators=(',', ':'))
+        size = os.path.getsize(tmp_path)
+
+        with self._lock:
+            # An overwritten entry no longer counts towards the total
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its limit"""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            size = self._size
+        total = self.hits + self.misses
+        return {
+            'cache_dir': self.cache_dir,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
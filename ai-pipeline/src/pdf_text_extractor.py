@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Shared PDF Text Extraction
+================================================
+PyMuPDF page extraction spread across a process pool. Every extractor script
+goes through this module, so a batch of papers uses every core, and results
+are kept in a content-addressed cache so a paper is only decoded once.
+
+The cache lives in ai-pipeline/cache/pdf_text; set NOTICAL_PDF_CACHE to a
+directory to move it, or to "off" to disable it.
+"""
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import fitz  # PyMuPDF
+
+from pdf_buffer import PDFBuffer
+from pdf_text_cache import DEFAULT_CACHE_DIR, PDFTextCache
+
+PDFSource = Union[str, bytes, PDFBuffer]
+
+
+def _data(source: PDFSource):
+    """Path or bytes-like form of a source; a PDFBuffer is read through its memoryview (fitz copies it)"""
+    return source.view if isinstance(source, PDFBuffer) else source
+
+
+def _open(source: PDFSource):
+    """Open a PDF from a path, raw bytes or a PDFBuffer"""
+    source = _data(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+
+@contextmanager
+def _shareable(source: PDFSource):
+    """
+    A form of `source` to send to worker processes: a path. In-memory PDFs are
+    written once to a (RAM-backed) temp file rather than pickled per task.
+    """
+    if isinstance(source, PDFBuffer):
+        yield source.path
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        with PDFBuffer() as buffer:
+            buffer.write(source)
+            yield buffer.finish().path
+    else:
+        yield source
+
+
+def _page_count(source: PDFSource) -> int:
+    doc = _open(source)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _extract_page_range(source: PDFSource, start: int, end: int) -> List[str]:
+    """Worker: text of pages [start, end) in order"""
+    doc = _open(source)
+    try:
+        return [doc[page_num].get_text() for page_num in range(start, min(end, len(doc)))]
+    finally:
+        doc.close()
+
+
+def _extract_words_range(source: PDFSource, start: int, end: int) -> List[Dict]:
+    """Worker: positioned words of pages [start, end) in order"""
+    doc = _open(source)
+    try:
+        pages = []
+        for page_num in range(start, min(end, len(doc))):
+            page = doc[page_num]
+            pages.append({
+                'width': page.rect.width,
+                'height': page.rect.height,
+                # (x0, y0, x1, y1, word, block_no, line_no, word_no)
+                'words': [list(word) for word in page.get_text('words')]
+            })
+        return pages
+    finally:
+        doc.close()
+
+
+class PDFTextExtractor:
+    """
+    Splits documents into page ranges of `pages_per_task` pages and extracts
+    them on a ProcessPoolExecutor. Small single documents are extracted inline,
+    where the round trip to a worker would cost more than it saves. With a
+    cache, documents whose content was extracted before are not decoded at all.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, pages_per_task: int = 8,
+                 cache: Optional[PDFTextCache] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _ranges(self, page_count: int):
+        return [(start, start + self.pages_per_task)
+                for start in range(0, page_count, self.pages_per_task)]
+
+    def _cached(self, source: PDFSource, kind: str, extract):
+        if self.cache is None:
+            return extract(source)
+        digest = self.cache.content_hash(_data(source))
+        value = self.cache.get(digest, kind)
+        if value is None:
+            value = extract(source)
+            self.cache.put(digest, kind, value)
+        return value
+
+    def extract_pages(self, source: PDFSource) -> List[str]:
+        """Text of every page of one document, in page order"""
+        return self._cached(source, 'pages', self._extract_pages)
+
+    def _extract_pages(self, source: PDFSource) -> List[str]:
+        page_count = _page_count(source)
+        if page_count <= self.pages_per_task or self.max_workers == 1:
+            return _extract_page_range(source, 0, page_count)
+
+        with _shareable(source) as shared:
+            futures = [self.pool.submit(_extract_page_range, shared, start, end)
+                       for start, end in self._ranges(page_count)]
+            return [text for future in futures for text in future.result()]
+
+    def iter_pages(self, source: PDFSource) -> Iterator[str]:
+        """
+        Yield page texts one at a time in this process, so only one page is held
+        in memory. Served from the cache when the document was extracted before;
+        a streamed document is not added to the cache.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.cache.content_hash(_data(source)), 'pages')
+            if cached is not None:
+                yield from cached
+                return
+
+        doc = _open(source)
+        try:
+            for page in doc:
+                yield page.get_text()
+        finally:
+            doc.close()
+
+    def extract_words(self, source: PDFSource) -> List[Dict]:
+        """Positioned words of every page of one document, in page order"""
+        return self._cached(source, 'words', self._extract_words)
+
+    def _extract_words(self, source: PDFSource) -> List[Dict]:
+        page_count = _page_count(source)
+        if page_count <= self.pages_per_task or self.max_workers == 1:
+            return _extract_words_range(source, 0, page_count)
+
+        with _shareable(source) as shared:
+            futures = [self.pool.submit(_extract_words_range, shared, start, end)
+                       for start, end in self._ranges(page_count)]
+            return [page for future in futures for page in future.result()]
+
+    def extract_many(self, sources: Sequence[PDFSource]) -> List[List[str]]:
+        """Page texts for a batch of documents; every page range of every document runs in parallel"""
+        results: List[List[str]] = [[] for _ in sources]
+        digests = {}
+        tasks = []
+        with ExitStack() as shared_sources:
+            for index, source in enumerate(sources):
+                try:
+                    if self.cache is not None:
+                        digests[index] = self.cache.content_hash(_data(source))
+                        cached = self.cache.get(digests[index], 'pages')
+                        if cached is not None:
+                            results[index] = cached
+                            continue
+                    page_count = _page_count(source)
+                except Exception as e:
+                    print(f"Error opening {source if isinstance(source, str) else 'PDF bytes'}: {e}")
+                    continue
+                shared = shared_sources.enter_context(_shareable(source))
+                for start, end in self._ranges(page_count):
+                    tasks.append((index, self.pool.submit(_extract_page_range, shared, start, end)))
+
+            failed = set()
+            for index, future in tasks:
+                try:
+                    results[index].extend(future.result())
+                except Exception as e:
+                    failed.add(index)
+                    print(f"Error extracting text from document {index}: {e}")
+
+        for index in {index for index, _ in tasks} - failed:
+            if index in digests:
+                self.cache.put(digests[index], 'pages', results[index])
+        return results
+
+    def extract_text(self, source: PDFSource) -> str:
+        """Whole-document text, equivalent to concatenating page.get_text() for each page"""
+        return ''.join(self.extract_pages(source))
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_shared_extractor: Optional[PDFTextExtractor] = None
+
+
+def _default_cache() -> Optional[PDFTextCache]:
+    location = os.environ.get('NOTICAL_PDF_CACHE', DEFAULT_CACHE_DIR)
+    if location.lower() in ('off', '0', 'false', ''):
+        return None
+    return PDFTextCache(location)
+
+
+def get_extractor() -> PDFTextExtractor:
+    """The process-wide extractor used by all scripts"""
+    global _shared_extractor
+    if _shared_extractor is None:
+        _shared_extractor = PDFTextExtractor(cache=_default_cache())
+        atexit.register(_shared_extractor.close)
+    return _shared_extractor
+
+
+def configure_extractor(max_workers: Optional[int] = None, pages_per_task: int = 8) -> PDFTextExtractor:
+    """Replace the process-wide extractor, e.g. with max_workers=1 inside worker processes"""
+    global _shared_extractor
+    if _shared_extractor is not None:
+        _shared_extractor.close()
+    _shared_extractor = PDFTextExtractor(max_workers=max_workers, pages_per_task=pages_per_task,
+                                         cache=_default_cache())
+    atexit.register(_shared_extractor.close)
+    return _shared_extractor
+
+
+def extract_pages(source: PDFSource) -> List[str]:
+    return get_extractor().extract_pages(source)
+
+
+def iter_pages(source: PDFSource) -> Iterator[str]:
+    return get_extractor().iter_pages(source)
+
+
+def extract_text(source: PDFSource) -> str:
+    return get_extractor().extract_text(source)
+
+
+def extract_words(source: PDFSource) -> List[Dict]:
+    return get_extractor().extract_words(source)
+
+
+def extract_many(sources: Sequence[PDFSource]) -> List[List[str]]:
+    return get_extractor().extract_many(sources)
@@ -1,11 +1,13 @@
-import requests
 from bs4 import BeautifulSoup
 import os
-import time
 from urllib.parse import urljoin
 import json
 from typing import Dict, List, Optional
 
+from download_manager import DownloadManager
+from http_cache import CachedSession
+from paper_catalog import PaperCatalog
+
 class Physics9702Variant2Scraper:
     """
     Focused scraper for Physics 9702 A-Level May-June 2022 Variant 2 papers
@@ -13,7 +15,7 @@ class Physics9702Variant2Scraper:
     
     def __init__(self, base_url: str = "https://pastpapers.co"):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -134,7 +136,6 @@ class Physics9702Variant2Scraper:
             os.makedirs(output_dir)
         
         variant_2_papers = self.get_variant_2_papers()
-        downloaded_files = []
         
         print(f"\nFound {len(variant_2_papers)} Variant 2 papers:")
         for paper in variant_2_papers:
@@ -142,28 +143,14 @@ class Physics9702Variant2Scraper:
         
         print(f"\nDownloading {len(variant_2_papers)} papers...")
         
-        for i, paper in enumerate(variant_2_papers, 1):
-            print(f"\n[{i}/{len(variant_2_papers)}] Downloading: {paper['filename']}")
-            
-            try:
-                response = self.session.get(paper['url'], stream=True)
-                response.raise_for_status()
-                
-                filename = f"{paper['filename']}.pdf"
-                filepath = os.path.join(output_dir, filename)
-                
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                print(f"  ✓ Downloaded: {filepath}")
-                downloaded_files.append(filepath)
-                
-                # Be nice to the server
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"  ✗ Error downloading {paper['filename']}: {e}")
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(variant_2_papers, board='CIE', level='A-Level', subject='Physics', source='pastpapers.co')
+            downloads = DownloadManager(headers=self.session.headers, catalog=catalog)
+            results = downloads.download_all({"url": paper["url"], "path": os.path.join(output_dir, f"{paper['filename']}.pdf")}
+                                             for paper in variant_2_papers)
+        
+        done = {result["url"]: result["path"] for result in results if result["status"] != "failed"}
+        downloaded_files = [done[paper["url"]] for paper in variant_2_papers if paper["url"] in done]
         
         return downloaded_files
     
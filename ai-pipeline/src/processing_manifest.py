@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Processed Paper Manifest
+==============================================
+SQLite record of which papers an extractor has already processed: the input's
+content hash, the extractor version and where its result sits in the JSONL
+output. Runs consult it to skip unchanged inputs and append new results as
+they are produced, so an interrupted run loses at most the paper in flight.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+def content_hash(paths_or_bytes: Iterable) -> str:
+    """SHA-256 over one or more inputs (file paths or raw bytes), in order"""
+    sha = hashlib.sha256()
+    for source in paths_or_bytes:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            sha.update(source)
+            continue
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+    return sha.hexdigest()
+
+
+def append_jsonl(path: str, record: Dict) -> int:
+    """Append one record to a JSONL file and return its byte offset"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    with open(path, 'ab') as f:
+        offset = f.tell()
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+def read_jsonl_at(path: str, offset: int) -> Optional[Dict]:
+    """The record starting at `offset`, or None if it is missing or truncated"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+class ProcessingManifest:
+    """One row per (paper_id, extractor): the last time that extractor processed that paper"""
+
+    def __init__(self, path: str = "processed_papers.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed_papers (
+                paper_id TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                output_file TEXT,
+                output_offset INTEGER,
+                status TEXT NOT NULL,
+                processed_at REAL NOT NULL,
+                error TEXT,
+                PRIMARY KEY (paper_id, extractor)
+            )
+        """)
+        # Manifests written before failures were recorded have no error column
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(processed_papers)")}
+        if 'error' not in columns:
+            self.conn.execute("ALTER TABLE processed_papers ADD COLUMN error TEXT")
+        self.conn.commit()
+
+    def lookup(self, paper_id: str, extractor: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT * FROM processed_papers WHERE paper_id = ? AND extractor = ?",
+            (paper_id, extractor)).fetchone()
+        return dict(row) if row else None
+
+    def is_current(self, paper_id: str, extractor: str, version: str,
+                   content_hash: Optional[str] = None) -> bool:
+        """
+        True if `paper_id` was processed successfully by this extractor version
+        (and, when given, from the same content) and its output is still there
+        """
+        entry = self.lookup(paper_id, extractor)
+        if not entry or entry['status'] != 'ok' or entry['extractor_version'] != version:
+            return False
+        if content_hash is not None and entry['content_hash'] != content_hash:
+            return False
+        output_file = entry['output_file']
+        return bool(output_file) and os.path.exists(output_file) and \
+            entry['output_offset'] < os.path.getsize(output_file)
+
+    def record(self, paper_id: str, extractor: str, content_hash: str, version: str,
+               output_file: Optional[str] = None, output_offset: Optional[int] = None,
+               status: str = 'ok', error: Optional[str] = None):
+        """Record a run; a failure is recorded with its error and no output, and is retried next run"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO processed_papers (paper_id, extractor, content_hash, extractor_version, "
+            "output_file, output_offset, status, processed_at, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (paper_id, extractor, content_hash, version, output_file, output_offset,
+             status, time.time(), error))
+        self.conn.commit()
+
+    def load_output(self, paper_id: str, extractor: str) -> Optional[Dict]:
+        """The JSONL record written for this paper by its last successful run"""
+        entry = self.lookup(paper_id, extractor)
+        if not entry or entry['output_file'] is None:
+            return None
+        return read_jsonl_at(entry['output_file'], entry['output_offset'])
+
+    def entries(self, extractor: Optional[str] = None) -> List[Dict]:
+        if extractor is None:
+            rows = self.conn.execute("SELECT * FROM processed_papers")
+        else:
+            rows = self.conn.execute("SELECT * FROM processed_papers WHERE extractor = ?", (extractor,))
+        return [dict(row) for row in rows]
+
+    def failures(self, extractor: Optional[str] = None) -> List[Dict]:
+        """Entries whose last run failed, with their errors"""
+        return [entry for entry in self.entries(extractor) if entry['status'] != 'ok']
+
+    def forget(self, extractor: str):
+        """Drop every entry of one extractor, e.g. before a full re-run"""
+        self.conn.execute("DELETE FROM processed_papers WHERE extractor = ?", (extractor,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class QueryCache:
+    """
+    TTL + LRU memoization for model queries.
+    Entries expire after `ttl_seconds` and the least recently used entry is evicted
+    once `max_entries` is reached. Callers get a shallow copy of a cached dict or
+    list, so they can set top-level fields (e.g. a timestamp) without touching
+    the cache; nested values are shared and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @staticmethod
+    def normalize(value: Any) -> Any:
+        """Case- and whitespace-insensitive form of a query argument"""
+        if isinstance(value, str):
+            return ' '.join(value.lower().split())
+        return value
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return list(value)
+        return value
+
+    def make_key(self, namespace: str, version: str, *args) -> Tuple:
+        return (namespace, version) + tuple(self.normalize(arg) for arg in args)
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return self._copy(value)
+                del self.entries[key]
+                self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = (time.time(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        return self._copy(value)
+
+    def clear(self):
+        """Drop every entry (e.g. after the decks are regenerated)"""
+        with self.lock:
+            self.entries.clear()
+            self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+NOTICAL AI Pipeline - Rate Limiting
+===================================
+Token buckets and per-host concurrency limits shared by the scrapers
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """
+    Per-host politeness: at most `max_concurrent` requests in flight and
+    `rate` requests per second (burst `burst`) to any one host.
+    """
+
+    def __init__(self, max_concurrent: int = 2, rate: float = 2.0, burst: float = 2.0):
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.semaphores = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _for_host(self, host: str):
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.max_concurrent)
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.semaphores[host], self.buckets[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of the block"""
+        semaphore, bucket = self._for_host(urlparse(url).netloc)
+        with semaphore:
+            bucket.acquire()
+            yield
@@ -5,7 +5,6 @@ NOTICAL AI Pipeline - Real Subject PDF Scraper
 Find REAL PDF URLs from Chemistry, Biology, English, etc. pages
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
@@ -13,14 +12,17 @@ import time
 import random
 import re
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+
+from http_cache import CachedSession
+from link_extractor import extract_links, filter_links
+from paper_catalog import PaperCatalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RealSubjectScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
@@ -62,17 +64,17 @@ class RealSubjectScraper:
                 logger.error(f"  ❌ Failed to access {subject_name}: HTTP {response.status_code}")
                 return
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            page_links = extract_links(response.content)
             
             # Look for PDF links
-            pdf_links = soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+            pdf_links = filter_links(page_links, r'\.pdf$')
             
             if pdf_links:
                 logger.info(f"  📚 Found {len(pdf_links)} PDFs in {subject_name}")
                 
                 for pdf_link in pdf_links:
-                    pdf_url = urljoin(subject_url, pdf_link.get('href', ''))
-                    pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                    pdf_url = urljoin(subject_url, pdf_link.href)
+                    pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                     
                     pdf_info = {
                         'url': pdf_url,
@@ -89,12 +91,12 @@ class RealSubjectScraper:
                 logger.info(f"  ⚠️  No PDFs found on {subject_name} main page")
                 
                 # Try to find sub-pages with PDFs
-                self._find_sub_pages_with_pdfs(subject_name, subject_url, soup)
+                self._find_sub_pages_with_pdfs(subject_name, subject_url, page_links)
                 
         except Exception as e:
             logger.error(f"Error scraping {subject_name}: {e}")
 
-    def _find_sub_pages_with_pdfs(self, subject_name, subject_url, soup):
+    def _find_sub_pages_with_pdfs(self, subject_name, subject_url, page_links):
         """Find sub-pages that might contain PDFs"""
         try:
             # Look for links to past papers, notes, etc.
@@ -104,10 +106,10 @@ class RealSubjectScraper:
             ]
             
             for pattern in sub_page_patterns:
-                sub_links = soup.find_all('a', href=re.compile(pattern, re.IGNORECASE))
+                sub_links = filter_links(page_links, pattern)
                 
                 for sub_link in sub_links[:5]:  # Limit to avoid too many requests
-                    sub_href = sub_link.get('href', '')
+                    sub_href = sub_link.href
                     if sub_href:
                         sub_url = urljoin(subject_url, sub_href)
                         logger.info(f"    🔍 Checking sub-page: {sub_url}")
@@ -115,15 +117,15 @@ class RealSubjectScraper:
                         try:
                             sub_response = self.session.get(sub_url, timeout=30)
                             if sub_response.status_code == 200:
-                                sub_soup = BeautifulSoup(sub_response.content, 'html.parser')
-                                sub_pdfs = sub_soup.find_all('a', href=re.compile(r'\.pdf$', re.IGNORECASE))
+                                sub_page_links = extract_links(sub_response.content)
+                                sub_pdfs = filter_links(sub_page_links, r'\.pdf$')
                                 
                                 if sub_pdfs:
                                     logger.info(f"      📚 Found {len(sub_pdfs)} PDFs on sub-page!")
                                     
                                     for pdf_link in sub_pdfs:
-                                        pdf_url = urljoin(sub_url, pdf_link.get('href', ''))
-                                        pdf_title = pdf_link.get_text(strip=True) or pdf_link.get('title', '') or 'Untitled'
+                                        pdf_url = urljoin(sub_url, pdf_link.href)
+                                        pdf_title = pdf_link.text or pdf_link.title or 'Untitled'
                                         
                                         pdf_info = {
                                             'url': pdf_url,
@@ -170,7 +172,10 @@ class RealSubjectScraper:
         with open(content_file, 'w') as f:
             json.dump(data, f, indent=2)
         
-        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file}")
+        with PaperCatalog() as catalog:
+            catalog.upsert_many(self.found_pdfs, source='PMT')
+        
+        logger.info(f"💾 Found {len(self.found_pdfs)} PDFs, saved to: {content_file} and {catalog.path}")
         self._show_summary()
         
         return content_file
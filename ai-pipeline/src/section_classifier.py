@@ -0,0 +1,81 @@
+import string
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Sequence, Tuple
+
+# Stripped from both ends of each whitespace-separated token
+_PUNCTUATION = string.punctuation + '“”‘’–—…'
+
+# Simple inflections accepted for single-word keywords (step -> steps, process -> processes)
+_SUFFIXES = ('', 's', 'es', 'd', 'ed')
+
+
+class SectionProfile(NamedTuple):
+    categories: FrozenSet[str]
+    word_count: int
+
+
+class SectionClassifier:
+    """
+    Tags text sections with every category whose keywords appear in them as
+    whole words. All keywords are compiled into one word -> categories map
+    (plus a map for multi-word phrases keyed by their first word), so a
+    section is lowercased and tokenized once and each token is one lookup,
+    however many categories there are.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = list(categories)
+        self.words: Dict[str, FrozenSet[str]] = {}
+        self.phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+
+        words: Dict[str, set] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                parts = tuple(keyword.lower().split())
+                if len(parts) > 1:
+                    self.phrases.setdefault(parts[0], []).append((parts[1:], category))
+                    continue
+                for suffix in _SUFFIXES:
+                    words.setdefault(parts[0] + suffix, set()).add(category)
+        self.words = {word: frozenset(found) for word, found in words.items()}
+
+    @staticmethod
+    def tokenize(words: List[str]) -> List[str]:
+        tokens = (word.strip(_PUNCTUATION) for word in words)
+        return [token for token in tokens if token]
+
+    def classify(self, text: str) -> SectionProfile:
+        raw_words = text.lower().split()
+        tokens = self.tokenize(raw_words)
+        found = set()
+        words, phrases = self.words, self.phrases
+        for i, token in enumerate(tokens):
+            hit = words.get(token)
+            if hit:
+                found |= hit
+            candidates = phrases.get(token)
+            if candidates:
+                for rest, category in candidates:
+                    if tuple(tokens[i + 1:i + 1 + len(rest)]) == rest:
+                        found.add(category)
+        return SectionProfile(frozenset(found), len(raw_words))
+
+    def classify_batch(self, texts: Sequence[str]) -> List[SectionProfile]:
+        """classify() for every text; repeated texts (running headers, boilerplate) are classified once"""
+        profiles: Dict[str, SectionProfile] = {}
+        for text in texts:
+            if text not in profiles:
+                profiles[text] = self.classify(text)
+        return [profiles[text] for text in texts]
+
+
+# Keywords that mark a study-text section as suitable for each Q&A type
+SECTION_CLASSIFIER = SectionClassifier({
+    'definition': ['is', 'are', 'refers to', 'defined as', 'means', 'consists of'],
+    'key_points': ['key', 'important', 'essential', 'critical', 'main', 'primary'],
+    'process': ['step', 'process', 'method', 'procedure', 'approach', 'technique'],
+    'formula': ['formula', 'equation', 'calculate', 'solve', 'compute', 'evaluate'],
+    'comparison': ['compare', 'difference', 'similar', 'versus', 'contrast', 'analyze'],
+    'application': ['example', 'application', 'use', 'apply', 'instance', 'case'],
+    'properties': ['properties', 'characteristics', 'features', 'attributes', 'qualities'],
+    'causes_effects': ['cause', 'effect', 'result', 'impact', 'consequence', 'outcome'],
+})
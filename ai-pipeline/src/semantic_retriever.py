@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Card fields that are embedded, and hashed to tell when a card's vector is stale
+EMBEDDED_FIELDS = ('front', 'question', 'back')
+
+
+class CardEncoder:
+    """
+    CPU-only, offline text encoder for flashcards.
+    Uses the local T5 encoder weights when they are on disk and falls back to a
+    hashed bag-of-words encoder so retrieval still works without torch/transformers.
+    """
+
+    STOPWORDS = {
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how',
+        'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or', 'the', 'this', 'to', 'what', 'when', 'why',
+        'with', 'you'
+    }
+
+    def __init__(self, model_path: str = "models/self_learning_llm", hashing_dim: int = 1024,
+                 batch_size: int = 64, max_length: int = 64):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = None
+        self.model = None
+        self.backend = 'hashing'
+        self.dim = hashing_dim
+
+        if os.path.exists(model_path):
+            try:
+                import torch
+                from transformers import AutoTokenizer, T5EncoderModel
+
+                torch.set_grad_enabled(False)
+                self.tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+                self.model = T5EncoderModel.from_pretrained(model_path, local_files_only=True)
+                self.model.to('cpu').eval()
+                self.backend = 't5'
+                self.dim = self.model.config.d_model
+            except Exception as e:
+                print(f"⚠️ T5 encoder unavailable ({e}), using hashed bag-of-words encoder")
+                self.tokenizer = None
+                self.model = None
+
+    @property
+    def signature(self) -> str:
+        """Identifies the embedding space, so stale indexes are rebuilt"""
+        return f"{self.backend}:{self.model_path if self.backend == 't5' else 'crc32'}:{self.dim}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts into L2-normalised float32 vectors, one row per text"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start:start + self.batch_size])
+            if self.backend == 't5':
+                vectors[start:start + len(batch)] = self._encode_t5(batch)
+            else:
+                vectors[start:start + len(batch)] = self._encode_hashing(batch)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _encode_t5(self, batch: List[str]) -> np.ndarray:
+        """Mean-pool the T5 encoder's last hidden state over real tokens"""
+        inputs = self.tokenizer(batch, padding=True, truncation=True,
+                                max_length=self.max_length, return_tensors='pt')
+        hidden = self.model(**inputs).last_hidden_state
+        mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return pooled.numpy()
+
+    def _encode_hashing(self, batch: List[str]) -> np.ndarray:
+        """Signed feature hashing of unigrams and bigrams (stable across runs)"""
+        vectors = np.zeros((len(batch), self.dim), dtype=np.float32)
+
+        for row, text in enumerate(batch):
+            tokens = [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in self.STOPWORDS]
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode('utf-8'))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+
+        return vectors
+
+
+class SemanticRetriever:
+    """
+    Dense top-k retrieval over a deck of cards.
+    Vectors live in a memory-mapped float16 matrix on disk; syncing a changed deck
+    only embeds the cards that are new since the last sync.
+    """
+
+    CHUNK_ROWS = 65536
+
+    def __init__(self, index_dir: str, encoder: CardEncoder):
+        self.index_dir = index_dir
+        self.encoder = encoder
+        self.matrix_path = os.path.join(index_dir, 'embeddings.f16')
+        self.meta_path = os.path.join(index_dir, 'index.json')
+
+        self.keys: List[Optional[str]] = []      # card key stored in each row (None = stale)
+        self.row_of_key: Dict[str, int] = {}
+        self.row_cards: List[Optional[Dict]] = []
+        self.capacity = 0
+        self.matrix = None
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def card_key(card: Dict) -> str:
+        """Content hash of exactly the fields card_text() embeds"""
+        text = '\x1f'.join(str(card.get(field) or '') for field in EMBEDDED_FIELDS)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def card_text(card: Dict) -> str:
+        """Text used to embed a card"""
+        return ' '.join(filter(None, [card.get(field, '') for field in EMBEDDED_FIELDS]))
+
+    def _load(self):
+        """Open the existing index, discarding it if it was built by another encoder"""
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.matrix_path)):
+            return
+
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error reading semantic index {self.meta_path}: {e}")
+            return
+
+        if meta.get('encoder') != self.encoder.signature:
+            print(f"🔄 Encoder changed, rebuilding semantic index in {self.index_dir}")
+            return
+
+        self.keys = meta['keys']
+        self.capacity = meta['capacity']
+        self.row_of_key = {key: row for row, key in enumerate(self.keys) if key is not None}
+        self.row_cards = [None] * len(self.keys)
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float16, mode='r+',
+                                shape=(self.capacity, self.encoder.dim))
+
+    def _save_meta(self):
+        """Persist row keys next to the matrix"""
+        meta = {
+            'encoder': self.encoder.signature,
+            'dim': self.encoder.dim,
+            'capacity': self.capacity,
+            'keys': self.keys
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _ensure_capacity(self, rows: int):
+        """Grow the memory-mapped matrix (doubling) so it can hold `rows` rows"""
+        if rows <= self.capacity and self.matrix is not None:
+            return
+
+        new_capacity = max(rows, self.capacity * 2, 1024)
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+
+        with open(self.matrix_path, 'ab') as f:
+            f.truncate(new_capacity * self.encoder.dim * np.dtype(np.float16).itemsize)
+
+        self.capacity = new_capacity
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float16, mode='r+',
+                                shape=(self.capacity, self.encoder.dim))
+
+    def _compact(self):
+        """Drop stale rows in place, keeping the surviving vectors"""
+        write = 0
+        for read, key in enumerate(self.keys):
+            if key is None:
+                continue
+            if read != write:
+                self.matrix[write] = self.matrix[read]
+            self.keys[write] = key
+            self.row_cards[write] = self.row_cards[read]
+            write += 1
+
+        del self.keys[write:]
+        del self.row_cards[write:]
+        self.row_of_key = {key: row for row, key in enumerate(self.keys)}
+
+    def sync(self, cards: List[Dict]) -> Dict:
+        """Bring the index in line with `cards`, embedding only new cards"""
+        wanted = {}
+        for card in cards:
+            wanted.setdefault(self.card_key(card), card)
+
+        removed = 0
+        for row, key in enumerate(self.keys):
+            if key is not None and key not in wanted:
+                self.keys[row] = None
+                self.row_cards[row] = None
+                del self.row_of_key[key]
+                removed += 1
+
+        if self.keys and removed > len(self.keys) // 2:
+            self._compact()
+
+        new_keys = [key for key in wanted if key not in self.row_of_key]
+        if new_keys:
+            start = len(self.keys)
+            self._ensure_capacity(start + len(new_keys))
+            vectors = self.encoder.encode([self.card_text(wanted[key]) for key in new_keys])
+            self.matrix[start:start + len(new_keys)] = vectors.astype(np.float16)
+            self.keys.extend(new_keys)
+            self.row_cards.extend([None] * len(new_keys))
+            for offset, key in enumerate(new_keys):
+                self.row_of_key[key] = start + offset
+
+        for key, card in wanted.items():
+            self.row_cards[self.row_of_key[key]] = card
+
+        if self.matrix is not None:
+            self.matrix.flush()
+        self._save_meta()
+
+        return {'embedded': len(new_keys), 'removed': removed, 'total': len(wanted)}
+
+    def search(self, queries: Sequence[str], top_k: int = 10,
+               min_score: float = 0.0) -> List[List[Tuple[Dict, float]]]:
+        """Return the top-k (card, score) pairs for each query, best first"""
+        if not queries:
+            return []
+        rows = len(self.keys)
+        if rows == 0:
+            return [[] for _ in queries]
+
+        query_matrix = self.encoder.encode(queries).T  # (dim, n_queries)
+        scores = np.empty((rows, len(queries)), dtype=np.float32)
+        for start in range(0, rows, self.CHUNK_ROWS):
+            end = min(start + self.CHUNK_ROWS, rows)
+            scores[start:end] = np.asarray(self.matrix[start:end], dtype=np.float32) @ query_matrix
+
+        stale = [row for row, key in enumerate(self.keys) if key is None]
+        if stale:
+            scores[stale] = -np.inf
+
+        k = min(top_k, rows)
+        top_rows = np.argpartition(-scores, k - 1, axis=0)[:k]
+
+        results = []
+        for q in range(len(queries)):
+            candidates = top_rows[:, q]
+            ordered = candidates[np.argsort(-scores[candidates, q])]
+            results.append([
+                (self.row_cards[row], float(scores[row, q]))
+                for row in ordered
+                if scores[row, q] >= min_score and self.row_cards[row] is not None
+            ])
+
+        return results
@@ -1,8 +1,8 @@
-import json
-import os
 import time
 import random
 
+from deck_split import write_split_deck
+
 def generate_massive_data():
     """Generate massive amounts of flashcard data"""
     print("🚀 GENERATING MASSIVE FLASHCARD DATA - PREPARING FOR GIGABYTES!")
@@ -226,62 +226,29 @@ def generate_massive_data():
         'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
     }
     
-    # Create training/testing splits
+    # Split each deck 80/20 by content hash while saving; consolidated files are views of both halves
     print("✂️ Creating training/testing splits...")
-    
-    def create_split(deck, name):
-        cards = deck['cards'].copy()
-        random.shuffle(cards)
-        total = len(cards)
-        training_size = int(total * 0.8)
-        
-        training = {
-            'name': f"{name} - Training (80%)",
-            'total_cards': training_size,
-            'cards': cards[:training_size],
-            'split': 'training'
-        }
-        
-        testing = {
-            'name': f"{name} - Testing (20%)",
-            'total_cards': total - training_size,
-            'cards': cards[training_size:],
-            'split': 'testing'
-        }
-        
-        return training, testing
-    
-    english_training, english_testing = create_split(english_deck, 'MASSIVE English')
-    humanities_training, humanities_testing = create_split(humanities_deck, 'MASSIVE Humanities')
-    complex_training, complex_testing = create_split(complex_deck, 'MASSIVE Complex Subjects')
-    
-    # Save all decks
     print("💾 Saving massive decks...")
-    os.makedirs('generated_flashcards', exist_ok=True)
-    
-    # Save English decks
-    with open('generated_flashcards/massive_english_consolidated.json', 'w', encoding='utf-8') as f:
-        json.dump(english_deck, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_english_training.json', 'w', encoding='utf-8') as f:
-        json.dump(english_training, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_english_testing.json', 'w', encoding='utf-8') as f:
-        json.dump(english_testing, f, indent=2, ensure_ascii=False)
-    
-    # Save Humanities decks
-    with open('generated_flashcards/massive_humanities_consolidated.json', 'w', encoding='utf-8') as f:
-        json.dump(humanities_deck, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_humanities_training.json', 'w', encoding='utf-8') as f:
-        json.dump(humanities_training, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_humanities_testing.json', 'w', encoding='utf-8') as f:
-        json.dump(humanities_testing, f, indent=2, ensure_ascii=False)
-    
-    # Save Complex Subjects decks
-    with open('generated_flashcards/massive_complex_subjects_consolidated.json', 'w', encoding='utf-8') as f:
-        json.dump(complex_deck, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_complex_subjects_training.json', 'w', encoding='utf-8') as f:
-        json.dump(complex_training, f, indent=2, ensure_ascii=False)
-    with open('generated_flashcards/massive_complex_subjects_testing.json', 'w', encoding='utf-8') as f:
-        json.dump(complex_testing, f, indent=2, ensure_ascii=False)
+    
+    def save_split(deck, prefix, name):
+        return write_split_deck(
+            deck['cards'],
+            f'generated_flashcards/{prefix}_consolidated.json',
+            f'generated_flashcards/{prefix}_training.json',
+            f'generated_flashcards/{prefix}_testing.json',
+            deck['name'],
+            training_name=f"{name} - Training (80%)",
+            testing_name=f"{name} - Testing (20%)",
+            categories=deck['categories'],
+            near_duplicate_threshold=0.8
+        )
+    
+    english_split = save_split(english_deck, 'massive_english', 'MASSIVE English')
+    humanities_split = save_split(humanities_deck, 'massive_humanities', 'MASSIVE Humanities')
+    complex_split = save_split(complex_deck, 'massive_complex_subjects', 'MASSIVE Complex Subjects')
+    english_training, english_testing = english_split['training'], english_split['testing']
+    humanities_training, humanities_testing = humanities_split['training'], humanities_split['testing']
+    complex_training, complex_testing = complex_split['training'], complex_split['testing']
     
     # Calculate totals
     total_cards = english_deck['total_cards'] + humanities_deck['total_cards'] + complex_deck['total_cards']
@@ -292,9 +259,9 @@ def generate_massive_data():
     print("🎉 MASSIVE DATA GENERATION COMPLETE!")
     print("=" * 80)
     print(f"📊 TOTAL CARDS GENERATED: {total_cards:,}")
-    print(f"📚 TRAINING SET: {total_training:,} cards (80%)")
-    print(f"🧪 TESTING SET: {total_testing:,} cards (20%)")
-    print(f"📁 FILES CREATED: 9 JSON files")
+    print(f"📚 TRAINING SET: {total_training:,} cards ({total_training / total_cards:.0%})")
+    print(f"🧪 TESTING SET: {total_testing:,} cards ({total_testing / total_cards:.0%})")
+    print(f"📁 FILES CREATED: 6 JSON decks + 3 consolidated views")
     
     # Estimate file sizes
     estimated_size_mb = total_cards * 0.5  # Rough estimate: 0.5KB per card
@@ -5,19 +5,20 @@ NOTICAL AI Pipeline - Simple Subject Finder
 Simple, direct approach to find subjects on PMT
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
 import time
 import re
 
+from http_cache import CachedSession
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SimpleSubjectFinder:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
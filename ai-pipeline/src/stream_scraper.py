@@ -5,30 +5,60 @@ NOTICAL AI Pipeline - Streaming PDF Scraper
 Stream PDFs and extract Q&A pairs without downloading
 """
 
-import requests
 import json
 import logging
 from pathlib import Path
 import time
-import random
 import re
-import PyPDF2
-import io
+import itertools
+
+from fetch_pipeline import FetchPipeline
+from http_cache import CachedSession
+from pdf_buffer import fetch_to_buffer
+from pdf_text_extractor import iter_pages
+from paper_catalog import DEFAULT_PATH as CATALOG_PATH, PaperCatalog
+from processing_manifest import ProcessingManifest, append_jsonl, content_hash
+from section_classifier import SECTION_CLASSIFIER
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Question asked for each section category, in output order
+QA_TEMPLATES = [
+    ('definition', "What is the definition of {topic} in {subject}?"),
+    ('key_points', "What are the key points about {topic} in {subject}?"),
+    ('process', "What is the process for {topic} in {subject}?"),
+    ('formula', "What is the formula for {topic} in {subject}?"),
+    ('comparison', "How does {topic} compare in {subject}?"),
+    ('application', "What is an example of {topic} in {subject}?"),
+    ('properties', "What are the properties of {topic} in {subject}?"),
+    ('causes_effects', "What are the causes and effects of {topic} in {subject}?"),
+]
+
 class ComprehensivePDFScraper:
+    # Bump whenever a change alters the extracted Q&A, so the manifest re-runs old PDFs
+    EXTRACTOR_VERSION = "2.2"
+    CLASSIFY_BATCH_SIZE = 64
+    
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
         self.extracted_qa_pairs = []
 
-    def load_pdf_links(self, filename="all_subjects_pdf_links.json"):
-        """Load PDF links from our comprehensive scraping"""
+    def load_pdf_links(self, filename="all_subjects_pdf_links.json", source="PMT"):
+        """Load PDF links from the paper catalog, or our comprehensive scraping export"""
         try:
+            catalog_file = Path(CATALOG_PATH)
+            if catalog_file.exists():
+                with PaperCatalog(str(catalog_file)) as catalog:
+                    pdf_links = [paper for paper in catalog.find(source=source)
+                                 if paper['url'].endswith('.pdf')]
+                if pdf_links:
+                    logger.info(f"Found {len(pdf_links)} {source} PDF links in {catalog_file}")
+                    return pdf_links
+            
             data_file = Path("data") / filename
             if data_file.exists():
                 with open(data_file, 'r') as f:
@@ -101,84 +131,70 @@ class ComprehensivePDFScraper:
             title = pdf_info.get('title')
             logger.info(f"📄 Streaming: {title}")
             
-            response = self.session.get(url, stream=True, timeout=30)
-            if response.status_code != 200:
+            buffer = fetch_to_buffer(self.session, url, timeout=30)
+            if buffer is None:
                 return []
             
-            pdf_content = response.content
-            extracted_text = self._extract_text_from_pdf_content(pdf_content, title)
-            
-            if extracted_text and len(extracted_text) > 100:
-                qa_pairs = self._create_comprehensive_qa_pairs(extracted_text, pdf_info)
-                return qa_pairs
-            else:
-                return []
+            with buffer:
+                return self.extract_qa_from_pdf_content(pdf_info, buffer)
                 
         except Exception as e:
             logger.error(f"Error processing {pdf_info.get('title', 'Unknown')}: {e}")
             return []
 
-    def _extract_text_from_pdf_content(self, pdf_content, title):
-        """Extract ALL text from PDF content"""
+    def extract_qa_from_pdf_content(self, pdf_info, pdf_content):
+        """Extract Q&A pairs from an already-downloaded PDF"""
+        title = pdf_info.get('title', 'Unknown')
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            
-            logger.info(f"  📖 PDF has {len(pdf_reader.pages)} pages")
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- PAGE {page_num + 1} ---\n{page_text}\n"
-            
-            return text.strip()
-            
+            qa_pairs = list(self.iter_qa_pairs(pdf_info, pdf_content))
+            if qa_pairs:
+                logger.info(f"  ✅ Generated {len(qa_pairs)} Q&A pairs from {title}")
+            return qa_pairs
         except Exception as e:
-            logger.debug(f"PyPDF2 extraction failed for {title}: {e}")
-            return ""
+            logger.error(f"Error creating Q&A from {title}: {e}")
+            return []
 
-    def _create_comprehensive_qa_pairs(self, text, pdf_info):
-        """Create COMPREHENSIVE Q&A pairs from ALL content"""
-        qa_pairs = []
-        try:
-            title = pdf_info.get('title', 'Unknown')
-            subject = pdf_info.get('subject', 'Unknown')
-            topic = pdf_info.get('topic', 'Unknown')
-            
-            # Split text into sections (by pages, paragraphs, etc.)
-            sections = self._split_text_into_sections(text)
-            
-            logger.info(f"  📝 Processing {len(sections)} sections from {title}")
+    def iter_qa_pairs(self, pdf_info, pdf_content):
+        """Yield Q&A pairs page by page: pages -> sections -> Q&A, one page in memory at a time"""
+        pages = self._iter_pages(pdf_content, pdf_info.get('title'))
+        
+        # Hold back the first pages until the PDF has shown enough text to be worth processing
+        held, text_length = [], 0
+        for page_text in pages:
+            held.append(page_text)
+            text_length += len(page_text)
+            if text_length > 100:
+                break
+        if text_length <= 100:
+            return
+        
+        sections = enumerate(self._iter_sections(itertools.chain(held, pages)))
+        while True:
+            chunk = list(itertools.islice(sections, self.CLASSIFY_BATCH_SIZE))
+            if not chunk:
+                break
             
-            for section_num, section in enumerate(sections):
-                if len(section.strip()) < 20:  # Skip very short sections
-                    continue
-                
+            # Skip very short sections, classify the rest a batch at a time
+            batch = [(section_num, section) for section_num, section in chunk if len(section.strip()) >= 20]
+            profiles = SECTION_CLASSIFIER.classify_batch([section.strip() for _, section in batch])
+            for (section_num, section), profile in zip(batch, profiles):
                 # Extract ALL possible Q&A from this section
-                section_qa_pairs = self._extract_all_qa_from_section(section, pdf_info, section_num)
-                qa_pairs.extend(section_qa_pairs)
-            
-            logger.info(f"  ✅ Generated {len(qa_pairs)} Q&A pairs from {title}")
-            
+                yield from self._extract_all_qa_from_section(section, pdf_info, section_num, profile)
+
+    def _iter_pages(self, pdf_content, title):
+        """Yield the text of each non-empty page"""
+        try:
+            for page_text in iter_pages(pdf_content):
+                if page_text:
+                    yield page_text
         except Exception as e:
-            logger.error(f"Error creating Q&A from {pdf_info.get('title', 'Unknown')}: {e}")
-        
-        return qa_pairs
+            logger.debug(f"PDF text extraction failed for {title}: {e}")
 
-    def _split_text_into_sections(self, text):
-        """Split text into meaningful sections for processing"""
-        sections = []
-        
-        # Split by page markers first
-        page_splits = text.split('--- PAGE')
-        
-        for page_split in page_splits:
-            if not page_split.strip():
-                continue
-                
-            # Further split by paragraphs within each page
-            paragraphs = [p.strip() for p in page_split.split('\n\n') if len(p.strip()) > 20]
+    def _iter_sections(self, pages):
+        """Split each page into meaningful sections for processing"""
+        for page_text in pages:
+            # Split by paragraphs within each page
+            paragraphs = [p.strip() for p in page_text.split('\n\n') if len(p.strip()) > 20]
             
             for paragraph in paragraphs:
                 # Split long paragraphs into smaller chunks
@@ -187,13 +203,11 @@ class ComprehensivePDFScraper:
                     sentences = re.split(r'[.!?]+', paragraph)
                     for sentence in sentences:
                         if len(sentence.strip()) > 30:
-                            sections.append(sentence.strip())
+                            yield sentence.strip()
                 else:
-                    sections.append(paragraph)
-        
-        return sections
+                    yield paragraph
 
-    def _extract_all_qa_from_section(self, section, pdf_info, section_num):
+    def _extract_all_qa_from_section(self, section, pdf_info, section_num, profile=None):
         """Extract ALL possible Q&A from a section"""
         qa_pairs = []
         title = pdf_info.get('title', 'Unknown')
@@ -205,47 +219,10 @@ class ComprehensivePDFScraper:
             return qa_pairs
         
         # Extract multiple Q&A types from the same section
-        qa_types = []
-        
-        # Type 1: Definition/Concept (look for "is", "are", "refers to", "defined as")
-        if any(word in clean_text.lower() for word in ['is', 'are', 'refers to', 'defined as', 'means', 'consists of']):
-            qa_types.append(('definition', f"What is the definition of {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 2: Key Points/Explanation (look for "key", "important", "essential")
-        if any(word in clean_text.lower() for word in ['key', 'important', 'essential', 'critical', 'main', 'primary']):
-            qa_types.append(('key_points', f"What are the key points about {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 3: Process/Steps (look for "step", "process", "method")
-        if any(word in clean_text.lower() for word in ['step', 'process', 'method', 'procedure', 'approach', 'technique']):
-            qa_types.append(('process', f"What is the process for {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 4: Formula/Calculation (look for "formula", "equation", "calculate")
-        if any(word in clean_text.lower() for word in ['formula', 'equation', 'calculate', 'solve', 'compute', 'evaluate']):
-            qa_types.append(('formula', f"What is the formula for {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 5: Comparison/Analysis (look for "compare", "difference", "similar")
-        if any(word in clean_text.lower() for word in ['compare', 'difference', 'similar', 'versus', 'contrast', 'analyze']):
-            qa_types.append(('comparison', f"How does {topic} compare in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 6: Application/Example (look for "example", "application", "use")
-        if any(word in clean_text.lower() for word in ['example', 'application', 'use', 'apply', 'instance', 'case']):
-            qa_types.append(('application', f"What is an example of {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 7: Properties/Characteristics (look for "properties", "characteristics", "features")
-        if any(word in clean_text.lower() for word in ['properties', 'characteristics', 'features', 'attributes', 'qualities']):
-            qa_types.append(('properties', f"What are the properties of {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
-        
-        # Type 8: Causes/Effects (look for "cause", "effect", "result", "impact")
-        if any(word in clean_text.lower() for word in ['cause', 'effect', 'result', 'impact', 'consequence', 'outcome']):
-            qa_types.append(('causes_effects', f"What are the causes and effects of {topic} in {subject}?", 
-                           f"{clean_text[:300]}..."))
+        if profile is None:
+            profile = SECTION_CLASSIFIER.classify(clean_text)
+        qa_types = [(qa_type, template.format(topic=topic, subject=subject), f"{clean_text[:300]}...")
+                    for qa_type, template in QA_TEMPLATES if qa_type in profile.categories]
         
         # If no specific type detected, create multiple general questions
         if not qa_types:
@@ -256,12 +233,13 @@ class ComprehensivePDFScraper:
             ])
         
         # Create Q&A pairs for ALL detected types
+        difficulty = self._determine_difficulty(clean_text, profile)
         for qa_type, question, answer in qa_types:
             qa_pairs.append({
                 'question': question,
                 'answer': answer,
                 'qa_type': qa_type,
-                'difficulty': self._determine_difficulty(clean_text),
+                'difficulty': difficulty,
                 'subject': subject,
                 'level': pdf_info.get('level', 'Unknown'),
                 'topic': topic,
@@ -275,9 +253,9 @@ class ComprehensivePDFScraper:
         
         return qa_pairs
 
-    def _determine_difficulty(self, text):
+    def _determine_difficulty(self, text, profile=None):
         """Determine difficulty based on text complexity"""
-        word_count = len(text.split())
+        word_count = (profile or SECTION_CLASSIFIER.classify(text)).word_count
         if word_count < 30:
             return 'easy'
         elif word_count < 80:
@@ -287,8 +265,10 @@ class ComprehensivePDFScraper:
         else:
             return 'extreme'
 
-    def process_all_pdfs(self):
-        """Process ALL PDFs and extract EVERYTHING"""
+    def process_all_pdfs(self, fetch_workers=8, per_host_limit=2, per_host_rate=2.0,
+                         output_file="data/comprehensive_qa_pairs.jsonl",
+                         manifest_path="data/processed_papers.sqlite"):
+        """Process ALL PDFs and extract EVERYTHING (downloads overlap with extraction)"""
         logger.info(f"🚀 Starting COMPREHENSIVE PDF processing...")
         
         # Load PDF links
@@ -300,21 +280,47 @@ class ComprehensivePDFScraper:
         logger.info(f"📚 Found {len(pdf_links)} PDF links to process")
         
         all_qa_pairs = []
+        manifest = ProcessingManifest(manifest_path)
+        
+        # PDFs already processed by this extractor version are read back, not fetched again
+        pending = []
+        for pdf_info in pdf_links:
+            if manifest.is_current(pdf_info['url'], 'stream_scraper', self.EXTRACTOR_VERSION):
+                record = manifest.load_output(pdf_info['url'], 'stream_scraper')
+                if record is not None:
+                    all_qa_pairs.extend(record['qa_pairs'])
+                    continue
+            pending.append(pdf_info)
+        
+        if len(pending) < len(pdf_links):
+            logger.info(f"⏭️  Reusing {len(pdf_links) - len(pending)} already processed PDFs")
+        
+        def extract(pdf_info, pdf_content):
+            return content_hash([pdf_content.view]), self.extract_qa_from_pdf_content(pdf_info, pdf_content)
         
-        for i, pdf_info in enumerate(pdf_links):
+        # Per-host token buckets replace the old fixed sleep between PDFs
+        pipeline = FetchPipeline(self.session, fetch_workers=fetch_workers,
+                                 per_host_limit=per_host_limit, per_host_rate=per_host_rate)
+        
+        for i, (pdf_info, result) in enumerate(pipeline.run(pending, extract)):
             if i % 10 == 0:
-                logger.info(f"📊 Progress: {i}/{len(pdf_links)}")
+                logger.info(f"📊 Progress: {i}/{len(pending)}")
+            
+            if result is None:
+                continue  # fetch or extraction failed; retried on the next run
             
-            # Process this PDF
-            qa_pairs = self.stream_and_extract_pdf(pdf_info)
+            # Append each PDF's result as soon as it is ready, then record it
+            digest, qa_pairs = result
+            offset = append_jsonl(output_file, {'url': pdf_info['url'], 'title': pdf_info.get('title'),
+                                                'content_hash': digest, 'qa_pairs': qa_pairs})
+            manifest.record(pdf_info['url'], 'stream_scraper', digest, self.EXTRACTOR_VERSION,
+                            output_file, offset)
             
             if qa_pairs:
                 all_qa_pairs.extend(qa_pairs)
                 logger.info(f"  ✅ Extracted {len(qa_pairs)} Q&A pairs from {pdf_info['title']}")
-            
-            # Be respectful with delays
-            time.sleep(random.uniform(0.5, 1))
         
+        manifest.close()
         self.extracted_qa_pairs = all_qa_pairs
         
         logger.info(f"🎉 COMPREHENSIVE Processing complete!")
@@ -1,5 +1,6 @@
 import PyPDF2
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from paper_join import join_paper
 import re
 import json
 from typing import List, Dict, Tuple, Optional
@@ -25,12 +26,7 @@ class QAMatcher:
         Extract text from PDF using PyMuPDF (more reliable than PyPDF2)
         """
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
@@ -121,12 +117,10 @@ class QAMatcher:
         """
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers, key="number")
+        for question, matching_answers in joined:
             question_num = question["number"]
             
-            # Find matching answer(s)
-            matching_answers = [a for a in answers if a["number"] == question_num]
-            
             if matching_answers:
                 for answer in matching_answers:
                     qa_pairs.append({
@@ -148,6 +142,9 @@ class QAMatcher:
                     "confidence": "low"
                 })
         
+        if report.has_unmatched:
+            print(report.summary())
+        
         return qa_pairs
     
     def test_single_paper(self, qp_path: str, ms_path: str) -> Dict:
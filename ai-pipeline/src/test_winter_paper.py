@@ -1,4 +1,5 @@
-import fitz  # PyMuPDF
+from pdf_text_extractor import extract_text
+from paper_join import join_paper
 import re
 import json
 from typing import List, Dict, Tuple, Optional
@@ -17,12 +18,7 @@ class WinterPaperTester:
         Extract text from PDF using PyMuPDF
         """
         try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return extract_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
@@ -143,13 +139,12 @@ class WinterPaperTester:
         """
         qa_pairs = []
         
-        for question in questions:
+        joined, report = join_paper(questions, answers, key="number")
+        for question, matching_answers in joined:
             question_num = question["number"]
             
-            # Find matching answer
-            matching_answer = next((a for a in answers if a["number"] == question_num), None)
-            
-            if matching_answer:
+            if matching_answers:
+                matching_answer = matching_answers[0]
                 qa_pairs.append({
                     "question_number": question_num,
                     "question_content": question["content"],
@@ -169,6 +164,9 @@ class WinterPaperTester:
                     "confidence": "low"
                 })
         
+        if report.has_unmatched:
+            print(report.summary())
+        
         return qa_pairs
     
     def test_winter_paper(self, qp_path: str, ms_path: str) -> Dict:
@@ -0,0 +1,147 @@
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Sequence
+
+# Never matched by any filter pattern, so batches can be scanned as one string
+_SEPARATOR = '\x00'
+
+
+class PatternFilter:
+    """
+    Keywords (case-insensitive substrings) and regex patterns (case-sensitive)
+    compiled into one alternation at construction time, so checking a string
+    is a single regex scan no matter how many rules there are.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (), patterns: Iterable[str] = ()):
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        parts = []
+        if keywords:
+            parts.append('(?i:' + '|'.join(re.escape(keyword) for keyword in keywords) + ')')
+        parts.extend(f'(?:{pattern})' for pattern in patterns)
+        self.regex = re.compile('|'.join(parts)) if parts else None
+
+    def matches(self, text: str) -> bool:
+        return self.regex is not None and self.regex.search(text) is not None
+
+    def matches_batch(self, texts: Sequence[str]) -> List[bool]:
+        """matches() for every text, from one scan over the whole batch"""
+        hits = [False] * len(texts)
+        if self.regex is None or not texts:
+            return hits
+
+        starts, position = [], 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + len(_SEPARATOR)
+        joined = _SEPARATOR.join(texts)
+
+        position = 0
+        while True:
+            match = self.regex.search(joined, position)
+            if match is None:
+                break
+            index = bisect_right(starts, match.start()) - 1
+            hits[index] = True
+            if index + 1 == len(texts):
+                break
+            position = starts[index + 1]  # one hit is enough; jump to the next text
+        return hits
+
+
+class PureTextFilter:
+    """Accepts MCQs whose question and options are free of diagrams, formulas and maths"""
+
+    def __init__(self, question_filter: PatternFilter, option_filter: PatternFilter,
+                 min_option_length: int = 0):
+        self.question_filter = question_filter
+        self.option_filter = option_filter
+        self.min_option_length = min_option_length
+
+    def is_pure_text_question(self, question_text: str) -> bool:
+        return not self.question_filter.matches(question_text)
+
+    def is_pure_text_options(self, options: Dict[str, str]) -> bool:
+        return self.classify([{'question_content': '', 'options': options}], check_question=False)[0]
+
+    def classify(self, questions: Sequence[Dict], check_question: bool = True) -> List[bool]:
+        """Whether each parsed question passes, with one scan for all questions and one for all options"""
+        keep = [True] * len(questions)
+        if check_question:
+            question_hits = self.question_filter.matches_batch([q['question_content'] for q in questions])
+            keep = [not hit for hit in question_hits]
+
+        owners, option_texts = [], []
+        for index, question in enumerate(questions):
+            for option_text in question['options'].values():
+                if len(option_text.strip()) < self.min_option_length:
+                    keep[index] = False
+                owners.append(index)
+                option_texts.append(option_text)
+
+        for owner, hit in zip(owners, self.option_filter.matches_batch(option_texts)):
+            if hit:
+                keep[owner] = False
+        return keep
+
+
+# Pure text: no diagrams, formulas or explicit maths
+PURE_TEXT_FILTER = PureTextFilter(
+    PatternFilter(
+        keywords=[
+            'diagram', 'graph', 'table', 'figure', 'shown', 'illustration', 'sketch',
+            'formula', 'equation', 'derive', 'calculate', 'determine', 'find',
+            '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10'
+        ],
+        patterns=[
+            r'\d+\s*×\s*10',  # Scientific notation
+            r'[A-Z]\s*=\s*[A-Z]',  # Equations like F = ma
+            r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Mathematical operations with variables
+            r'[A-Z]²',  # Squared variables
+            r'[A-Z]⁻¹',  # Negative powers
+        ]),
+    PatternFilter(
+        keywords=[
+            '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10',
+            'formula', 'equation', 'derive', 'calculate'
+        ],
+        patterns=[
+            r'[A-Z]\s*=\s*[A-Z]',  # Equations
+            r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Math operations
+            r'[A-Z]²',  # Squared variables
+            r'[A-Z]⁻¹',  # Negative powers
+        ])
+)
+
+# Strict: additionally no quantities, units or numbers attached to symbols
+STRICT_PURE_TEXT_FILTER = PureTextFilter(
+    PatternFilter(
+        keywords=[
+            'diagram', 'graph', 'table', 'figure', 'shown', 'illustration', 'sketch',
+            'formula', 'equation', 'derive', 'calculate', 'determine', 'find',
+            '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10', '10–', '10-',
+            'density', 'modulus', 'constant', 'frequency', 'wavelength', 'velocity'
+        ],
+        patterns=[
+            r'\d+\s*×\s*10',  # Scientific notation
+            r'[A-Z]\s*=\s*[A-Z]',  # Equations like F = ma
+            r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Mathematical operations with variables
+            r'[A-Z]²',  # Squared variables
+            r'[A-Z]⁻¹',  # Negative powers
+            r'\d+\s*[A-Z]',  # Numbers followed by units (like 5.0 m, 40 kg)
+            r'[A-Z]+\s*[+\-]\s*[A-Z]+',  # Variable operations
+        ]),
+    PatternFilter(
+        keywords=[
+            '×', '÷', '±', '²', '³', '⁻¹', '⁻²', '⁻³', '×10', '× 10', '10–', '10-',
+            'formula', 'equation', 'derive', 'calculate', 'kg', 'm', 's', 'w', 'j', 'n'
+        ],
+        patterns=[
+            r'[A-Z]\s*=\s*[A-Z]',  # Equations
+            r'[A-Z]\s*[+\-×÷]\s*[A-Z]',  # Math operations
+            r'[A-Z]²',  # Squared variables
+            r'[A-Z]⁻¹',  # Negative powers
+            r'\d+\s*[A-Z]',  # Numbers with units
+        ]),
+    min_option_length=3
+)
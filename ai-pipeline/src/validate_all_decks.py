@@ -1,7 +1,8 @@
-import json
 import os
 import glob
 
+from deck_split import load_deck
+
 def validate_deck_structure(deck_data, deck_name):
     """Validate individual deck structure"""
     print(f"\n🔍 Validating: {deck_name}")
@@ -86,8 +87,7 @@ def validate_all_decks():
     # Validate each file
     for file_path in sorted(json_files):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                deck_data = json.load(f)
+            deck_data = load_deck(file_path)
             
             deck_name = os.path.basename(file_path)
             if validate_deck_structure(deck_data, deck_name):
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Offline test of the Anki .apkg importer against the fixture packages in
+test_fixtures/anki (rebuild them with test_fixtures/anki/build_fixtures.py)
+"""
+
+import sys
+import os
+import json
+import tempfile
+import zipfile
+
+# Add the pipeline sources to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from anki_importer import import_apkg, iter_apkg_cards
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixtures', 'anki')
+LEGACY = os.path.join(FIXTURES, 'legacy.apkg')
+SCHEMA18 = os.path.join(FIXTURES, 'schema18.apkg')
+
+
+def read_cards(path, batch_size=1000):
+    return [card for batch in iter_apkg_cards(path, batch_size) for card in batch]
+
+
+def test_legacy_basic_cards():
+    """Front/Back notes from a collection.anki2 package, HTML stripped"""
+    cards = {card['note_id']: card for card in read_cards(LEGACY)}
+    assert cards[1]['front'] == 'ubiquitous'
+    assert cards[1]['back'] == 'present everywhere\n(adjective)'
+    assert cards[1]['tags'] == ['vocab', 'gre']
+    assert cards[3]['back'] == '"well meaning" and kindly'
+    assert all(cards[i]['type'] == 'basic' for i in (1, 2, 3))
+    assert 6 not in cards, "a note without an answer is skipped"
+
+
+def test_legacy_cloze_cards():
+    """Cloze note type: hints shown on the front, deletions filled in on the back"""
+    cards = {card['note_id']: card for card in read_cards(LEGACY)}
+    assert cards[4]['type'] == 'cloze'
+    assert cards[4]['front'] == 'The past of [verb] is [...]'
+    assert cards[4]['back'] == 'The past of go is went\nirregular'
+    assert cards[5]['back'] == 'Whom did you see?'
+
+
+def test_deck_names():
+    """Full deck names from both schemas; the category is the top-level deck"""
+    legacy = {card['note_id']: card for card in read_cards(LEGACY)}
+    assert legacy[1]['deck'] == 'English::Vocabulary'
+    assert legacy[4]['deck'] == 'English::Grammar'
+    assert legacy[1]['category'] == 'English'
+
+    schema18 = read_cards(SCHEMA18)
+    assert {card['deck'] for card in schema18} == {'Science::Physics'}
+    assert {card['category'] for card in schema18} == {'Science'}
+
+
+def test_schema18_cards():
+    """Note types and fields read from their own tables (fields stored out of order)"""
+    cards = {card['note_id']: card for card in read_cards(SCHEMA18)}
+    assert cards[11]['front'] == 'Unit of force'
+    assert cards[11]['back'] == 'newton (N)'
+    assert cards[12]['back'] == '3.0 × 10^8 m/s', "superscripts are kept as ^"
+    # Cloze notes are recognised by their markup in the new schema
+    assert cards[13]['type'] == 'cloze'
+    assert cards[13]['front'] == '[...] never decreases in an isolated system'
+    assert cards[13]['back'] == 'Entropy never decreases in an isolated system\nSecond law'
+
+
+def test_batching():
+    """Notes come back in batches of at most batch_size, in note order"""
+    batches = list(iter_apkg_cards(LEGACY, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [card['note_id'] for batch in batches for card in batch] == [1, 2, 3, 4, 5]
+    assert read_cards(LEGACY, batch_size=1) == read_cards(LEGACY)
+
+
+def test_import_apkg():
+    """The written deck file matches what was read, with metadata"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        metadata = import_apkg(LEGACY, output_dir, name="Legacy Fixture", batch_size=2)
+        with open(metadata['path'], 'r', encoding='utf-8') as f:
+            deck = json.load(f)
+    assert os.path.basename(metadata['path']) == 'legacy_fixture.json'
+    assert deck['name'] == 'Legacy Fixture'
+    assert deck['cards'] == read_cards(LEGACY)
+    assert deck['metadata']['total_cards'] == 5
+    assert deck['metadata']['categories'] == ['English']
+
+
+def test_corrupt_package_leaves_nothing():
+    """A package that can't be read raises and leaves no partial deck file"""
+    with tempfile.TemporaryDirectory() as directory:
+        package = os.path.join(directory, 'broken.apkg')
+        with zipfile.ZipFile(package, 'w') as archive:
+            archive.writestr('collection.anki2', b'not a database')
+        output_dir = os.path.join(directory, 'decks')
+        try:
+            import_apkg(package, output_dir)
+        except Exception:
+            pass
+        else:
+            raise AssertionError("a corrupt package was imported")
+        assert os.listdir(output_dir) == []
+
+
+if __name__ == "__main__":
+    print("🧪 Anki Importer Test - Fixture Packages")
+    print("=" * 60)
+
+    tests = [test_legacy_basic_cards, test_legacy_cloze_cards, test_deck_names,
+             test_schema18_cards, test_batching, test_import_apkg, test_corrupt_package_leaves_nothing]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} importer tests passed!")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Offline test of the crawl frontier against a local fixture site:
+URL deduplication, retry backoff and resuming from a checkpoint
+"""
+
+import sys
+import os
+import tempfile
+from urllib.parse import urlparse
+
+# Add the pipeline sources and fixtures to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixtures'))
+
+import requests
+
+from crawl_frontier import Crawler
+from fixture_server import FixtureServer
+from link_extractor import extract_links
+
+# /index -> /a, /b, /a#top (same page), /flaky, /gone;  /a -> /index, /c;  /b -> /c
+SITE = {
+    '/index': ['/a', '/b', '/a#top', '/flaky', '/gone'],
+    '/a': ['/index', '/c'],
+    '/b': ['/c'],
+    '/c': [],
+    '/flaky': ['/d'],
+    '/d': [],
+}
+
+
+def page(links):
+    body = ''.join(f'<a href="{href}">{href} page</a>' for href in links)
+    return (200, 'text/html', f"<html><body>{body}</body></html>".encode('utf-8'))
+
+
+def serve_site(failures=None):
+    routes = {path: page(links) for path, links in SITE.items()}
+    routes['/gone'] = (404, 'text/plain', b'gone')
+    return FixtureServer(routes, failures)
+
+
+def crawler(server, **options):
+    def handle_page(task, content):
+        children = [{'url': server.url(link.href), 'kind': 'page'} for link in extract_links(content)]
+        return urlparse(task['url']).path.lstrip('/'), children
+
+    options.setdefault('per_host_rate', 100.0)
+    return Crawler({'page': handle_page}, session=requests.Session(), timeout=5, **options)
+
+
+def test_each_page_fetched_once():
+    """Links found on several pages, and fragment variants, are crawled once"""
+    with serve_site() as server:
+        visited = []
+        stats = crawler(server, workers=4).run([{'url': server.url('/index'), 'kind': 'page'}],
+                                               on_result=lambda task, name: visited.append(name))
+        assert sorted(visited) == ['a', 'b', 'c', 'd', 'flaky', 'index']
+        assert all(server.hits(path) == 1 for path in SITE)
+        assert stats['fetched'] == 6 and stats['failed'] == 1
+
+
+def test_retry_backoff():
+    """503s are retried with doubling delays; a 404 fails at once"""
+    with serve_site(failures={'/flaky': [503, 503]}) as server:
+        crawl = crawler(server, workers=2, backoff=0.2, max_retries=3)
+        crawl.run([{'url': server.url('/index'), 'kind': 'page'}])
+
+        times = server.times('/flaky')
+        assert len(times) == 3, times
+        assert times[1] - times[0] >= 0.2 and times[2] - times[1] >= 0.4
+        assert server.hits('/d') == 1, "the page behind a retried page is still crawled"
+        assert server.hits('/gone') == 1
+        assert crawl.stats['retried'] == 2
+        assert [failure['url'] for failure in crawl.failures] == [server.url('/gone')]
+
+
+def test_retries_give_up():
+    """After max_retries the page is recorded as failed"""
+    with serve_site(failures={'/flaky': [503] * 5}) as server:
+        crawl = crawler(server, workers=2, backoff=0.01, max_retries=2)
+        crawl.run([{'url': server.url('/index'), 'kind': 'page'}])
+        assert server.hits('/flaky') == 3
+        assert server.hits('/d') == 0
+        assert server.url('/flaky') in [failure['url'] for failure in crawl.failures]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_checkpoint_resume():
+    """An interrupted crawl resumes from its checkpoint without refetching finished pages"""
+    with serve_site() as server, tempfile.TemporaryDirectory() as directory:
+        checkpoint = os.path.join(directory, 'crawl.json')
+
+        first = crawler(server, workers=1, checkpoint_path=checkpoint, checkpoint_every=1)
+
+        def stop_after_three(task, name):
+            first.state.setdefault('visited', []).append(name)
+            if len(first.state['visited']) == 3:
+                raise Interrupted()
+
+        try:
+            first.run([{'url': server.url('/index'), 'kind': 'page'}], on_result=stop_after_three)
+        except Interrupted:
+            pass
+        else:
+            raise AssertionError("the crawl was not interrupted")
+        assert os.path.exists(checkpoint)
+
+        second = crawler(server, workers=1, checkpoint_path=checkpoint)
+        assert second.resumed
+        assert second.state['visited'] == first.state['visited']
+        second.run(on_result=lambda task, name: second.state['visited'].append(name))
+
+        assert sorted(second.state['visited']) == ['a', 'b', 'c', 'd', 'flaky', 'index']
+        assert all(server.hits(path) == 1 for path in SITE)
+
+
+def test_resume_retries_failures():
+    """Pages that failed are in the checkpoint and fetched again when the crawl resumes"""
+    with serve_site(failures={'/flaky': [503] * 3}) as server, tempfile.TemporaryDirectory() as directory:
+        checkpoint = os.path.join(directory, 'crawl.json')
+        first = crawler(server, workers=2, backoff=0.01, max_retries=2, checkpoint_path=checkpoint)
+        first.run([{'url': server.url('/index'), 'kind': 'page'}])
+        assert server.url('/flaky') in [failure['url'] for failure in first.failures]
+        assert server.hits('/d') == 0
+
+        # The site has recovered: the resumed crawl picks /flaky (and what it links to) up
+        second = crawler(server, workers=2, backoff=0.01, max_retries=2, checkpoint_path=checkpoint)
+        visited = []
+        second.run(on_result=lambda task, name: visited.append(name))
+        assert sorted(visited) == ['d', 'flaky']
+        assert server.hits('/flaky') == 4 and server.hits('/d') == 1
+        assert [failure['url'] for failure in second.failures] == [server.url('/gone')]
+        assert server.hits('/gone') == 2, "a page that failed for good is tried once per run"
+
+
+if __name__ == "__main__":
+    print("🧪 Crawl Frontier Test - Local Fixture Site")
+    print("=" * 60)
+
+    tests = [test_each_page_fetched_once, test_retry_backoff, test_retries_give_up, test_checkpoint_resume,
+             test_resume_retries_failures]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} crawl frontier tests passed!")
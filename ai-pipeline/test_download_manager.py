@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline test of resumable downloads against a local fixture server:
+fresh downloads, resuming an interrupted file, and a file that changed on
+the server since the interrupted download started
+"""
+
+import sys
+import os
+import hashlib
+import tempfile
+
+# Add the pipeline sources and fixtures to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixtures'))
+
+import requests
+
+from download_manager import DownloadManager
+from fixture_server import FixtureServer
+
+OLD = b'%PDF-1.4 old paper ' + b'x' * 5000
+NEW = b'%PDF-1.4 new paper ' + b'y' * 6000
+
+
+def etag(body):
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def manager():
+    return DownloadManager(session=requests.Session(), per_host_rate=100.0, timeout=5, max_retries=0)
+
+
+def interrupted(path, body, validator):
+    """Leave behind what a download of `body` interrupted halfway would have written"""
+    with open(path + '.part', 'wb') as f:
+        f.write(body[:len(body) // 2])
+    if validator is not None:
+        with open(path + '.part.validator', 'w', encoding='utf-8') as f:
+            f.write(validator)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_fresh_download():
+    """A complete download is renamed into place and leaves no partial files"""
+    with FixtureServer({'/paper.pdf': (200, 'application/pdf', OLD)}) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'paper.pdf')
+        result = manager().download(server.url('/paper.pdf'), path)
+        assert result['status'] == 'downloaded' and result['bytes'] == len(OLD)
+        assert read(path) == OLD
+        assert sorted(os.listdir(directory)) == ['paper.pdf']
+
+
+def test_resume_unchanged():
+    """An interrupted download continues with Range + If-Range and only fetches the rest"""
+    with FixtureServer({'/paper.pdf': (200, 'application/pdf', OLD)}) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'paper.pdf')
+        interrupted(path, OLD, etag(OLD))
+        result = manager().download(server.url('/paper.pdf'), path)
+        assert result['status'] == 'resumed'
+        assert result['bytes'] == len(OLD) - len(OLD) // 2
+        assert read(path) == OLD
+        headers = server.request_headers('/paper.pdf')[0]
+        assert headers['Range'] == f'bytes={len(OLD) // 2}-' and headers['If-Range'] == etag(OLD)
+        assert sorted(os.listdir(directory)) == ['paper.pdf']
+
+
+def test_resume_after_file_changed():
+    """The server's copy changed since the partial was written: the new file is downloaded whole"""
+    with FixtureServer({'/paper.pdf': (200, 'application/pdf', NEW)}) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'paper.pdf')
+        interrupted(path, OLD, etag(OLD))
+        result = manager().download(server.url('/paper.pdf'), path)
+        assert result['status'] == 'downloaded'
+        assert read(path) == NEW, "the new tail must not be appended to the old prefix"
+
+
+def test_partial_without_validator():
+    """A partial file with no recorded validator can't be trusted and is downloaded again"""
+    with FixtureServer({'/paper.pdf': (200, 'application/pdf', NEW)}) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'paper.pdf')
+        interrupted(path, OLD, None)
+        result = manager().download(server.url('/paper.pdf'), path)
+        assert result['status'] == 'downloaded'
+        assert read(path) == NEW
+        assert 'Range' not in server.request_headers('/paper.pdf')[0]
+
+
+if __name__ == "__main__":
+    print("🧪 Download Manager Test - Local Fixture Server")
+    print("=" * 60)
+
+    tests = [test_fresh_download, test_resume_unchanged, test_resume_after_file_changed,
+             test_partial_without_validator]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} download manager tests passed!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Offline test of the concurrent fetch/extract pipeline against a local
+fixture server serving a few small PDFs
+"""
+
+import sys
+import os
+import subprocess
+import threading
+
+# Add the pipeline sources and fixtures to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixtures'))
+
+import fitz  # PyMuPDF
+import requests
+
+from fetch_pipeline import FetchPipeline
+from fixture_server import FixtureServer
+
+
+def make_pdf(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def serve_papers():
+    routes = {f"/paper{i}.pdf": (200, 'application/pdf', make_pdf(f"Question paper {i}")) for i in range(6)}
+    return FixtureServer(routes)
+
+
+def pdf_text(item, content):
+    doc = fitz.open(stream=content.view, filetype='pdf')
+    try:
+        return doc[0].get_text().strip()
+    finally:
+        doc.close()
+
+
+def pipeline():
+    # A plain session: the HTTP cache is not under test here
+    return FetchPipeline(session=requests.Session(), fetch_workers=4, extract_workers=2,
+                         queue_size=2, per_host_limit=4, per_host_rate=100.0, timeout=5)
+
+
+def test_fetch_and_extract():
+    """Every item comes back exactly once with its extracted text"""
+    with serve_papers() as server:
+        items = [{'url': server.url(f"/paper{i}.pdf"), 'title': f"paper {i}"} for i in range(6)]
+        results = dict((item['title'], text) for item, text in pipeline().run(items, pdf_text))
+        assert results == {f"paper {i}": f"Question paper {i}" for i in range(6)}
+        assert all(server.hits(f"/paper{i}.pdf") == 1 for i in range(6))
+
+
+def test_failures_yield_none():
+    """404s and extract errors come back as None instead of stopping the run"""
+    def extract(item, content):
+        if item['title'] == 'paper 1':
+            raise ValueError("unreadable")
+        return pdf_text(item, content)
+
+    with serve_papers() as server:
+        items = [{'url': server.url("/missing.pdf"), 'title': 'missing'},
+                 {'url': server.url("/paper1.pdf"), 'title': 'paper 1'},
+                 {'url': server.url("/paper2.pdf"), 'title': 'paper 2'}]
+        results = dict((item['title'], text) for item, text in pipeline().run(items, extract))
+        assert results == {'missing': None, 'paper 1': None, 'paper 2': 'Question paper 2'}
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+def test_dead_extractor_does_not_hang():
+    """An extract worker dying on a non-Exception still delivers its item, then run() raises"""
+    def extract(item, content):
+        raise WorkerKilled()
+
+    with serve_papers() as server:
+        items = [{'url': server.url(f"/paper{i}.pdf"), 'title': f"paper {i}"} for i in range(3)]
+        single = FetchPipeline(session=requests.Session(), fetch_workers=2, extract_workers=1,
+                               per_host_limit=4, per_host_rate=100.0, timeout=5)
+        seen = []
+        excepthook, threading.excepthook = threading.excepthook, lambda args: None  # the death is expected
+        try:
+            for item, result in single.run(items, extract):
+                seen.append(result)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("run() finished although its only extractor died")
+        finally:
+            threading.excepthook = excepthook
+        assert seen == [None]
+
+
+# Run in a child process: an abandoned run that leaves fetch threads blocked keeps
+# the interpreter from exiting, which can only be seen from outside
+ABANDON_SCRIPT = """
+import sys
+sys.path[:0] = sys.argv[1:3]
+import requests
+from fetch_pipeline import FetchPipeline
+from fixture_server import FixtureServer
+
+with FixtureServer({f"/paper{i}.pdf": (200, 'application/pdf', b'%PDF-1.4 paper') for i in range(20)}) as server:
+    items = [{'url': server.url(f"/paper{i}.pdf"), 'title': f"paper {i}"} for i in range(20)]
+    pipeline = FetchPipeline(session=requests.Session(), fetch_workers=4, extract_workers=1, queue_size=1,
+                             per_host_limit=4, per_host_rate=100.0, timeout=5)
+    results = pipeline.run(items, lambda item, content: len(content))
+    next(results)
+    results.close()
+print("closed")
+"""
+
+
+def test_abandoned_run_exits():
+    """Closing the generator early releases every worker, so the process can exit"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        child = subprocess.run([sys.executable, '-c', ABANDON_SCRIPT, os.path.join(here, 'src'),
+                                os.path.join(here, 'test_fixtures')],
+                               capture_output=True, text=True, timeout=30)
+    except subprocess.TimeoutExpired:
+        raise AssertionError("the process did not exit after the run was abandoned")
+    assert child.returncode == 0, child.stderr
+    assert child.stdout.strip() == 'closed'
+
+
+if __name__ == "__main__":
+    print("🧪 Fetch Pipeline Test - Local Fixture Server")
+    print("=" * 60)
+
+    tests = [test_fetch_and_extract, test_failures_yield_none, test_dead_extractor_does_not_hang,
+             test_abandoned_run_exits]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} fetch pipeline tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Rebuilds the small .apkg fixtures used by test_anki_importer.py:
+
+    legacy.apkg      collection.anki2, note types and decks as JSON in the col table
+    schema18.apkg    collection.anki21, note types, fields and decks in their own tables
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+NOTES_SQL = """
+    CREATE TABLE notes (id INTEGER PRIMARY KEY, guid TEXT, mid INTEGER, mod INTEGER, usn INTEGER,
+                        tags TEXT, flds TEXT, sfld TEXT, csum INTEGER, flags INTEGER, data TEXT);
+    CREATE TABLE cards (id INTEGER PRIMARY KEY, nid INTEGER, did INTEGER, ord INTEGER);
+"""
+
+
+def _add_notes(conn, notes):
+    """notes: (note id, note type id, deck id, [fields], tags)"""
+    for note_id, model_id, deck_id, fields, tags in notes:
+        conn.execute("INSERT INTO notes (id, guid, mid, mod, usn, tags, flds, sfld, csum, flags, data) "
+                     "VALUES (?, ?, ?, 0, 0, ?, ?, ?, 0, 0, '')",
+                     (note_id, f"g{note_id}", model_id, tags, '\x1f'.join(fields), fields[0]))
+        conn.execute("INSERT INTO cards (id, nid, did, ord) VALUES (?, ?, ?, 0)", (note_id * 10, note_id, deck_id))
+
+
+def _package(db_path, member, apkg_name):
+    with zipfile.ZipFile(os.path.join(HERE, apkg_name), 'w', zipfile.ZIP_DEFLATED) as package:
+        package.write(db_path, member)
+        package.writestr('media', '{}')
+
+
+def build_legacy(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("CREATE TABLE col (id INTEGER PRIMARY KEY, models TEXT, decks TEXT);" + NOTES_SQL)
+    models = {
+        '100': {'name': 'Basic', 'type': 0, 'flds': [{'name': 'Front'}, {'name': 'Back'}]},
+        '200': {'name': 'Cloze', 'type': 1, 'flds': [{'name': 'Text'}, {'name': 'Back Extra'}]}
+    }
+    decks = {'1': {'name': 'Default'}, '10': {'name': 'English::Vocabulary'}, '20': {'name': 'English::Grammar'}}
+    conn.execute("INSERT INTO col VALUES (1, ?, ?)", (json.dumps(models), json.dumps(decks)))
+    _add_notes(conn, [
+        (1, 100, 10, ['<b>ubiquitous</b>', 'present everywhere<br>(adjective)'], ' vocab gre '),
+        (2, 100, 10, ['ephemeral', 'lasting a very short time'], 'vocab'),
+        (3, 100, 10, ['benevolent', '&quot;well meaning&quot; and kindly'], ''),
+        (4, 200, 20, ['The past of {{c1::go::verb}} is {{c2::went}}', '<div>irregular</div>'], 'grammar'),
+        (5, 200, 20, ['{{c1::Whom}} did you see?', ''], 'grammar'),
+        (6, 100, 10, ['orphan', ''], ''),  # no answer: skipped
+    ])
+    conn.commit()
+    conn.close()
+    _package(db_path, 'collection.anki2', 'legacy.apkg')
+
+
+def build_schema18(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE col (id INTEGER PRIMARY KEY, models TEXT, decks TEXT);
+        CREATE TABLE notetypes (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE fields (ntid INTEGER, ord INTEGER, name TEXT);
+        CREATE TABLE decks (id INTEGER PRIMARY KEY, name TEXT);
+    """ + NOTES_SQL)
+    conn.execute("INSERT INTO col VALUES (1, '{}', '{}')")
+    conn.execute("INSERT INTO notetypes VALUES (300, 'Basic (and reversed card)')")
+    conn.execute("INSERT INTO notetypes VALUES (400, 'Cloze')")
+    conn.executemany("INSERT INTO fields VALUES (?, ?, ?)",
+                     [(300, 1, 'Back'), (300, 0, 'Front'), (400, 0, 'Text'), (400, 1, 'Extra')])
+    conn.execute("INSERT INTO decks VALUES (30, ?)", ('Science\x1fPhysics',))
+    _add_notes(conn, [
+        (11, 300, 30, ['Unit of force', 'newton (N)'], 'physics'),
+        (12, 300, 30, ['Speed of light', '3.0 &times; 10<sup>8</sup> m/s'], 'physics constants'),
+        (13, 400, 30, ['{{c1::Entropy}} never decreases in an isolated system', 'Second law'], 'physics'),
+    ])
+    conn.commit()
+    conn.close()
+    _package(db_path, 'collection.anki21', 'schema18.apkg')
+
+
+if __name__ == "__main__":
+    for build in (build_legacy, build_schema18):
+        handle, db_path = tempfile.mkstemp(suffix='.anki2')
+        os.close(handle)
+        os.remove(db_path)
+        try:
+            build(db_path)
+        finally:
+            os.remove(db_path)
+    print(f"✅ Fixtures written to {HERE}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for the offline pipeline tests. Routes map a path to
+(status, content type, body); a route may also list statuses to return
+before its real response (e.g. [503, 503] for a page that fails twice).
+Every request is logged with its arrival time and headers. 200 responses
+carry an ETag of their body and honour "Range: bytes=N-" (subject to
+If-Range), like a static file server.
+
+    with FixtureServer({'/index.html': (200, 'text/html', b'...')}) as server:
+        requests.get(server.url('/index.html'))
+"""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+class FixtureServer:
+    def __init__(self, routes: Dict[str, Tuple[int, str, bytes]], failures: Dict[str, List[int]] = None):
+        self.routes = routes
+        self.failures = {path: list(statuses) for path, statuses in (failures or {}).items()}
+        self.requests: List[Tuple[str, float]] = []
+        self.headers: List[Tuple[str, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, time.monotonic()))
+                    server.headers.append((self.path, dict(self.headers)))
+                    pending = server.failures.get(self.path)
+                    status = pending.pop(0) if pending else None
+                if status is None:
+                    status, content_type, body = server.routes.get(self.path, (404, 'text/plain', b'not found'))
+                else:
+                    content_type, body = 'text/plain', b'try again'
+
+                headers = {'Content-Type': content_type}
+                if status == 200:
+                    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                    headers['ETag'] = etag
+                    requested = self.headers.get('Range', '')
+                    if requested.startswith('bytes=') and self.headers.get('If-Range', etag) == etag:
+                        start = int(requested[len('bytes='):].split('-')[0])
+                        if start >= len(body):
+                            status, headers['Content-Range'], body = 416, f'bytes */{len(body)}', b''
+                        else:
+                            status, headers['Content-Range'] = 206, f'bytes {start}-{len(body) - 1}/{len(body)}'
+                            body = body[start:]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def hits(self, path: str) -> int:
+        with self._lock:
+            return sum(1 for requested, _ in self.requests if requested == path)
+
+    def request_headers(self, path: str) -> List[Dict[str, str]]:
+        with self._lock:
+            return [headers for requested, headers in self.headers if requested == path]
+
+    def times(self, path: str) -> List[float]:
+        with self._lock:
+            return [at for requested, at in self.requests if requested == path]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
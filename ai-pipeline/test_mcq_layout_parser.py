@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Offline test of the layout-aware MCQ parser on small generated papers:
+option labels set apart by tight and wide gaps, large fonts, and the
+fallback to the text parser when options can't be told apart by position
+"""
+
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+
+# Add the pipeline sources to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import fitz  # PyMuPDF
+
+from mcq_layout_parser import LayoutMCQParser
+
+VECTOR = {'A': 'mass', 'B': 'speed', 'C': 'velocity', 'D': 'energy'}
+FORCE = {'A': 'newton', 'B': 'joule', 'C': 'watt', 'D': 'pascal'}
+
+
+def make_paper(label_gap, fontsize=10):
+    """
+    Two questions: options in a two-column grid, then one per row. Each label
+    is followed by its text `label_gap` points further right.
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    line = 2 * fontsize
+    y = 100
+
+    def put(x, text):
+        page.insert_text((x, y), text, fontsize=fontsize)
+
+    def option(x, label, text):
+        put(x, label)
+        put(x + fitz.get_text_length(label, fontsize=fontsize) + label_gap, text)
+
+    put(50, "1  Calculate which quantity is a vector.")
+    for left, right in (('A', 'B'), ('C', 'D')):
+        y += line
+        option(80, left, VECTOR[left])
+        option(80 + 12 * fontsize, right, VECTOR[right])
+    y += 1.5 * line
+    put(50, "2  Determine the unit of force.")
+    for label, text in FORCE.items():
+        y += line
+        option(80, label, text)
+
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_wide_label_gap():
+    """Labels well clear of their text, in columns and one per row"""
+    questions = LayoutMCQParser().parse(make_paper(12))
+    assert [q['options'] for q in questions] == [VECTOR, FORCE]
+
+
+def test_tight_label_gap():
+    """A 7.78 pt gap at 10 pt is still a label gap, not a word space"""
+    questions = LayoutMCQParser().parse(make_paper(7.78))
+    assert [q['options'] for q in questions] == [VECTOR, FORCE]
+    assert questions[0]['question_content'] == 'Calculate which quantity is a vector.'
+
+
+def test_gap_scales_with_font():
+    """At 30 pt a plain word space is wider than 8 pt, but not wide enough to detach a label"""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 100), "1  Calculate the speed.", fontsize=30)
+    page.insert_text((95, 160), "A ball falls from rest.", fontsize=30)
+    data = doc.tobytes()
+    doc.close()
+
+    question = LayoutMCQParser().parse(data)[0]
+    assert question['options'] == {}
+    assert question['question_content'] == 'Calculate the speed. A ball falls from rest.'
+    # A fixed gap in points still overrides the page's own
+    assert LayoutMCQParser(label_gap=8.0).parse(data)[0]['options'] == {'A': 'ball falls from rest.'}
+
+
+def test_fallback_to_text_parser():
+    """Labels no further from their text than a space: the text parser's options are used, with a warning"""
+    paper = make_paper(2.8)
+    parser = LayoutMCQParser()
+    assert all(len(q['options']) < 4 for q in parser.parse(paper))
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        questions = parser.parse_with_options(paper)
+    assert [q['options'] for q in questions] == [VECTOR, FORCE]
+    assert "Question 1" in output.getvalue() and "Question 2" in output.getvalue()
+
+
+if __name__ == "__main__":
+    print("🧪 Layout MCQ Parser Test - Generated Papers")
+    print("=" * 60)
+
+    tests = [test_wide_label_gap, test_tight_label_gap, test_gap_scales_with_font,
+             test_fallback_to_text_parser]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} layout parser tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Offline test of the SQLite paper catalog: upserts keyed by URL and by the
+CIE natural key, and papers found again under mirror URLs
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the pipeline sources to Python path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from paper_catalog import PaperCatalog
+
+ORIGINAL = 'https://a.example/9702_s22_qp_22.pdf'
+MIRROR = 'https://mirror.example/papers/9702_s22_qp_22.pdf'
+
+
+def catalog(directory):
+    return PaperCatalog(os.path.join(directory, 'catalog.sqlite'))
+
+
+def test_upsert_refreshes_in_place():
+    """A re-scrape updates the row and keeps what it doesn't mention"""
+    with tempfile.TemporaryDirectory() as directory, catalog(directory) as papers:
+        papers.upsert({'url': ORIGINAL, 'level': 'A-Level', 'title': 'Paper 22'}, source='pastpapers.co')
+        papers.set_local_path(ORIGINAL, '/tmp/9702_s22_qp_22.pdf', 'abc')
+        papers.upsert({'url': ORIGINAL, 'level': 'A-Level', 'title': ''}, subject='Physics')
+
+        paper = papers.get(ORIGINAL)
+        assert papers.count() == 1
+        assert (paper['subject_code'], paper['year'], paper['session']) == ('9702', 2022, 's')
+        assert paper['title'] == 'Paper 22' and paper['subject'] == 'Physics'
+        assert paper['local_path'] == '/tmp/9702_s22_qp_22.pdf'
+
+
+def test_mirror_updates_first_row():
+    """The same paper under a mirror URL updates the row it was first catalogued under"""
+    with tempfile.TemporaryDirectory() as directory, catalog(directory) as papers:
+        papers.upsert({'url': ORIGINAL, 'level': 'A-Level'})
+        papers.upsert({'url': MIRROR, 'level': 'A-Level', 'title': 'Mirror copy'})
+
+        assert papers.count() == 1
+        assert papers.get(ORIGINAL)['url'] == ORIGINAL, "the primary URL does not move to the mirror"
+        assert papers.get(MIRROR)['title'] == 'Mirror copy'
+
+
+def test_download_then_crawl_of_mirror():
+    """
+    download_paper() on a mirror (no level known) and then a crawl listing the
+    mirror with its level: the download row is merged into the catalogued paper
+    """
+    with tempfile.TemporaryDirectory() as directory, catalog(directory) as papers:
+        papers.upsert({'url': ORIGINAL, 'level': 'A-Level'})
+        papers.set_local_path(MIRROR, '/tmp/mirror.pdf', 'abc')
+        assert papers.count() == 2, "the download doesn't know the level yet"
+
+        papers.upsert_many([{'url': MIRROR, 'level': 'A-Level'}], board='CIE')
+
+        assert papers.count() == 1
+        for url in (ORIGINAL, MIRROR):
+            paper = papers.get(url)
+            assert paper['url'] == ORIGINAL
+            assert paper['local_path'] == '/tmp/mirror.pdf' and paper['content_hash'] == 'abc'
+        assert [paper['url'] for paper in papers.find(subject_code='9702', downloaded=True)] == [ORIGINAL]
+
+        # Later writes through either URL keep landing on the same row
+        papers.set_local_path(MIRROR, '/tmp/again.pdf')
+        papers.upsert({'url': MIRROR, 'level': 'A-Level', 'title': 'Paper 22'})
+        assert papers.count() == 1
+        assert papers.get(ORIGINAL)['local_path'] == '/tmp/again.pdf'
+        assert papers.get(ORIGINAL)['title'] == 'Paper 22'
+
+
+def test_pairs():
+    """Question papers are paired with the mark scheme of the same paper and variant"""
+    with tempfile.TemporaryDirectory() as directory, catalog(directory) as papers:
+        papers.upsert_many([{'url': f'https://a.example/9702_s22_{kind}_{variant}.pdf'}
+                            for kind in ('qp', 'ms') for variant in ('21', '22')], level='A-Level')
+        pairs = papers.pairs('9702', variant='2')
+        assert [(qp['url'], ms['url']) for qp, ms in pairs] == [
+            ('https://a.example/9702_s22_qp_22.pdf', 'https://a.example/9702_s22_ms_22.pdf')]
+
+
+if __name__ == "__main__":
+    print("🧪 Paper Catalog Test")
+    print("=" * 60)
+
+    tests = [test_upsert_refreshes_in_place, test_mirror_updates_first_row,
+             test_download_then_crawl_of_mirror, test_pairs]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print(f"\n❌ {failed} of {len(tests)} tests failed!")
+        sys.exit(1)
+    print(f"\n🎉 All {len(tests)} catalog tests passed!")